@@ -26,6 +26,20 @@ async function getCategoryFullPath(client, categoryId) {
   return { path, pathArray };
 }
 
+// search_text 컬럼 존재 여부 (initDb.js / addProductImagesAndSearch.sql로 생성)
+// 마이그레이션 전 DB는 기존 ILIKE 검색으로 대체. 생기면 재시작 없이 반영되도록 true만 캐시
+let hasSearchText = false;
+async function searchTextAvailable(client) {
+  if (!hasSearchText) {
+    const result = await client.query(`
+      SELECT 1 FROM information_schema.columns
+      WHERE table_name = 'products' AND column_name = 'search_text'
+    `);
+    hasSearchText = result.rows.length > 0;
+  }
+  return hasSearchText;
+}
+
 // 상품 목록 조회
 exports.getProducts = async (req, res) => {
   const client = await pool.connect();
@@ -95,8 +109,14 @@ exports.getProducts = async (req, res) => {
 
     if (search) {
       paramCount++;
-      query += ` AND (p.name ILIKE $${paramCount} OR p.description ILIKE $${paramCount})`;
-      params.push(`%${search}%`);
+      if (await searchTextAvailable(client)) {
+        // search_text: 상품명 + URL을 뺀 설명 (트라이그램 인덱스, addProductImagesAndSearch.sql)
+        query += ` AND p.search_text LIKE $${paramCount}`;
+        params.push(`%${search.toLowerCase()}%`);
+      } else {
+        query += ` AND (p.name ILIKE $${paramCount} OR p.description ILIKE $${paramCount})`;
+        params.push(`%${search}%`);
+      }
     }
 
     // 총 개수 조회
@@ -110,7 +130,8 @@ exports.getProducts = async (req, res) => {
     if (["recommend", "hot", "popular"].includes(featuredType)) {
       query += ` ORDER BY p.featured_order ASC, p.created_at DESC LIMIT $${paramCount + 1} OFFSET $${paramCount + 2}`;
     } else {
-      query += ` ORDER BY p.created_at DESC LIMIT $${paramCount + 1} OFFSET $${paramCount + 2}`;
+      // p.id: 같은 시각에 일괄 등록된 상품도 페이지 순서 고정 (크롤러 카탈로그 스냅샷과 동일)
+      query += ` ORDER BY p.created_at DESC, p.id DESC LIMIT $${paramCount + 1} OFFSET $${paramCount + 2}`;
     }
     params.push(limit, offset);
 
@@ -190,8 +211,23 @@ exports.getProduct = async (req, res) => {
       });
     });
 
+    // 상세 설명 이미지 조회 (저장 순서대로)
+    let images = [];
+    try {
+      const imagesResult = await client.query(`
+        SELECT image_url FROM product_images
+        WHERE product_id = $1
+        ORDER BY sort_order
+      `, [id]);
+      images = imagesResult.rows.map(row => row.image_url);
+    } catch (error) {
+      // 마이그레이션 전/크롤러 미실행으로 테이블이 없으면 설명 이미지 없음
+      if (error.code !== '42P01') throw error;
+    }
+
     const product = result.rows[0];
     product.options = optionsGrouped;
+    product.images = images;
     product.category_full_path = categoryFullPath;  // "남성 > 가방 > 고야드 > 크로스&숄더백"
     product.category_path_array = categoryPathArray;
 
@@ -228,13 +228,150 @@ router.post('/users/:id/points', auth, adminAuth, async (req, res) => {
   }
 });
 
+// 크롤러 stdout 한 줄 → 로그/진행 상태 반영 (spawn 실행과 데몬 로그 폴링 공용)
+function handleCrawlerLine(line) {
+  crawlStatus.logs.push(`[${kstTime()}] ${line}`);
+  
+  // ===== 단계 감지 =====
+  if (line.includes('[SITEMAP] 사이트맵 불러오는 중')) {
+    crawlStatus.phase = 'sitemap';
+  }
+  else if (line.includes('[SITEMAP] 사이트맵에서')) {
+    const m = line.match(/(\d+)개의 상품 URL/);
+    if (m) crawlStatus.sitemapCount = parseInt(m[1]);
+  }
+  else if (line.includes('[CATEGORY]') && line.includes('병렬 페이지 순회 시작')) {
+    crawlStatus.phase = 'category_url';
+  }
+  else if (line.includes('[CATEGORY]') && line.includes('누적') && line.includes('수집 중')) {
+    const m = line.match(/누적 (\d+)개/);
+    if (m) {
+      // 카테고리별 누적이 아닌 전체 누적으로 추가
+      const catCount = parseInt(m[1]);
+      if (catCount > (crawlStatus._currentCatCount || 0)) {
+        crawlStatus.categoryUrlCount += catCount - (crawlStatus._currentCatCount || 0);
+      }
+      crawlStatus._currentCatCount = catCount;
+    }
+  }
+  else if (line.includes('[CATEGORY]') && line.includes('상품 URL 수집 완료')) {
+    // 카테고리 하나 완료 → 다음 카테고리용 리셋
+    crawlStatus._currentCatCount = 0;
+  }
+  else if (line.includes('[CATEGORY-BG] 카테고리에서 신규')) {
+    const m = line.match(/신규 (\d+)개/);
+    if (m) crawlStatus.categoryUrlCount = parseInt(m[1]);
+    crawlStatus.categoryUrlDone = true;
+  }
+  else if (line.includes('[SCAN] 병렬 크롤링 시작')) {
+    crawlStatus.phase = 'crawling';
+  }
+  else if (line.includes('[RETRY]') && line.includes('재시도 시작')) {
+    crawlStatus.phase = 'retry';
+    const m = line.match(/(\d+)개 URL/);
+    if (m) crawlStatus.retryCount = parseInt(m[1]);
+  }
+  
+  // ===== 저장 성공 카운트 =====
+  if (line.match(/\[\+\d+\]/)) {
+    crawlStatus.savedCount++;
+  }
+  
+  // ===== 진행률 파싱 =====
+  if (line.includes('진행:') && line.includes('스캔')) {
+    // "진행: 1,800/41,742 (4.3%) | 경과: 3시간 20분 | 남은: ~74시간"
+    const scanMatch = line.match(/진행:\s*([\d,]+)\/([\d,]+)/);
+    if (scanMatch) {
+      crawlStatus.scannedCount = parseInt(scanMatch[1].replace(/,/g, ''));
+      crawlStatus.totalUrls = parseInt(scanMatch[2].replace(/,/g, ''));
+    }
+    const savedMatch = line.match(/저장:\s*([\d,]+)개/);
+    if (savedMatch) {
+      crawlStatus.savedCount = parseInt(savedMatch[1].replace(/,/g, ''));
+    }
+    const skipMatch = line.match(/스킵:\s*([\d,]+)/);
+    if (skipMatch) crawlStatus.skipCount = parseInt(skipMatch[1].replace(/,/g, ''));
+    const failMatch = line.match(/실패:\s*([\d,]+)/);
+    if (failMatch) crawlStatus.failCount = parseInt(failMatch[1].replace(/,/g, ''));
+    const timeoutMatch = line.match(/타임아웃:\s*([\d,]+)/);
+    if (timeoutMatch) crawlStatus.timeoutCount = parseInt(timeoutMatch[1].replace(/,/g, ''));
+    const elapsedMatch = line.match(/경과:\s*([^\|]+)/);
+    if (elapsedMatch) crawlStatus.elapsedStr = elapsedMatch[1].trim();
+    const remainMatch = line.match(/남은:\s*([^\|]+)/);
+    if (remainMatch) crawlStatus.remainStr = remainMatch[1].trim();
+    const rateMatch = line.match(/성공률:\s*([\d.]+)%/);
+    if (rateMatch) crawlStatus.successRate = parseFloat(rateMatch[1]);
+  }
+  
+  // ===== 타임아웃 카운트 (개별) =====
+  if (line.includes('[TIMEOUT]')) {
+    crawlStatus.timeoutCount++;
+  }
+  
+  // ===== 완료 감지 =====
+  if (line.includes('크롤링 완료!')) {
+    crawlStatus.phase = 'done';
+  }
+  
+  // 로그 최대 500줄 유지
+  if (crawlStatus.logs.length > 500) {
+    crawlStatus.logs = crawlStatus.logs.slice(-500);
+  }
+}
+
+// 상주 크롤러 데몬 (python3 replmoa_crawler.py --daemon). 설정되어 있으면 spawn 대신 사용
+const CRAWLER_DAEMON_URL = (process.env.CRAWLER_DAEMON_URL || '').replace(/\/$/, '');
+let daemonPollTimer = null;
+let daemonLogSeq = 0;
+
+async function callCrawlerDaemon(method, pathname, body) {
+  const response = await fetch(`${CRAWLER_DAEMON_URL}${pathname}`, {
+    method,
+    headers: { 'Content-Type': 'application/json' },
+    body: body ? JSON.stringify(body) : undefined,
+  });
+  const data = await response.json();
+  if (!response.ok) {
+    const error = new Error(data.message || `crawler daemon ${response.status}`);
+    error.status = response.status;
+    throw error;
+  }
+  return data;
+}
+
+// 데몬 로그를 이어 읽어 spawn 실행과 같은 방식으로 상태를 갱신
+function pollCrawlerDaemon() {
+  clearInterval(daemonPollTimer);
+  daemonPollTimer = setInterval(async () => {
+    try {
+      // 상태를 먼저 읽어야 종료 직전에 찍힌 로그(최종 요약)까지 빠짐없이 가져옴
+      const status = await callCrawlerDaemon('GET', '/status');
+      const { seq, lines } = await callCrawlerDaemon('GET', `/logs?after=${daemonLogSeq}`);
+      daemonLogSeq = seq;
+      lines.filter(l => l.trim()).forEach(handleCrawlerLine);
+
+      if (!status.running) {
+        clearInterval(daemonPollTimer);
+        daemonPollTimer = null;
+        crawlStatus.isRunning = false;
+        crawlStatus.endTime = new Date().toISOString();
+        const phase = status.progress && status.progress.phase;
+        const label = phase === 'stopped' ? '중지됨' : phase === 'failed' ? '오류' : '완료';
+        crawlStatus.logs.push(`[${kstTime()}] 크롤링 ${label} - 총 ${crawlStatus.savedCount}개 저장됨`);
+      }
+    } catch (error) {
+      crawlStatus.logs.push(`[${kstTime()}] [ERROR] 크롤러 데몬 응답 없음: ${error.message}`);
+    }
+  }, 1000);
+}
+
 // 관리자: 크롤링 시작
 router.post('/crawl/start', auth, adminAuth, async (req, res) => {
   if (crawlStatus.isRunning) {
     return res.status(400).json({ message: '크롤링이 이미 진행 중입니다.' });
   }
 
-  const { limit = 100, category = '', urlSource = 'both', speedMode = 'normal', skipS3 = false } = req.body;
+  const { limit = 100, category = '', urlSource = 'both', speedMode = 'normal', skipS3 = false, deadline = '', incremental = false } = req.body;
   const rawLimit = parseInt(limit);
   const isUnlimited = rawLimit === 0;
   const crawlLimit = isUnlimited ? 0 : Math.max(1, rawLimit || 100);
@@ -242,6 +379,10 @@ router.post('/crawl/start', auth, adminAuth, async (req, res) => {
   const crawlUrlSource = ['sitemap', 'category', 'both'].includes(urlSource) ? urlSource : 'both';
   const crawlSpeedMode = ['fast', 'normal'].includes(speedMode) ? speedMode : 'normal';
   const crawlSkipS3 = skipS3 === true ? 'true' : 'false';
+  // 증분 수집: 카테고리 순회를 기존 상품만 나오는 페이지에서 중단 (매일 신규 상품만 빠르게 수집)
+  const crawlIncremental = incremental === true ? 'true' : 'false';
+  // 마감 시각: "04:00"(KST) 또는 "+90m"/"+2h" (크롤러 parse_deadline과 같은 형식, 그 외는 무시)
+  const crawlDeadline = /^(\d{1,2}:\d{2}|\+\d+[smh])$/.test(String(deadline).trim()) ? String(deadline).trim() : '';
 
   // 상태 초기화
   crawlStatus = {
@@ -274,7 +415,36 @@ router.post('/crawl/start', auth, adminAuth, async (req, res) => {
   const limitInfo = isUnlimited ? '전체(무제한)' : `${crawlLimit}개`;
   const speedInfo = crawlSpeedMode === 'fast' ? '⚡고속' : '일반';
   const s3Info = crawlSkipS3 === 'true' ? ', S3스킵' : '';
-  crawlStatus.logs.push(`[${kstTime()}] 크롤링 시작 (목표: ${limitInfo}${filterInfo}, 소스: ${sourceInfo}, 속도: ${speedInfo}${s3Info})`);
+  const deadlineInfo = crawlDeadline ? `, 마감: ${crawlDeadline}` : '';
+  const incrementalInfo = crawlIncremental === 'true' ? ', 증분' : '';
+  crawlStatus.logs.push(`[${kstTime()}] 크롤링 시작 (목표: ${limitInfo}${filterInfo}, 소스: ${sourceInfo}, 속도: ${speedInfo}${s3Info}${deadlineInfo}${incrementalInfo})`);
+
+  if (CRAWLER_DAEMON_URL) {
+    try {
+      const status = await callCrawlerDaemon('GET', '/status');
+      daemonLogSeq = status.log_seq || 0;
+      await callCrawlerDaemon('POST', '/jobs', {
+        limit: crawlLimit,
+        category: categoryFilter,
+        url_source: crawlUrlSource,
+        speed_mode: crawlSpeedMode,
+        skip_s3: crawlSkipS3 === 'true',
+        deadline: crawlDeadline,
+        incremental: crawlIncremental === 'true',
+      });
+    } catch (error) {
+      crawlStatus.isRunning = false;
+      crawlStatus.endTime = new Date().toISOString();
+      crawlStatus.logs.push(`[${kstTime()}] [ERROR] 크롤러 데몬 작업 시작 실패: ${error.message}`);
+      return res.status(error.status === 409 ? 400 : 502).json({ message: '크롤러 데몬에 작업을 시작하지 못했습니다.' });
+    }
+    crawlStatus.logs.push(`[${kstTime()}] 크롤러 데몬에 작업 전달됨 (${CRAWLER_DAEMON_URL})`);
+    pollCrawlerDaemon();
+    return res.json({
+      message: '크롤링이 시작되었습니다.',
+      targetCount: crawlLimit
+    });
+  }
 
   // Python 크롤러 실행
   const crawlerPath = path.join(__dirname, '../../replmoa_crawler.py');
@@ -295,6 +465,8 @@ router.post('/crawl/start', auth, adminAuth, async (req, res) => {
       CRAWL_URL_SOURCE: crawlUrlSource,
       CRAWL_SPEED_MODE: crawlSpeedMode,
       CRAWL_SKIP_S3: crawlSkipS3,
+      CRAWL_DEADLINE: crawlDeadline,
+      CRAWL_CATEGORY_INCREMENTAL: crawlIncremental,
       CRAWL_STOP_FLAG: stopFlagPath,  // 중지 플래그 경로 전달
       PYTHONIOENCODING: 'utf-8',
       PYTHONUNBUFFERED: '1'
@@ -306,95 +478,7 @@ router.post('/crawl/start', auth, adminAuth, async (req, res) => {
 
   crawlerProcess.stdout.on('data', (data) => {
     const lines = data.toString('utf-8').split('\n').filter(l => l.trim());
-    lines.forEach(line => {
-      crawlStatus.logs.push(`[${kstTime()}] ${line}`);
-      
-      // ===== 단계 감지 =====
-      if (line.includes('[SITEMAP] 사이트맵 불러오는 중')) {
-        crawlStatus.phase = 'sitemap';
-      }
-      else if (line.includes('[SITEMAP] 사이트맵에서')) {
-        const m = line.match(/(\d+)개의 상품 URL/);
-        if (m) crawlStatus.sitemapCount = parseInt(m[1]);
-      }
-      else if (line.includes('[CATEGORY]') && line.includes('병렬 페이지 순회 시작')) {
-        crawlStatus.phase = 'category_url';
-      }
-      else if (line.includes('[CATEGORY]') && line.includes('누적') && line.includes('수집 중')) {
-        const m = line.match(/누적 (\d+)개/);
-        if (m) {
-          // 카테고리별 누적이 아닌 전체 누적으로 추가
-          const catCount = parseInt(m[1]);
-          if (catCount > (crawlStatus._currentCatCount || 0)) {
-            crawlStatus.categoryUrlCount += catCount - (crawlStatus._currentCatCount || 0);
-          }
-          crawlStatus._currentCatCount = catCount;
-        }
-      }
-      else if (line.includes('[CATEGORY]') && line.includes('상품 URL 수집 완료')) {
-        // 카테고리 하나 완료 → 다음 카테고리용 리셋
-        crawlStatus._currentCatCount = 0;
-      }
-      else if (line.includes('[CATEGORY-BG] 카테고리에서 신규')) {
-        const m = line.match(/신규 (\d+)개/);
-        if (m) crawlStatus.categoryUrlCount = parseInt(m[1]);
-        crawlStatus.categoryUrlDone = true;
-      }
-      else if (line.includes('[SCAN] 병렬 크롤링 시작')) {
-        crawlStatus.phase = 'crawling';
-      }
-      else if (line.includes('[RETRY]') && line.includes('재시도 시작')) {
-        crawlStatus.phase = 'retry';
-        const m = line.match(/(\d+)개 URL/);
-        if (m) crawlStatus.retryCount = parseInt(m[1]);
-      }
-      
-      // ===== 저장 성공 카운트 =====
-      if (line.match(/\[\+\d+\]/)) {
-        crawlStatus.savedCount++;
-      }
-      
-      // ===== 진행률 파싱 =====
-      if (line.includes('진행:') && line.includes('스캔')) {
-        // "진행: 1,800/41,742 (4.3%) | 경과: 3시간 20분 | 남은: ~74시간"
-        const scanMatch = line.match(/진행:\s*([\d,]+)\/([\d,]+)/);
-        if (scanMatch) {
-          crawlStatus.scannedCount = parseInt(scanMatch[1].replace(/,/g, ''));
-          crawlStatus.totalUrls = parseInt(scanMatch[2].replace(/,/g, ''));
-        }
-        const savedMatch = line.match(/저장:\s*([\d,]+)개/);
-        if (savedMatch) {
-          crawlStatus.savedCount = parseInt(savedMatch[1].replace(/,/g, ''));
-        }
-        const skipMatch = line.match(/스킵:\s*([\d,]+)/);
-        if (skipMatch) crawlStatus.skipCount = parseInt(skipMatch[1].replace(/,/g, ''));
-        const failMatch = line.match(/실패:\s*([\d,]+)/);
-        if (failMatch) crawlStatus.failCount = parseInt(failMatch[1].replace(/,/g, ''));
-        const timeoutMatch = line.match(/타임아웃:\s*([\d,]+)/);
-        if (timeoutMatch) crawlStatus.timeoutCount = parseInt(timeoutMatch[1].replace(/,/g, ''));
-        const elapsedMatch = line.match(/경과:\s*([^\|]+)/);
-        if (elapsedMatch) crawlStatus.elapsedStr = elapsedMatch[1].trim();
-        const remainMatch = line.match(/남은:\s*([^\|]+)/);
-        if (remainMatch) crawlStatus.remainStr = remainMatch[1].trim();
-        const rateMatch = line.match(/성공률:\s*([\d.]+)%/);
-        if (rateMatch) crawlStatus.successRate = parseFloat(rateMatch[1]);
-      }
-      
-      // ===== 타임아웃 카운트 (개별) =====
-      if (line.includes('[TIMEOUT]')) {
-        crawlStatus.timeoutCount++;
-      }
-      
-      // ===== 완료 감지 =====
-      if (line.includes('크롤링 완료!')) {
-        crawlStatus.phase = 'done';
-      }
-      
-      // 로그 최대 500줄 유지
-      if (crawlStatus.logs.length > 500) {
-        crawlStatus.logs = crawlStatus.logs.slice(-500);
-      }
-    });
+    lines.forEach(handleCrawlerLine);
   });
 
   crawlerProcess.stderr.on('data', (data) => {
@@ -435,7 +519,18 @@ router.post('/crawl/start', auth, adminAuth, async (req, res) => {
 });
 
 // 관리자: 크롤링 중지
-router.post('/crawl/stop', auth, adminAuth, (req, res) => {
+router.post('/crawl/stop', auth, adminAuth, async (req, res) => {
+  if (CRAWLER_DAEMON_URL && crawlStatus.isRunning) {
+    // 데몬은 프로세스를 죽이지 않고 작업만 중지 (다음 배치 전에 종료, 연결/캐시는 유지)
+    try {
+      await callCrawlerDaemon('POST', '/jobs/stop');
+      crawlStatus.logs.push(`[${kstTime()}] 크롤링 중지 요청됨`);
+      return res.json({ message: '크롤링 중지를 요청했습니다.' });
+    } catch (error) {
+      console.error('Stop crawl error:', error);
+      return res.status(500).json({ message: '크롤링 중지에 실패했습니다.' });
+    }
+  }
   if (!crawlStatus.isRunning || !crawlerProcess) {
     return res.status(400).json({ message: '실행 중인 크롤링이 없습니다.' });
   }
@@ -558,6 +653,34 @@ router.get('/featured/:type', auth, adminAuth, async (req, res) => {
   }
 });
 
+// 상품 가격 이력 (크롤러가 신규/변경 시에만 기록, 최근 순)
+router.get('/products/:id/price-history', auth, adminAuth, async (req, res) => {
+  const client = await pool.connect();
+  try {
+    const { id } = req.params;
+    // 조회 기간(일): 숫자가 아니면 365, 1일~10년으로 제한
+    const days = Math.min(Math.max(parseInt(req.query.days, 10) || 365, 1), 3650);
+
+    const result = await client.query(`
+      SELECT observed_at, price, department_price
+      FROM product_price_history
+      WHERE product_id = $1 AND observed_at >= NOW() - make_interval(days => $2)
+      ORDER BY observed_at DESC
+    `, [id, days]);
+
+    res.json({ history: result.rows });
+  } catch (error) {
+    // 크롤러를 한 번도 실행하지 않아 테이블이 없으면 빈 이력
+    if (error.code === '42P01') {
+      return res.json({ history: [] });
+    }
+    console.error('Get price history error:', error);
+    res.status(500).json({ message: '서버 오류가 발생했습니다.' });
+  } finally {
+    client.release();
+  }
+});
+
 // 상품 검색 (추천/히트/인기 추가용)
 router.get('/featured-search', auth, adminAuth, async (req, res) => {
   const client = await pool.connect();
@@ -0,0 +1,43 @@
+-- 상품 설명 이미지 테이블 + 검색 전용 컬럼
+-- Run: psql -U postgres -d modern_shop -f addProductImagesAndSearch.sql
+--
+-- 크롤러는 description에 "원본URL\n이미지1;이미지2;..." 를 저장해 왔습니다.
+-- 이미지 목록은 product_images로 옮기고 description에는 원본 URL만 남깁니다.
+-- 검색은 description 전체 대신 URL을 뺀 search_text(트라이그램 인덱스)를 사용합니다.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- product_images 테이블 생성 (크롤러도 없으면 생성)
+CREATE TABLE IF NOT EXISTS product_images (
+    id SERIAL PRIMARY KEY,
+    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    image_url TEXT NOT NULL,
+    sort_order INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(product_id, sort_order)
+);
+
+-- 기존 크롤링 상품의 설명 이미지 이관 (원본 URL 다음 줄의 ';' 구분 목록)
+INSERT INTO product_images (product_id, image_url, sort_order)
+SELECT p.id, trim(t.url), t.ord - 1
+FROM products p
+CROSS JOIN LATERAL unnest(string_to_array(split_part(p.description, E'\n', 2), ';')) WITH ORDINALITY AS t(url, ord)
+WHERE p.description ~ '^https?://[^\n]*it_id=' AND trim(t.url) LIKE 'http%'
+ON CONFLICT (product_id, sort_order) DO NOTHING;
+
+UPDATE products
+SET description = split_part(description, E'\n', 1)
+WHERE description ~ '^https?://[^\n]*it_id=' AND position(E'\n' IN description) > 0;
+
+-- 검색 전용 컬럼: 상품명 + 설명에서 URL을 뺀 텍스트 (쓰기 시 자동 계산)
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_text TEXT
+    GENERATED ALWAYS AS (
+        lower(trim(name || ' ' || regexp_replace(coalesce(description, ''), 'https?://\S+', '', 'g')))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_products_search_trgm ON products USING gin (search_text gin_trgm_ops);
+
+-- Verify
+SELECT
+    (SELECT COUNT(*) FROM product_images) AS product_images,
+    (SELECT COUNT(*) FROM products WHERE description LIKE '%;http%') AS descriptions_with_image_lists;
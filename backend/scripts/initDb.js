@@ -9,6 +9,7 @@ const initDatabase = async () => {
 
     // Drop existing tables
     await client.query(`
+      DROP TABLE IF EXISTS product_images CASCADE;
       DROP TABLE IF EXISTS order_items CASCADE;
       DROP TABLE IF EXISTS orders CASCADE;
       DROP TABLE IF EXISTS cart_items CASCADE;
@@ -83,6 +84,35 @@ const initDatabase = async () => {
       );
     `);
 
+    // 검색 전용 컬럼: 상품명 + 설명에서 URL을 뺀 텍스트 (트라이그램 인덱스, addProductImagesAndSearch.sql과 동일)
+    await client.query(`
+      ALTER TABLE products ADD COLUMN search_text TEXT
+        GENERATED ALWAYS AS (
+          lower(trim(name || ' ' || regexp_replace(coalesce(description, ''), 'https?://\\S+', '', 'g')))
+        ) STORED;
+    `);
+    try {
+      await client.query(`
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX idx_products_search_trgm ON products USING gin (search_text gin_trgm_ops);
+      `);
+    } catch (error) {
+      // 인덱스 없이도 검색은 동작 (contrib 패키지 설치 후 addProductImagesAndSearch.sql 재실행)
+      console.warn('⚠️ pg_trgm 인덱스 생성 실패 (검색은 인덱스 없이 동작):', error.message);
+    }
+
+    // Create product_images table (상세 설명 이미지, 순서 보존)
+    await client.query(`
+      CREATE TABLE product_images (
+        id SERIAL PRIMARY KEY,
+        product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        image_url TEXT NOT NULL,
+        sort_order INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(product_id, sort_order)
+      );
+    `);
+
     // Create product_options table (사이즈, 컬러 등 옵션)
     await client.query(`
       CREATE TABLE product_options (
@@ -188,11 +188,14 @@ const ProductDetail = () => {
   };
 
   const detailImages = useMemo(() => {
+    // product_images 우선, 이전 형식(description에 ';' 구분 목록)은 파싱해서 사용
     const desc = product?.description || "";
-    const imgs = desc
-      .split(";")
-      .map((s) => s.trim())
-      .filter((s) => s && s.startsWith("http"));
+    const imgs = product?.images?.length
+      ? product.images
+      : desc
+          .split(";")
+          .map((s) => s.trim())
+          .filter((s) => s && s.startsWith("http"));
     // 첫 번째 이미지(대표) 제외 후, 마지막 설명 이미지는 숨김
     const contentImages = imgs.slice(1);
     if (contentImages.length <= 1) return [];
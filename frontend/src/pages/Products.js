@@ -1,6 +1,6 @@
 import React, { useEffect, useMemo, useState } from "react";
 import { useSearchParams } from "react-router-dom";
-import { getProducts, getCategories, getWeeklyBestProducts } from "../services/api";
+import { getCatalogProducts, getCategories, getWeeklyBestProducts } from "../services/api";
 import ProductCard from "../components/ProductCard";
 import "./Products.css";
 
@@ -277,7 +277,7 @@ const Products = () => {
 			if (subcategory && isSpecialCategory) {
 				params.subcategory = subcategory;
 			}
-			const response = await getProducts(params);
+			const response = await getCatalogProducts(params);
 			const list = response.data.products || [];
 			setProducts(list);
 			setPagination(response.data.pagination);
@@ -27,6 +27,51 @@ export const getImageUrl = (url) => {
 
 // Products
 export const getProducts = (params) => axios.get(`/products`, { params });
+
+// 카탈로그 스냅샷: 크롤러가 S3/CDN에 올린 카테고리 목록 앞쪽 페이지 (replmoa_crawler.py publish_catalog_snapshot)
+// REACT_APP_CATALOG_BASE_URL 예: https://cdn.example.com/catalog
+// 스냅샷에 없는 요청(검색, 특별 카테고리, 뒤쪽 페이지 등)이나 CDN 오류는 API로 조회
+const CATALOG_BASE_URL = process.env.REACT_APP_CATALOG_BASE_URL || "";
+const CATALOG_MANIFEST_TTL = 60 * 1000;
+let catalogManifest = null;
+
+// axios 기본 Authorization 헤더가 붙지 않도록 fetch 사용 (CDN preflight 방지)
+const fetchJson = (url) =>
+  fetch(url).then((res) => {
+    if (!res.ok) throw new Error(`${res.status} ${url}`);
+    return res.json();
+  });
+
+const loadCatalogManifest = () => {
+  if (!catalogManifest || Date.now() - catalogManifest.loadedAt > CATALOG_MANIFEST_TTL) {
+    const promise = fetchJson(`${CATALOG_BASE_URL}/latest.json`).then(async (manifest) => ({
+      ...manifest,
+      counts: await fetchJson(`${CATALOG_BASE_URL}/${manifest.version}/counts.json`),
+    }));
+    catalogManifest = { promise, loadedAt: Date.now() };
+  }
+  return catalogManifest.promise;
+};
+
+// 스토어 상품 목록 (관리자 화면은 즉시 반영되어야 하므로 getProducts 사용)
+export const getCatalogProducts = async (params) => {
+  const { category, search, subcategory, popular_category, page = 1, limit = 12 } = params;
+  if (CATALOG_BASE_URL && !search && !subcategory && !popular_category) {
+    try {
+      const manifest = await loadCatalogManifest();
+      const slug = category || "_all";
+      if (manifest.counts[slug] && Number(limit) === manifest.page_size && Number(page) <= manifest.pages) {
+        const data = await fetchJson(
+          `${CATALOG_BASE_URL}/${manifest.version}/list/${encodeURIComponent(slug)}/${page}.json`
+        );
+        return { data };
+      }
+    } catch (error) {
+      console.warn("Catalog snapshot unavailable, using API:", error);
+    }
+  }
+  return getProducts(params);
+};
 export const getProduct = (id) => axios.get(`/products/${id}`);
 export const createProduct = (data) => axios.post(`/products`, data);
 export const updateProduct = (id, data) => axios.put(`/products/${id}`, data);
@@ -0,0 +1,215 @@
+"""
+크롤러 벤치마크
+
+사용법:
+    python3 replmoa_bench.py            # 전체
+    python3 replmoa_bench.py startup    # 항목 지정
+    BENCH_PAGES_DIR=pages/ python3 replmoa_bench.py options   # 저장해 둔 상품 상세 HTML로 측정
+
+네트워크/DB 없이 돌아가는 항목만 둡니다. 결과는 표준 출력으로만 내보냅니다.
+"""
+import glob
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+STARTUP_RUNS = int(os.environ.get("BENCH_STARTUP_RUNS", "7"))
+OPTIONS_RUNS = int(os.environ.get("BENCH_OPTIONS_RUNS", "20"))
+# 상품 상세 페이지를 저장해 둔 디렉터리 (*.html). 없으면 합성 페이지 사용
+PAGES_DIR = os.environ.get("BENCH_PAGES_DIR", "")
+
+# 새 인터프리터에서 크롤러를 import하고, import 시간과 부수효과를 JSON으로 출력
+_STARTUP_PROBE = r"""
+import json, signal, sys, time
+before = signal.getsignal(signal.SIGTERM)
+t0 = time.perf_counter()
+import replmoa_crawler as c
+elapsed = time.perf_counter() - t0
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "heavy": sorted(m for m in ("boto3", "psycopg2", "httpx", "pyarrow") if m in sys.modules),
+    "signals": signal.getsignal(signal.SIGTERM) is not before,
+    "sessions": len(c.http_sessions),
+    "s3_client": c._s3_client_ready,
+}))
+"""
+
+
+def _probe_startup(env_overrides: Dict[str, str]) -> Dict:
+    env = dict(os.environ, **env_overrides)
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - t0) * 1000
+    return result
+
+
+def bench_startup() -> None:
+    """프로세스 기동 + 모듈 import 시간 (관리자 '크롤링 시작' 1회당 비용)"""
+    configs = {
+        "기본": {},
+        "CRAWL_SKIP_S3=true": {"CRAWL_SKIP_S3": "true"},
+        "S3 키 설정": {"AWS_ACCESS_KEY_ID": "bench", "AWS_SECRET_ACCESS_KEY": "bench"},
+    }
+    for label, env in configs.items():
+        runs = [_probe_startup(env) for _ in range(STARTUP_RUNS)]
+        import_ms = statistics.median(r["import_ms"] for r in runs)
+        process_ms = statistics.median(r["process_ms"] for r in runs)
+        last = runs[-1]
+        print(f"[startup] {label:<20} import {import_ms:7.1f}ms | 프로세스 {process_ms:7.1f}ms"
+              f" | 무거운 모듈: {', '.join(last['heavy']) or '없음'}"
+              f" | 시그널: {'등록' if last['signals'] else '없음'}"
+              f" | 세션: {last['sessions']}개 | S3: {'생성' if last['s3_client'] else '미생성'}")
+
+
+def _legacy_parse_product_options(soup) -> List[Dict]:
+    """이전 parse_product_options (선택자 7개 + find_previous) — 결과 비교 기준"""
+    options = []
+    option_selectors = [
+        "#sit_opt_added select", ".sit_opt_added select", "#sit_option select", ".sit_option select",
+        "select[name^='opt']", "select[id^='it_opt']", ".item_option select",
+    ]
+    for selector in option_selectors:
+        for select_tag in soup.select(selector):
+            option_name = ""
+            label = select_tag.find_previous("label")
+            if label:
+                option_name = label.get_text(strip=True)
+            else:
+                prev = select_tag.find_previous(string=True)
+                if prev:
+                    option_name = prev.strip().rstrip(":")
+            if not option_name:
+                name_attr = select_tag.get("name", "") or select_tag.get("id", "")
+                if "color" in name_attr.lower() or "컬러" in name_attr:
+                    option_name = "컬러"
+                elif "size" in name_attr.lower() or "사이즈" in name_attr:
+                    option_name = "사이즈"
+                else:
+                    option_name = "옵션"
+            option_values = []
+            for opt in select_tag.find_all("option"):
+                val = opt.get_text(strip=True)
+                if val and "선택" not in val and val != "-":
+                    price_add = 0
+                    if "(" in val and "원" in val:
+                        price_match = re.search(r"\(([+-]?\s*[\d,]+)\s*원\)", val)
+                        if price_match:
+                            try:
+                                price_add = int(price_match.group(1).replace(",", "").replace(" ", ""))
+                            except ValueError:
+                                pass
+                        val = re.sub(r"\([+-]?\s*[\d,]+\s*원\)", "", val).strip()
+                    val = re.sub(r"\s*[+-]\s*\d+\s*원", "", val).strip()
+                    if val:
+                        option_values.append({"value": val, "price_add": price_add})
+            if option_values:
+                options.append({"name": option_name, "values": option_values})
+    seen_names = set()
+    unique_options = []
+    for opt in options:
+        if opt["name"] not in seen_names:
+            seen_names.add(opt["name"])
+            unique_options.append(opt)
+    return unique_options
+
+
+def _synthetic_item_page(rng: random.Random, filler: int = 400) -> str:
+    """영카트 상품 상세와 비슷한 구조 (메뉴/본문 이미지 filler + 옵션 select 여러 개)"""
+    sizes = ["XS", "S", "M", "L", "XL", "XXL", "230", "240", "250", "260", "270", "280"]
+    colors = ["블랙", "화이트", "네이비", "베이지", "그레이", "브라운", "카키", "레드"]
+
+    def select(attrs: str, values: List[str]) -> str:
+        opts = ["<option value=''>선택하세요</option>", "<option>-</option>"]
+        for v in values:
+            suffix = rng.choice(["", " (+5,000원)", " (-1,000원)", " +3000원", "(+ 12,000 원)"])
+            opts.append(f"<option>{v}{suffix}</option>")
+        return f"<select {attrs}>{''.join(opts)}</select>"
+
+    parts = ["<!DOCTYPE html><html><head><title>상품</title><script>var g5_url='';</script></head><body>"]
+    if rng.random() < 0.5:
+        parts.append("<form id='hd_sch'><label for='sch_stx'>검색어</label><input id='sch_stx'></form>")
+    parts.append("<ul id='gnb'>" + "".join(
+        f"<li><a href='/shop/list.php?ca_id={i}'>카테고리 {i}</a></li>" for i in range(filler // 4)) + "</ul>")
+    parts.append("<div id='sit_ov'><h2 id='sit_title'>테스트 상품</h2><!-- 가격 --><table><tr><th>판매가격</th>"
+                 "<td>123,000원</td></tr></table>")
+    blocks = []
+    for i in range(rng.randint(1, 6)):
+        values = rng.sample(sizes if i % 2 == 0 else colors, rng.randint(0, 8))
+        name = rng.choice([f"it_option_{i}", f"opt_{i}", "", "color", "size"])
+        sel_id = rng.choice([f"it_option_{i}", f"it_opt_{i}", ""])
+        attrs = (f"name='{name}' " if name else "") + (f"id='{sel_id}'" if sel_id else "")
+        label = rng.choice(["", f"<label for='{sel_id}'>{rng.choice(['사이즈', '컬러', '옵션'])}</label>",
+                            "<span>사이즈 :</span>", "<!-- 옵션 -->", "\n  "])
+        wrap = rng.choice(["<div class='sit_option'>{}</div>", "<section id='sit_option'>{}</section>",
+                           "<div class='item_option extra'>{}</div>", "<div id='sit_opt_added'>{}</div>",
+                           "<td>{}</td>", "<label>{}</label>"])
+        blocks.append(wrap.format(label + select(attrs, values)))
+    parts.append("<section id='sit_opt_info'>" + "".join(blocks) + "</section></div>")
+    parts.append("<div id='sit_inf_explan'>" + "".join(
+        f"<p><img src='/data/editor/{i}.jpg'> 상세 설명 {i}</p>" for i in range(filler)) + "</div>")
+    parts.append("<div id='ft'>" + "<p>회사 정보</p>" * (filler // 10) + "</div></body></html>")
+    return "".join(parts)
+
+
+def bench_options() -> None:
+    """상품 옵션 파싱: 이전 구현(선택자 7개 + find_previous) vs 한 번 순회 — 결과 동일 여부 포함"""
+    from bs4 import BeautifulSoup
+    import replmoa_crawler as c
+
+    if PAGES_DIR:
+        paths = sorted(glob.glob(os.path.join(PAGES_DIR, "*.html")))
+        pages = {os.path.basename(p): open(p, encoding="utf-8", errors="replace").read() for p in paths}
+        source = f"{PAGES_DIR} ({len(pages)}개)"
+    else:
+        rng = random.Random(41)
+        pages = {f"synthetic-{i}": _synthetic_item_page(rng) for i in range(20)}
+        source = "합성 페이지 20개"
+    soups = {name: BeautifulSoup(html, "html.parser") for name, html in pages.items()}
+
+    # 결과 비교는 더 다양한 작은 합성 페이지까지 포함
+    check_rng = random.Random(7)
+    checks = list(soups.values()) + [
+        BeautifulSoup(_synthetic_item_page(check_rng, filler=20), "html.parser") for _ in range(300)
+    ]
+    mismatches = sum(_legacy_parse_product_options(s) != c.parse_product_options(s) for s in checks)
+
+    def timed(fn) -> float:
+        runs = []
+        for _ in range(OPTIONS_RUNS):
+            t0 = time.perf_counter()
+            for soup in soups.values():
+                fn(soup)
+            runs.append((time.perf_counter() - t0) * 1000 / len(soups))
+        return statistics.median(runs)
+
+    legacy_ms = timed(_legacy_parse_product_options)
+    new_ms = timed(c.parse_product_options)
+    print(f"[options] {source} | 이전 {legacy_ms:7.2f}ms/페이지 | 한 번 순회 {new_ms:7.2f}ms/페이지"
+          f" | {legacy_ms / new_ms:4.1f}배 | 결과 {len(checks)}건 중 불일치 {mismatches}건")
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    "startup": bench_startup,
+    "options": bench_options,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"알 수 없는 벤치마크: {name} (사용 가능: {', '.join(BENCHMARKS)})")
+            sys.exit(1)
+        BENCHMARKS[name]()
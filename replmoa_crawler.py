@@ -1,38 +1,56 @@
 import csv
+import gzip
 import json
 import os
 import random
 import time
 import io
 import hashlib
+import heapq
+import math
+import re
 import signal
+import socket
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Optional
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from bs4 import BeautifulSoup, NavigableString
+# psycopg2 / boto3 / httpx / pyarrow는 실제로 쓰는 시점에 import합니다 (라이브러리 import·기동 시간 단축)
 
 # ============================================
 # t3.small (2GB) 속도 최적화 설정
 # ============================================
 SPEED_MODE = os.environ.get("CRAWL_SPEED_MODE", "normal")  # "fast" 또는 "normal"
 
-if SPEED_MODE == "fast":
-    MAX_WORKERS = 10         # 동시 처리 워커 수
-    BATCH_SIZE = 30          # 배치 크기
-    SLEEP_BETWEEN_BATCH = 0.5  # 배치 간 대기 시간
-    SLEEP_BETWEEN_REQUEST = 0.3  # 요청 간 최소 대기
-    URL_COLLECT_WORKERS = 5   # URL 수집 동시 요청 수
-else:
-    MAX_WORKERS = 6          # 동시 처리 워커 수
-    BATCH_SIZE = 20          # 배치 크기
-    SLEEP_BETWEEN_BATCH = 1.0  # 배치 간 대기 시간
-    SLEEP_BETWEEN_REQUEST = 0.5  # 요청 간 최소 대기
-    URL_COLLECT_WORKERS = 3   # URL 수집 동시 요청 수
+SPEED_PRESETS = {
+    "fast": {
+        "workers": 10,         # 동시 처리 워커 수
+        "batch_size": 30,      # 배치 크기
+        "batch_sleep": 0.5,    # 배치 간 대기 시간
+        "request_sleep": 0.3,  # 요청 간 최소 대기
+        "collect_workers": 5,  # URL 수집 동시 요청 수
+    },
+    "normal": {
+        "workers": 6,
+        "batch_size": 20,
+        "batch_sleep": 1.0,
+        "request_sleep": 0.5,
+        "collect_workers": 3,
+    },
+}
+_speed = SPEED_PRESETS["fast" if SPEED_MODE == "fast" else "normal"]
+MAX_WORKERS = _speed["workers"]
+BATCH_SIZE = _speed["batch_size"]
+SLEEP_BETWEEN_BATCH = _speed["batch_sleep"]
+SLEEP_BETWEEN_REQUEST = _speed["request_sleep"]
+URL_COLLECT_WORKERS = _speed["collect_workers"]
 # ============================================
 SKIP_S3_UPLOAD = os.environ.get("CRAWL_SKIP_S3", "false").lower() == "true"
 # ============================================
@@ -40,18 +58,40 @@ SKIP_S3_UPLOAD = os.environ.get("CRAWL_SKIP_S3", "false").lower() == "true"
 # 중지 플래그 확인
 STOP_FLAG_PATH = os.environ.get("CRAWL_STOP_FLAG", "")
 STOP_REQUESTED = False
+STOP_EVENT = threading.Event()  # 프로세스 내부 중지 요청 (데몬 모드: 파일 확인 없이 즉시 반영)
+STOP_FLAG_INTERVAL = 0.5        # 중지 플래그 파일 확인 최소 간격(초)
+_stop_flag_checked_at = 0.0
 
 def check_stop_flag():
     """중지 요청 확인"""
-    global STOP_REQUESTED
-    if STOP_REQUESTED:
+    global STOP_REQUESTED, _stop_flag_checked_at
+    if STOP_REQUESTED or STOP_EVENT.is_set():
         return True
-    if STOP_FLAG_PATH and os.path.exists(STOP_FLAG_PATH):
+    if not STOP_FLAG_PATH:
+        return False
+    # 워커 future마다 호출되므로 파일 시스템 확인은 간격을 둠
+    now = time.monotonic()
+    if now - _stop_flag_checked_at < STOP_FLAG_INTERVAL:
+        return False
+    _stop_flag_checked_at = now
+    if os.path.exists(STOP_FLAG_PATH):
         STOP_REQUESTED = True
         print("\n[STOP] 중지 요청 감지됨! 크롤링을 종료합니다...")
         return True
     return False
 
+def reset_stop_request() -> None:
+    """새 작업 시작 전 이전 중지 요청(내부 이벤트/파일/시그널)을 모두 해제 (데몬은 작업마다 호출)"""
+    global STOP_REQUESTED, _stop_flag_checked_at
+    STOP_REQUESTED = False
+    STOP_EVENT.clear()
+    _stop_flag_checked_at = 0.0
+    if STOP_FLAG_PATH:
+        try:
+            os.remove(STOP_FLAG_PATH)  # 이전 작업의 중지 플래그가 남아 있으면 새 작업이 바로 멈춤
+        except FileNotFoundError:
+            pass
+
 def signal_handler(signum, frame):
     """시그널 핸들러 (SIGTERM, SIGINT)"""
     global STOP_REQUESTED
@@ -59,18 +99,12 @@ def signal_handler(signum, frame):
     print(f"\n[STOP] 시그널 {signum} 수신됨. 크롤링을 종료합니다...")
     sys.exit(0)
 
-# 시그널 핸들러 등록
-signal.signal(signal.SIGTERM, signal_handler)
-signal.signal(signal.SIGINT, signal_handler)
 
-# AWS S3 설정
-try:
-    import boto3
-    from botocore.exceptions import ClientError
-    S3_ENABLED = True
-except ImportError:
-    S3_ENABLED = False
-    print("[WARNING] boto3가 설치되어 있지 않습니다. pip install boto3로 설치해주세요.")
+def install_signal_handlers() -> None:
+    """SIGTERM/SIGINT 핸들러 등록 (스크립트로 실행할 때만 호출, 라이브러리 import 시에는 등록하지 않음)"""
+    signal.signal(signal.SIGTERM, signal_handler)
+    signal.signal(signal.SIGINT, signal_handler)
+
 
 # AWS S3 설정
 AWS_REGION = os.environ.get("AWS_REGION", "ap-northeast-2")
@@ -78,42 +112,281 @@ AWS_S3_BUCKET = os.environ.get("AWS_S3_BUCKET", "wiznoble-image")
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
 
-# S3 클라이언트 초기화
-s3_client = None
-if S3_ENABLED and AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY:
-    try:
-        s3_client = boto3.client(
-            's3',
-            region_name=AWS_REGION,
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-        )
-        print(f"[S3] AWS S3 연결 성공: {AWS_S3_BUCKET}")
-    except Exception as e:
-        print(f"[S3 ERROR] S3 클라이언트 초기화 실패: {e}")
-        s3_client = None
+# S3 클라이언트 (첫 업로드 시점에 생성, CRAWL_SKIP_S3=true이면 boto3를 import하지 않음)
+_s3_client = None
+_s3_client_ready = False
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client(skip_s3: bool = SKIP_S3_UPLOAD):
+    """
+    S3 클라이언트 반환. 사용 불가(스킵/키 없음/boto3 미설치/초기화 실패)면 None
+    skip_s3는 작업 단위 설정 (데몬은 기동 시 CRAWL_SKIP_S3와 다른 값의 작업을 받을 수 있음)
+    """
+    global _s3_client, _s3_client_ready
+    if skip_s3:
+        return None
+    if _s3_client_ready:
+        return _s3_client
+    with _s3_client_lock:
+        if _s3_client_ready:
+            return _s3_client
+        if AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY:
+            try:
+                import boto3
+            except ImportError:
+                boto3 = None
+                print("[WARNING] boto3가 설치되어 있지 않습니다. pip install boto3로 설치해주세요.")
+            if boto3 is not None:
+                try:
+                    _s3_client = boto3.client(
+                        's3',
+                        region_name=AWS_REGION,
+                        aws_access_key_id=AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=AWS_SECRET_ACCESS_KEY
+                    )
+                    print(f"[S3] AWS S3 연결 성공: {AWS_S3_BUCKET}")
+                except Exception as e:
+                    print(f"[S3 ERROR] S3 클라이언트 초기화 실패: {e}")
+                    _s3_client = None
+        _s3_client_ready = True
+        return _s3_client
+
+
+# 이미지 실패 캐시: URL → [만료 시각(epoch), 사유]. 실행 간 JSON 파일로 유지
+#   "fail": 404/타임아웃 등 다운로드 실패 (원본 URL 유지)
+#   "small"/"large": 헤더 검사에서 크기 범위를 벗어남 (상품 이미지에서 제외)
+IMAGE_FAIL_CACHE_PATH = os.environ.get("CRAWL_IMAGE_FAIL_CACHE", "image_fail_cache.json")
+IMAGE_FAIL_TTL_HOURS = float(os.environ.get("CRAWL_IMAGE_FAIL_TTL_HOURS", "24"))
+IMAGE_FAIL_SAVE_INTERVAL = 30.0  # 초, 실행 중 파일 기록 간격 (종료 시 flush_image_fail_cache)
+
+# 이미지 헤더 검사: 처음 몇 KB만 읽어 포맷/가로세로를 확인하고, 범위를 벗어나면 본문을 받지 않음
+IMAGE_MIN_SIDE = int(os.environ.get("CRAWL_IMAGE_MIN_SIDE", "50"))      # px, 아이콘/스페이서/추적 픽셀
+IMAGE_MAX_SIDE = int(os.environ.get("CRAWL_IMAGE_MAX_SIDE", "20000"))   # px
+IMAGE_MAX_BYTES = int(float(os.environ.get("CRAWL_IMAGE_MAX_MB", "10")) * 1024 * 1024)
+IMAGE_PROBE_BYTES = 64 * 1024  # 헤더를 찾는 최대 범위 (JPEG은 EXIF/썸네일 뒤에 SOF가 옴)
+IMAGE_CHUNK_SIZE = 16 * 1024
+
+_image_fail_cache: Optional[Dict[str, Tuple[float, str]]] = None
+_image_fail_lock = threading.Lock()
+_image_fail_dirty = False
+_image_fail_saved_at = 0.0
+
+# 같은 이미지를 동시에 요청한 워커는 먼저 시작한 다운로드/업로드 결과를 함께 사용 (singleflight)
+_image_inflight: Dict[Tuple[str, str], Future] = {}
+_image_inflight_lock = threading.Lock()
+image_fetch_stats = {"coalesced": 0, "fail_cache_hits": 0, "fail_cache_added": 0, "rejected": 0}
+
+
+def _get_image_fail_cache() -> Dict[str, Tuple[float, str]]:
+    """(_image_fail_lock 안에서 호출) 처음 쓸 때 파일에서 읽고 만료된 항목은 버림"""
+    global _image_fail_cache
+    if _image_fail_cache is None:
+        _image_fail_cache = {}
+        if IMAGE_FAIL_CACHE_PATH and os.path.exists(IMAGE_FAIL_CACHE_PATH):
+            try:
+                with open(IMAGE_FAIL_CACHE_PATH, encoding="utf-8") as f:
+                    data = json.load(f)
+                now = time.time()
+                for url, entry in data.items():
+                    until, reason = (entry, "fail") if isinstance(entry, (int, float)) else entry
+                    if float(until) > now:
+                        _image_fail_cache[url] = (float(until), str(reason))
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                print(f"[IMAGE] 실패 캐시를 읽지 못했습니다 (무시): {e}")
+    return _image_fail_cache
+
+
+def image_fail_reason(image_url: str) -> Optional[str]:
+    """TTL 안에 실패/제외된 이미지면 사유("fail", "small", "large"), 아니면 None"""
+    global _image_fail_dirty
+    with _image_fail_lock:
+        cache = _get_image_fail_cache()
+        entry = cache.get(image_url)
+        if entry is None:
+            return None
+        if entry[0] > time.time():
+            image_fetch_stats["fail_cache_hits"] += 1
+            return entry[1]
+        del cache[image_url]
+        _image_fail_dirty = True
+        return None
+
+
+def mark_image_bad(image_url: str, reason: str = "fail") -> None:
+    """실패/제외 이미지를 TTL 동안 기록 (일정 간격으로 파일에 반영)"""
+    global _image_fail_dirty
+    with _image_fail_lock:
+        _get_image_fail_cache()[image_url] = (time.time() + IMAGE_FAIL_TTL_HOURS * 3600, reason)
+        _image_fail_dirty = True
+        image_fetch_stats["fail_cache_added"] += 1
+        due = time.time() - _image_fail_saved_at >= IMAGE_FAIL_SAVE_INTERVAL
+    if due:
+        flush_image_fail_cache()
 
 
-def upload_image_to_s3(image_url: str, prefix: str = "crawled") -> Optional[str]:
+def flush_image_fail_cache() -> None:
+    """변경된 실패 캐시를 파일에 기록 (임시 파일에 쓴 뒤 교체)"""
+    global _image_fail_dirty, _image_fail_saved_at
+    with _image_fail_lock:
+        if not _image_fail_dirty or not IMAGE_FAIL_CACHE_PATH or _image_fail_cache is None:
+            return
+        now = time.time()
+        data = {url: list(entry) for url, entry in _image_fail_cache.items() if entry[0] > now}
+        tmp_path = f"{IMAGE_FAIL_CACHE_PATH}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, IMAGE_FAIL_CACHE_PATH)
+            _image_fail_dirty = False
+        except OSError as e:
+            print(f"[IMAGE] 실패 캐시 저장 실패 (무시): {e}")
+        _image_fail_saved_at = now
+
+
+def upload_image_to_s3(image_url: str, prefix: str = "crawled", skip_s3: bool = SKIP_S3_UPLOAD) -> Optional[str]:
     """
     외부 이미지 URL을 다운로드하여 S3에 업로드
-    Returns: S3 URL 또는 None (실패 시)
+    Returns: S3 URL, 실패 시 원본 URL, 크기 범위를 벗어난 이미지(아이콘/초대형)는 None
     """
+    s3_client = get_s3_client(skip_s3)
     if not s3_client:
         return image_url  # S3 사용 불가 시 원본 URL 반환
     
     if not image_url or not image_url.startswith("http"):
         return image_url
     
+    reason = image_fail_reason(image_url)
+    if reason == "fail":
+        return image_url  # 최근 실패한 이미지: 타임아웃까지 기다리지 않고 원본 URL 유지
+    if reason:
+        return None
+    
+    key = (image_url, prefix)
+    with _image_inflight_lock:
+        future = _image_inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _image_inflight[key] = Future()
+        else:
+            image_fetch_stats["coalesced"] += 1
+    if not leader:
+        return future.result()
+    
+    s3_url: Optional[str] = image_url
     try:
-        # 이미지 다운로드
-        response = http_session.get(image_url, timeout=30)
-        if response.status_code != 200:
-            print(f"[S3] 이미지 다운로드 실패: {image_url}")
+        s3_url = _download_and_upload_image(s3_client, image_url, prefix)
+    finally:
+        with _image_inflight_lock:
+            _image_inflight.pop(key, None)
+        future.set_result(s3_url)
+    return s3_url
+
+
+def parse_image_header(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """
+    이미지 앞부분에서 (포맷, 가로, 세로) 추출 (PNG/GIF/WebP/JPEG).
+    아직 헤더가 다 오지 않았거나 모르는 포맷이면 None
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        if len(data) >= 24 and data[12:16] == b"IHDR":
+            return "png", int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")
+        return None
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) >= 10:
+            return "gif", int.from_bytes(data[6:8], "little"), int.from_bytes(data[8:10], "little")
+        return None
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        chunk = data[12:16]
+        if chunk == b"VP8 " and len(data) >= 30:
+            return ("webp", int.from_bytes(data[26:28], "little") & 0x3FFF,
+                    int.from_bytes(data[28:30], "little") & 0x3FFF)
+        if chunk == b"VP8L" and len(data) >= 25:
+            bits = int.from_bytes(data[21:25], "little")
+            return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X" and len(data) >= 30:
+            return "webp", int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+        return None
+    if data[:2] == b"\xff\xd8":
+        # 세그먼트를 따라가며 SOFn(프레임 헤더) 마커를 찾음
+        i = 2
+        while i + 9 <= len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                i += 1 if marker == 0xFF else 2
+                continue
+            if marker == 0xDA:  # 스캔 데이터 시작 전에 SOF가 없었음
+                return None
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                return "jpeg", int.from_bytes(data[i + 7:i + 9], "big"), int.from_bytes(data[i + 5:i + 7], "big")
+            i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def image_size_violation(width: int, height: int) -> Optional[str]:
+    """가로/세로가 허용 범위를 벗어나면 "small"/"large", 아니면 None"""
+    if min(width, height) < IMAGE_MIN_SIDE:
+        return "small"
+    if max(width, height) > IMAGE_MAX_SIDE:
+        return "large"
+    return None
+
+
+def is_cacheable_image_error(exc: Exception) -> bool:
+    """실패 캐시에 기록할 다운로드 오류인지 (타임아웃/연결 실패/4xx만, 그 외 일시적인 오류는 다음에 다시 시도)"""
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return 400 <= exc.response.status_code < 500 and exc.response.status_code != 429
+    httpx = sys.modules.get("httpx")  # HTTP/2 클라이언트를 쓸 때만 import되어 있음
+    return httpx is not None and isinstance(exc, (httpx.TimeoutException, httpx.NetworkError))
+
+
+def _download_and_upload_image(s3_client, image_url: str, prefix: str) -> Optional[str]:
+    """이미지 1개 다운로드(헤더 검사 → 본문) → S3 업로드 (실패하면 원본 URL, 크기 범위 밖이면 None)"""
+    try:
+        # 스트리밍으로 읽으면서 앞부분 헤더로 크기를 판정하고, 본문은 IMAGE_MAX_BYTES까지만 받음
+        # (타임아웃/연결 실패/4xx는 실패 캐시에 기록)
+        rejected = None
+        try:
+            with open_image_stream(image_url, timeout=30) as response:
+                if response.status_code != 200:
+                    if 400 <= response.status_code < 500 and response.status_code != 429:
+                        mark_image_bad(image_url)
+                    print(f"[S3] 이미지 다운로드 실패: {image_url}")
+                    return image_url
+                content_type = response.headers.get('Content-Type', 'image/jpeg')
+                try:
+                    if int(response.headers.get("Content-Length") or 0) > IMAGE_MAX_BYTES:
+                        rejected = "large"
+                except ValueError:
+                    pass
+                body = bytearray()
+                header = None
+                for chunk in ([] if rejected else response.chunks):
+                    body += chunk
+                    if header is None and len(body) - len(chunk) < IMAGE_PROBE_BYTES:
+                        header = parse_image_header(bytes(body[:IMAGE_PROBE_BYTES]))
+                        if header:
+                            rejected = image_size_violation(header[1], header[2])
+                    if not rejected and len(body) > IMAGE_MAX_BYTES:
+                        rejected = "large"
+                    if rejected:
+                        break
+        except Exception as e:
+            if is_cacheable_image_error(e):
+                mark_image_bad(image_url)
+            print(f"[S3] 이미지 다운로드 실패 ({image_url}): {e}")
             return image_url
+        if rejected:
+            mark_image_bad(image_url, rejected)
+            image_fetch_stats["rejected"] += 1
+            return None
         
         # 파일 확장자 결정
-        content_type = response.headers.get('Content-Type', 'image/jpeg')
         ext_map = {
             'image/jpeg': '.jpg',
             'image/jpg': '.jpg',
@@ -138,7 +411,7 @@ def upload_image_to_s3(image_url: str, prefix: str = "crawled") -> Optional[str]
         s3_client.put_object(
             Bucket=AWS_S3_BUCKET,
             Key=s3_key,
-            Body=response.content,
+            Body=bytes(body),
             ContentType=content_type,
         )
         
@@ -151,21 +424,23 @@ def upload_image_to_s3(image_url: str, prefix: str = "crawled") -> Optional[str]
         return image_url  # 실패 시 원본 URL 반환
 
 
-def upload_images_batch_to_s3(image_urls: List[str], prefix: str = "crawled") -> List[str]:
+def upload_images_batch_to_s3(image_urls: List[str], prefix: str = "crawled",
+                              skip_s3: bool = SKIP_S3_UPLOAD) -> List[str]:
     """
     여러 이미지를 병렬로 S3에 업로드 (순서 보장)
-    Returns: S3 URL 리스트 (원래 순서 유지)
+    Returns: S3 URL 리스트 (원래 순서 유지, 크기 범위를 벗어난 이미지는 None)
     """
-    if not s3_client or not image_urls:
+    if not image_urls or not get_s3_client(skip_s3):
         return image_urls
     
     # 순서 보장을 위해 인덱스와 함께 처리
     s3_urls = [None] * len(image_urls)
     
-    with ThreadPoolExecutor(max_workers=3) as executor:  # S3 업로드는 3개로 제한
+    # 이미지 풀 크기와 맞춤 (메모리 압박 중이면 1개씩 → 동시에 메모리에 올라가는 이미지 본문 수 제한)
+    with ThreadPoolExecutor(max_workers=memory_watchdog.image_workers()) as executor:
         # (index, url) 튜플로 제출하여 순서 추적
         futures = {
-            executor.submit(upload_image_to_s3, url, prefix): (idx, url) 
+            executor.submit(upload_image_to_s3, url, prefix, skip_s3): (idx, url) 
             for idx, url in enumerate(image_urls)
         }
         for future in as_completed(futures):
@@ -197,17 +472,170 @@ HEADERS = {
     "Connection": "keep-alive",
 }
 
-# HTTP Session (연결 재사용 → TCP handshake 절약, 속도 2~3배 향상)
-http_session = requests.Session()
-http_session.headers.update(HEADERS)
-# 연결 풀 크기를 워커 수에 맞춰 설정
-adapter = requests.adapters.HTTPAdapter(
-    pool_connections=MAX_WORKERS + URL_COLLECT_WORKERS,
-    pool_maxsize=MAX_WORKERS + URL_COLLECT_WORKERS,
-    max_retries=2
-)
-http_session.mount('https://', adapter)
-http_session.mount('http://', adapter)
+# ============================================
+# HTTP 연결 풀 (트래픽 종류별 분리)
+# 상품 페이지 / 리스트·사이트맵 / 이미지가 한 풀을 공유하면 중첩된 이미지 스레드풀이
+# pool_maxsize를 넘겨 연결이 버려지고 TLS handshake가 반복되므로 풀을 나눠서 관리
+# ============================================
+IMAGE_UPLOAD_WORKERS = 3  # 상품 1개당 이미지 동시 업로드 수
+HTTP_POOL_SIZES = {
+    "page": MAX_WORKERS,                           # 상품 상세 페이지 (워커당 1개)
+    "list": URL_COLLECT_WORKERS + 1,               # 카테고리 리스트 페이지 + 사이트맵
+    "image": MAX_WORKERS * IMAGE_UPLOAD_WORKERS,   # 워커마다 이미지 스레드풀이 중첩됨
+}
+HTTP_POOL_HOSTS = 10  # 클래스별로 캐시할 호스트(풀) 수
+# 상품 페이지는 RetryScheduler가 재시도를 관리하므로 어댑터 레벨 재시도 없음
+HTTP_POOL_RETRIES = {
+    "page": 0,
+    "list": 2,
+    "image": 1,
+}
+
+# 선택: 이미지 CDN 호스트는 HTTP/2 클라이언트로 다중화 (pip install "httpx[http2]")
+IMAGE_HTTP2 = os.environ.get("CRAWL_IMAGE_HTTP2", "false").lower() == "true"
+IMAGE_HTTP2_HOSTS = {
+    h.strip().lower()
+    for h in os.environ.get("CRAWL_IMAGE_HTTP2_HOSTS", "replmoa1.com").split(",")
+    if h.strip()
+}
+
+
+def _build_http_session(pool_size: int, max_retries: int = 2) -> requests.Session:
+    """연결 풀 크기를 지정한 세션 생성 (풀이 가득 차면 새 연결 대신 반납을 기다림)"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=pool_size,
+        max_retries=max_retries,
+        pool_block=True,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# HTTP Session (연결 재사용 → TCP handshake 절약, 속도 2~3배 향상). 종류별로 처음 쓸 때 생성
+http_sessions: Dict[str, requests.Session] = {}
+_http_sessions_lock = threading.Lock()
+_image_http2_client = None
+_image_http2_lock = threading.Lock()
+_image_http2_requests = 0
+
+
+def get_http_session(kind: str) -> requests.Session:
+    """트래픽 종류("page", "list", "image")에 맞는 세션 반환"""
+    session = http_sessions.get(kind)
+    if session is None:
+        with _http_sessions_lock:
+            session = http_sessions.get(kind)
+            if session is None:
+                session = _build_http_session(HTTP_POOL_SIZES[kind], HTTP_POOL_RETRIES[kind])
+                http_sessions[kind] = session
+    return session
+
+
+def ensure_http_pool_size(kind: str, size: int) -> None:
+    """풀이 size보다 작으면 다음 요청부터 더 큰 풀의 세션을 사용 (진행 중 요청은 기존 세션에서 끝남)"""
+    with _http_sessions_lock:
+        if size <= HTTP_POOL_SIZES[kind]:
+            return
+        HTTP_POOL_SIZES[kind] = size
+        http_sessions.pop(kind, None)
+
+
+def _get_image_http2_client():
+    """이미지 CDN용 HTTP/2 클라이언트 (최초 사용 시 생성, 실패하면 HTTP/1.1 풀 사용)"""
+    global _image_http2_client, IMAGE_HTTP2
+    with _image_http2_lock:
+        if _image_http2_client is None and IMAGE_HTTP2:
+            try:
+                import httpx
+            except ImportError:
+                IMAGE_HTTP2 = False
+                print("[WARNING] httpx가 설치되어 있지 않아 이미지 HTTP/2를 사용하지 않습니다. pip install \"httpx[http2]\"로 설치해주세요.")
+                return None
+            try:
+                _image_http2_client = httpx.Client(
+                    http2=True,
+                    headers=HEADERS,
+                    limits=httpx.Limits(
+                        max_connections=HTTP_POOL_HOSTS,
+                        max_keepalive_connections=HTTP_POOL_HOSTS,
+                    ),
+                    follow_redirects=True,
+                )
+                print(f"[HTTP] 이미지 HTTP/2 클라이언트 활성화: {', '.join(sorted(IMAGE_HTTP2_HOSTS))}")
+            except ImportError as e:
+                IMAGE_HTTP2 = False
+                print(f"[WARNING] HTTP/2 클라이언트 생성 실패 (h2 미설치?): {e}")
+        return _image_http2_client
+
+
+class ImageStream:
+    """open_image_stream 응답: status_code, headers, chunks(본문 조각 iterator)"""
+
+    def __init__(self, status_code: int, headers, chunks: Iterator[bytes]):
+        self.status_code = status_code
+        self.headers = headers
+        self.chunks = chunks
+
+
+@contextmanager
+def open_image_stream(image_url: str, timeout: float = 30) -> Iterator[ImageStream]:
+    """
+    이미지 응답을 스트리밍으로 엽니다. HTTP/2 대상 호스트면 httpx 클라이언트로 다중화하고,
+    그 외에는 이미지 전용 연결 풀을 사용합니다. 본문을 다 읽기 전에 닫으면 나머지는 받지 않습니다.
+    """
+    global _image_http2_requests
+    if IMAGE_HTTP2 and (urlparse(image_url).hostname or "").lower() in IMAGE_HTTP2_HOSTS:
+        client = _get_image_http2_client()
+        if client is not None:
+            with _image_http2_lock:
+                _image_http2_requests += 1
+            with client.stream("GET", image_url, timeout=timeout) as response:
+                yield ImageStream(response.status_code, response.headers, response.iter_bytes(IMAGE_CHUNK_SIZE))
+            return
+    response = get_http_session("image").get(image_url, timeout=timeout, stream=True)
+    try:
+        yield ImageStream(response.status_code, response.headers, response.iter_content(IMAGE_CHUNK_SIZE))
+    finally:
+        response.close()
+
+
+def get_http_pool_stats() -> Dict[str, Dict[str, int]]:
+    """
+    트래픽 종류별 keep-alive 재사용 지표.
+    requests: 보낸 요청 수, connections: 새로 연 연결(= TCP/TLS handshake) 수
+    """
+    stats = {}
+    for kind, session in list(http_sessions.items()):
+        total_requests = 0
+        total_connections = 0
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                total_requests += pool.num_requests
+                total_connections += pool.num_connections
+        stats[kind] = {"requests": total_requests, "connections": total_connections}
+    if _image_http2_client is not None:
+        stats["image-h2"] = {"requests": _image_http2_requests, "connections": 0}
+    return stats
+
+
+def format_http_pool_stats() -> str:
+    parts = []
+    for kind, st in get_http_pool_stats().items():
+        if not st["requests"]:
+            continue
+        reuse = (1 - st["connections"] / st["requests"]) * 100
+        parts.append(f"{kind} {st['requests']:,}요청/{st['connections']:,}연결 (재사용 {reuse:.0f}%)")
+    return " | ".join(parts) or "요청 없음"
+
+
 CSV_FILENAME = "replmoa_products.csv"
 DB_CONFIG = {
     "host": os.environ.get("DB_HOST", "localhost"),
@@ -218,9 +646,132 @@ DB_CONFIG = {
 }
 _raw_limit = os.environ.get("CRAWL_LIMIT", "500")
 MAX_SAVE = 999999 if _raw_limit == "0" else int(_raw_limit)  # 0 = 무제한 (전체 크롤링)
+# 시간 제한: "04:00"(다음 04:00 KST까지) 또는 "+90m"/"+2h"(시작 시점부터). 비어 있으면 개수 제한만
+CRAWL_DEADLINE = os.environ.get("CRAWL_DEADLINE", "").strip()
+DEADLINE_MARGIN = int(os.environ.get("CRAWL_DEADLINE_MARGIN", "120"))  # 마감 전 정리(버퍼 기록, 요약 등)에 남길 초
 CATEGORY_FILTER = os.environ.get("CRAWL_CATEGORY", "")  # 예: "남성", "여성", "남성 > 지갑" 등
 URL_SOURCE = os.environ.get("CRAWL_URL_SOURCE", "both")  # "sitemap", "category", "both"
+# 증분 카테고리 수집: 리스트는 최신순이므로 DB에 이미 있는 상품만 N페이지 연속으로 나오면 그 카테고리는 중단
+CATEGORY_INCREMENTAL = os.environ.get("CRAWL_CATEGORY_INCREMENTAL", "false").lower() == "true"
+CATEGORY_KNOWN_PAGES = max(1, int(os.environ.get("CRAWL_CATEGORY_KNOWN_PAGES", "2")))
+CATEGORY_MAX_FAILED_PAGES = 5  # 리스트 페이지 로드가 연속으로 실패하면 그 카테고리 순회 중단
 MAX_DB_PRICE = 9999999999999.99  # numeric(15,2) 확장 후 상한 (약 10조원)
+# true면 이미 수집한 상품도 다시 가져와서, 내용이 바뀐 상품만 갱신
+REFRESH_EXISTING = os.environ.get("CRAWL_REFRESH", "false").lower() == "true"
+# 모델 코드(상품명의 제조사 품번)가 같은 기존 상품이 있을 때 (다른 it_id/카테고리로 중복 등록된 상품)
+#   link: 새 상품을 만들지 않고 it_id를 기존 상품에 연결 (crawler_items.duplicate_of)
+#   skip: 저장하지 않음 (다음 실행에서 다시 판정)
+#   reuse: 별도 상품으로 저장하되 이미지는 기존 상품 것을 재사용 (다운로드/업로드 없음)
+#   off: 모델 코드로 판정하지 않음
+DUPLICATE_POLICY = os.environ.get("CRAWL_DUPLICATE_POLICY", "link").lower()
+
+# 크롤러 전용 상태 테이블 (it_id ↔ product_id 매핑, 콘텐츠 지문)
+CRAWLER_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS crawler_items (
+        it_id VARCHAR(32) PRIMARY KEY,
+        product_id INTEGER REFERENCES products(id) ON DELETE CASCADE,
+        fingerprint CHAR(64),
+        first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_fetched_at TIMESTAMP,
+        last_changed_at TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_crawler_items_product ON crawler_items(product_id)",
+    # 필터에 걸러진 상품의 카테고리 (다음 실행에서 큐 투입 전에 제외)
+    "ALTER TABLE crawler_items ADD COLUMN IF NOT EXISTS category TEXT",
+    # 재방문 스케줄: 가져온 횟수/변경 감지 횟수 → 변경률(회/일) 추정 → 다음 방문 시각
+    "ALTER TABLE crawler_items ADD COLUMN IF NOT EXISTS fetch_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE crawler_items ADD COLUMN IF NOT EXISTS change_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE crawler_items ADD COLUMN IF NOT EXISTS change_rate DOUBLE PRECISION",
+    "ALTER TABLE crawler_items ADD COLUMN IF NOT EXISTS next_due_at TIMESTAMP",
+    "CREATE INDEX IF NOT EXISTS idx_crawler_items_due ON crawler_items(next_due_at) WHERE product_id IS NOT NULL",
+    # 원본 사이트에서 사라져 크롤러가 비활성화한 시각 (다시 나타나면 재활성화)
+    "ALTER TABLE crawler_items ADD COLUMN IF NOT EXISTS delisted_at TIMESTAMP",
+    # 상세 설명 이미지 (순서 보존, description 대신 사용; backend/scripts/addProductImagesAndSearch.sql)
+    """
+    CREATE TABLE IF NOT EXISTS product_images (
+        id SERIAL PRIMARY KEY,
+        product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        image_url TEXT NOT NULL,
+        sort_order INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(product_id, sort_order)
+    )
+    """,
+    # 상품명에서 추출한 모델 코드 ('' = 코드 없음, NULL = 아직 추출 전) → 교차 등록 중복 판정
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS model_code VARCHAR(32)",
+    "CREATE INDEX IF NOT EXISTS idx_products_model_code ON products(model_code) WHERE model_code <> ''",
+    "ALTER TABLE crawler_items ADD COLUMN IF NOT EXISTS duplicate_of INTEGER REFERENCES products(id) ON DELETE CASCADE",
+    # 가격 이력 (append-only, 신규/변경 시에만 기록). 월 단위 파티션은 ensure_price_history_partitions
+    """
+    CREATE TABLE IF NOT EXISTS product_price_history (
+        product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        observed_at TIMESTAMP NOT NULL,
+        price NUMERIC(15, 2),
+        department_price NUMERIC(15, 2)
+    ) PARTITION BY RANGE (observed_at)
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_price_history_product ON product_price_history(product_id, observed_at)",
+]
+
+PRICE_HISTORY_BATCH = 500  # 가격 관찰을 모아서 한 번에 기록할 행 수
+_price_history_months = set()  # 이 프로세스에서 이미 확인한 월 파티션 (year, month)
+
+
+def ensure_crawler_schema(cur) -> None:
+    """크롤러가 사용하는 상태 테이블을 (없으면) 생성합니다."""
+    for statement in CRAWLER_SCHEMA_SQL:
+        cur.execute(statement)
+
+
+def ensure_price_history_partitions(cur, *timestamps: float) -> None:
+    """관찰 시각(epoch)이 속한 월 파티션을 없으면 생성 (DB 시간대 차이를 감안해 앞뒤 2일 포함)"""
+    for ts in timestamps or (time.time(),):
+        for offset in (-2 * 86400, 0, 2 * 86400):
+            local = time.localtime(ts + offset)
+            key = (local.tm_year, local.tm_mon)
+            if key in _price_history_months:
+                continue
+            year, month = key
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            cur.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS product_price_history_{year}{month:02d}
+                PARTITION OF product_price_history
+                FOR VALUES FROM ('{year}-{month:02d}-01') TO ('{next_year}-{next_month:02d}-01')
+                """
+            )
+            _price_history_months.add(key)
+
+
+def write_price_history(cur, rows: List[tuple]) -> None:
+    """(product_id, 관찰 epoch, price, department_price) 행을 일괄 INSERT"""
+    from psycopg2.extras import execute_values
+    if not rows:
+        return
+    ensure_price_history_partitions(cur, min(r[1] for r in rows), max(r[1] for r in rows))
+    execute_values(
+        cur,
+        "INSERT INTO product_price_history (product_id, observed_at, price, department_price) VALUES %s",
+        rows,
+        template="(%s, to_timestamp(%s)::timestamp, %s, %s)",
+        page_size=PRICE_HISTORY_BATCH,
+    )
+
+
+def load_due_urls(cur, limit: int) -> List[str]:
+    """재방문 시각이 지난 상품 URL (한 번도 스케줄되지 않은 상품 → 변경이 잦은 상품 순)"""
+    cur.execute(
+        """
+        SELECT it_id FROM crawler_items
+        WHERE product_id IS NOT NULL AND (next_due_at IS NULL OR next_due_at <= NOW())
+        ORDER BY next_due_at NULLS FIRST, change_rate DESC NULLS LAST
+        LIMIT %s
+        """,
+        (limit,),
+    )
+    return [f"{BASE_URL}/shop/item.php?it_id={row['it_id']}" for row in cur.fetchall()]
 
 # 메모리 관리를 위한 gc import
 import gc
@@ -237,6 +788,116 @@ def slugify(txt: str) -> str:
     return slug or "etc"
 
 
+# 카테고리 이름 → slug 매핑 (normalize_category_4depth, replmoa_scale.py 합성 카탈로그에서 공유)
+# 대분류 매핑
+CATEGORY_MAIN_MAP = {
+    "남성": "men",
+    "여성": "women",
+    "국내출고상품": "domestic",
+    "국내출고 상품": "domestic",
+    "국내출고": "domestic",
+    "국내 출고": "domestic",
+}
+
+# 중분류 매핑 (상품 종류)
+CATEGORY_SUB_MAP = {
+    "가방": "bag",
+    "지갑": "wallet",
+    "시계": "watch",
+    "신발": "shoes",
+    "벨트": "belt",
+    "악세서리": "accessory",
+    "액세서리": "accessory",
+    "모자": "hat",
+    "의류": "clothing",
+    "선글라스&안경": "glasses",
+    "선글라스": "glasses",
+    "안경": "glasses",
+    "기타": "etc",
+    "가방&지갑": "bag-wallet",
+    "패션잡화": "fashion",
+    "생활&주방용품": "home",
+    "향수": "perfume",
+    "라이터": "lighter",
+}
+
+# 세부 카테고리 매핑 (depth4 - 가방/지갑/신발/의류 하위 등)
+CATEGORY_DETAIL_MAP = {
+    # 가방 하위
+    "크로스&숄더백": "crossbody-shoulder",
+    "크로스백": "crossbody",
+    "숄더백": "shoulder",
+    "토트백": "tote",
+    "클러치": "clutch",
+    "클러치&파우치": "clutch-pouch",
+    "파우치": "pouch",
+    "백팩": "backpack",
+    "서류가방": "briefcase",
+    "여행가방": "luggage",
+    "미니백": "mini",
+    "핸드백": "handbag",
+    "호보백": "hobo",
+    "버킷백": "bucket",
+    # 지갑 하위
+    "카드지갑": "card-wallet",
+    "반지갑": "half-wallet",
+    "장지갑": "long-wallet",
+    "지퍼월렛": "zip-wallet",
+    "코인지갑": "coin-wallet",
+    "키홀더": "key-holder",
+    # 신발 하위
+    "스니커즈": "sneakers",
+    "로퍼": "loafer",
+    "부츠": "boots",
+    "샌들": "sandal",
+    "슬리퍼": "slipper",
+    "힐": "heel",
+    "플랫": "flat",
+    "뮬": "mule",
+    # 의류 하위
+    "아우터": "outer",
+    "자켓": "jacket",
+    "코트": "coat",
+    "패딩": "padding",
+    "다운": "down",
+    "점퍼": "jumper",
+    "상의": "top",
+    "티셔츠": "tshirt",
+    "반팔": "short-sleeve",
+    "긴팔": "long-sleeve",
+    "니트": "knit",
+    "맨투맨": "sweatshirt",
+    "후드": "hoodie",
+    "셔츠": "shirt",
+    "블라우스": "blouse",
+    "하의": "bottom",
+    "팬츠": "pants",
+    "바지": "pants",
+    "청바지": "jeans",
+    "데님": "denim",
+    "스커트": "skirt",
+    "치마": "skirt",
+    "반바지": "shorts",
+    "원피스": "dress",
+    "드레스": "dress",
+    "정장": "suit",
+    "트레이닝": "training",
+    "세트": "set",
+    # 악세서리 하위
+    "목걸이": "necklace",
+    "팔찌": "bracelet",
+    "반지": "ring",
+    "귀걸이": "earring",
+    "브로치": "brooch",
+    "스카프": "scarf",
+    "머플러": "muffler",
+    "넥타이": "necktie",
+    "장갑": "gloves",
+    "양말": "socks",
+}
+
+
+
 def normalize_category_4depth(cat_raw: str) -> Dict[str, any]:
     """
     '남성 > 가방 > 고야드 > 크로스&숄더백' 형태를 4뎁스 카테고리 정보로 변환
@@ -244,113 +905,6 @@ def normalize_category_4depth(cat_raw: str) -> Dict[str, any]:
     """
     parts = [p.strip() for p in cat_raw.split(">") if p.strip()]
     
-    # 대분류 매핑
-    main_map = {
-        "남성": "men",
-        "여성": "women",
-        "국내출고상품": "domestic",
-        "국내출고 상품": "domestic",
-        "국내출고": "domestic",
-        "국내 출고": "domestic",
-    }
-    
-    # 중분류 매핑 (상품 종류)
-    sub_map = {
-        "가방": "bag",
-        "지갑": "wallet",
-        "시계": "watch",
-        "신발": "shoes",
-        "벨트": "belt",
-        "악세서리": "accessory",
-        "액세서리": "accessory",
-        "모자": "hat",
-        "의류": "clothing",
-        "선글라스&안경": "glasses",
-        "선글라스": "glasses",
-        "안경": "glasses",
-        "기타": "etc",
-        "가방&지갑": "bag-wallet",
-        "패션잡화": "fashion",
-        "생활&주방용품": "home",
-        "향수": "perfume",
-        "라이터": "lighter",
-    }
-    
-    # 세부 카테고리 매핑 (depth4 - 가방/지갑/신발/의류 하위 등)
-    detail_map = {
-        # 가방 하위
-        "크로스&숄더백": "crossbody-shoulder",
-        "크로스백": "crossbody",
-        "숄더백": "shoulder",
-        "토트백": "tote",
-        "클러치": "clutch",
-        "클러치&파우치": "clutch-pouch",
-        "파우치": "pouch",
-        "백팩": "backpack",
-        "서류가방": "briefcase",
-        "여행가방": "luggage",
-        "미니백": "mini",
-        "핸드백": "handbag",
-        "호보백": "hobo",
-        "버킷백": "bucket",
-        # 지갑 하위
-        "카드지갑": "card-wallet",
-        "반지갑": "half-wallet",
-        "장지갑": "long-wallet",
-        "지퍼월렛": "zip-wallet",
-        "코인지갑": "coin-wallet",
-        "키홀더": "key-holder",
-        # 신발 하위
-        "스니커즈": "sneakers",
-        "로퍼": "loafer",
-        "부츠": "boots",
-        "샌들": "sandal",
-        "슬리퍼": "slipper",
-        "힐": "heel",
-        "플랫": "flat",
-        "뮬": "mule",
-        # 의류 하위
-        "아우터": "outer",
-        "자켓": "jacket",
-        "코트": "coat",
-        "패딩": "padding",
-        "다운": "down",
-        "점퍼": "jumper",
-        "상의": "top",
-        "티셔츠": "tshirt",
-        "반팔": "short-sleeve",
-        "긴팔": "long-sleeve",
-        "니트": "knit",
-        "맨투맨": "sweatshirt",
-        "후드": "hoodie",
-        "셔츠": "shirt",
-        "블라우스": "blouse",
-        "하의": "bottom",
-        "팬츠": "pants",
-        "바지": "pants",
-        "청바지": "jeans",
-        "데님": "denim",
-        "스커트": "skirt",
-        "치마": "skirt",
-        "반바지": "shorts",
-        "원피스": "dress",
-        "드레스": "dress",
-        "정장": "suit",
-        "트레이닝": "training",
-        "세트": "set",
-        # 악세서리 하위
-        "목걸이": "necklace",
-        "팔찌": "bracelet",
-        "반지": "ring",
-        "귀걸이": "earring",
-        "브로치": "brooch",
-        "스카프": "scarf",
-        "머플러": "muffler",
-        "넥타이": "necktie",
-        "장갑": "gloves",
-        "양말": "socks",
-    }
-    
     result = {
         "depth1": None,
         "depth2": None,
@@ -363,14 +917,14 @@ def normalize_category_4depth(cat_raw: str) -> Dict[str, any]:
     # 대분류 (depth1) - 성별/유형: 남성, 여성, 국내출고상품
     if parts:
         main_name = parts[0]
-        main_slug = main_map.get(main_name, slugify(main_name))
+        main_slug = CATEGORY_MAIN_MAP.get(main_name, slugify(main_name))
         result["depth1"] = {"name": main_name, "slug": main_slug}
         result["leaf_slug"] = main_slug
     
     # 중분류 (depth2) - 상품 종류: 가방, 지갑, 시계 등
     if len(parts) > 1:
         sub_name = parts[1]
-        sub_slug_base = sub_map.get(sub_name, slugify(sub_name))
+        sub_slug_base = CATEGORY_SUB_MAP.get(sub_name, slugify(sub_name))
         sub_slug = f"{result['depth1']['slug']}-{sub_slug_base}"
         result["depth2"] = {"name": sub_name, "slug": sub_slug, "parent_slug": result["depth1"]["slug"]}
         result["leaf_slug"] = sub_slug
@@ -385,7 +939,7 @@ def normalize_category_4depth(cat_raw: str) -> Dict[str, any]:
     # 세부분류 (depth4) - 세부 카테고리: 크로스&숄더백, 토트백 등
     if len(parts) > 3:
         detail_name = parts[3]
-        detail_slug_base = detail_map.get(detail_name, slugify(detail_name))
+        detail_slug_base = CATEGORY_DETAIL_MAP.get(detail_name, slugify(detail_name))
         detail_slug = f"{result['depth3']['slug']}-{detail_slug_base}"
         result["depth4"] = {"name": detail_name, "slug": detail_slug, "parent_slug": result["depth3"]["slug"]}
         result["leaf_slug"] = detail_slug
@@ -413,11 +967,150 @@ def normalize_category(cat_raw: str) -> Dict[str, str]:
     return {"name": name, "slug": cat_info["leaf_slug"] or "etc"}
 
 
+# ============================================
+# 카테고리 / 상품 행 변환 (크롤러 저장과 CSV 일괄 적재가 공유)
+# cur는 RealDictCursor, cache는 slug → {"id", "parent_slug"}
+# ============================================
+def load_category_cache(cur) -> Dict[str, Dict[str, any]]:
+    """기존 카테고리를 한 번에 읽어 slug 캐시를 만듭니다 (상품마다 SELECT 하지 않도록)"""
+    cur.execute("SELECT id, slug, parent_slug FROM categories")
+    return {row["slug"]: {"id": row["id"], "parent_slug": row["parent_slug"]} for row in cur.fetchall()}
+
+
+def ensure_category_row(cur, name: str, slug: str, parent_id: int = None, parent_slug: str = None,
+                        depth: int = 1, cache: Optional[Dict[str, Dict[str, any]]] = None) -> int:
+    """slug로 카테고리를 찾고 없으면 생성 (캐시가 있으면 DB 조회 생략)"""
+    cached = cache.get(slug) if cache is not None else None
+    if cached is None:
+        cur.execute("SELECT id, parent_slug FROM categories WHERE slug=%s", (slug,))
+        row = cur.fetchone()
+        if row:
+            cached = {"id": row["id"], "parent_slug": row["parent_slug"]}
+    if cached is not None:
+        if parent_slug and not cached["parent_slug"]:
+            cur.execute(
+                "UPDATE categories SET parent_slug=%s WHERE slug=%s AND (parent_slug IS NULL OR parent_slug = '')",
+                (parent_slug, slug)
+            )
+            cached["parent_slug"] = parent_slug
+        if cache is not None:
+            cache[slug] = cached
+        return cached["id"]
+    cur.execute(
+        "INSERT INTO categories (name, slug, parent_id, parent_slug, depth, description) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
+        (name, slug, parent_id, parent_slug, depth, "imported from crawler"),
+    )
+    category_id = cur.fetchone()["id"]
+    if cache is not None:
+        cache[slug] = {"id": category_id, "parent_slug": parent_slug}
+    return category_id
+
+
+def resolve_category_id(cur, cat_raw: str, cache: Optional[Dict[str, Dict[str, any]]] = None) -> int:
+    """'남성 > 가방 > 고야드 > 크로스&숄더백'을 4뎁스 카테고리 행으로 보장하고 최하위 id 반환"""
+    cat_info = normalize_category_4depth(cat_raw)
+    
+    parent_id = None
+    parent_slug = None
+    final_id = None
+    
+    for depth, key in enumerate(["depth1", "depth2", "depth3", "depth4"], start=1):
+        info = cat_info[key]
+        if not info:
+            break
+        final_id = ensure_category_row(cur, info["name"], info["slug"], parent_id, parent_slug, depth, cache)
+        parent_id = final_id
+        parent_slug = info["slug"]
+    
+    return final_id or ensure_category_row(cur, "기타", "etc", None, None, 1, cache)
+
+
+def to_price(val: str) -> float:
+    digits = "".join([c for c in val if c.isdigit()])
+    return float(digits) if digits else 0.0
+
+
+def product_row_values(info: Dict[str, any]) -> tuple:
+    """info → products 테이블 컬럼 값 (name, description, price, department_price, image_url)"""
+    price_val = to_price(info.get("판매가격") or "")
+    department_price = to_price(info.get("시중가격") or "")
+    
+    if price_val and price_val > MAX_DB_PRICE:
+        price_val = MAX_DB_PRICE
+    if department_price and department_price > MAX_DB_PRICE:
+        department_price = MAX_DB_PRICE
+        
+    # 설명 이미지는 product_images로 분리 (description에는 원본 URL만 남겨 it_id 역추적 호환 유지)
+    description = info.get("URL", "")
+    image_url = info.get("대표이미지") or ""
+    return (info["상품명"], description, price_val,
+            department_price if department_price > 0 else None, image_url)
+
+
+def product_image_rows(product_id, info: Dict[str, any]) -> List[tuple]:
+    """info → product_images 행 (product_id, image_url, sort_order)"""
+    urls = [u.strip() for u in (info.get("설명이미지들") or "").split(";") if u.strip()]
+    return [(product_id, url, order) for order, url in enumerate(urls)]
+
+
+# 모델 코드 후보: 영문/숫자 토큰 (예: 1MV204, 2VH069, M82034, 577283, 126518LN, NS.1800)
+MODEL_CODE_TOKEN_RE = re.compile(r"^[A-Z0-9][A-Z0-9./-]{3,24}$")
+MODEL_CODE_UNIT_RE = re.compile(r"^\d+(?:ML|MM|CM|KG|OZ)$")  # 용량/치수는 코드가 아님
+INVISIBLE_CHARS_RE = re.compile("[\u200b-\u200f\u202a-\u202e\u2066-\u2069\ufeff]")
+
+
+def extract_model_code(name: str) -> Optional[str]:
+    """
+    상품명에서 정규화한 모델 코드 추출 (뒤쪽 토큰부터, 없으면 None).
+    숫자가 있고 문자+숫자 조합이거나 숫자 5자리 이상인 5~16자만 인정 (사이즈 '41', '37.5', 연도 등 제외)
+    """
+    for token in reversed(INVISIBLE_CHARS_RE.sub("", name or "").upper().split()):
+        token = token.strip("()[]")
+        if not MODEL_CODE_TOKEN_RE.match(token) or MODEL_CODE_UNIT_RE.match(token):
+            continue
+        code = re.sub(r"[./-]", "", token)
+        digits = sum(ch.isdigit() for ch in code)
+        if 5 <= len(code) <= 16 and digits and (digits < len(code) or digits >= 5):
+            return code
+    return None
+
+
+def _title_tokens(name: str, code: str) -> List[str]:
+    tokens = INVISIBLE_CHARS_RE.sub("", name or "").upper().split()
+    return [t for t in tokens if re.sub(r"[./-]", "", t.strip("()[]")) != code]
+
+
+def same_listing(name_a: str, name_b: str, code: str) -> bool:
+    """
+    모델 코드가 같은 두 상품명이 같은 상품인지: 코드를 뺀 나머지가 같거나,
+    긴 쪽에서 맨 앞 단어(브랜드명) 하나만 더 붙은 경우.
+    (디올 '2ESCA'처럼 코드 하나를 여러 상품이 공유하거나, 같은 코드의 다른 패턴 상품은 별개로 봄)
+    """
+    a, b = _title_tokens(name_a, code), _title_tokens(name_b, code)
+    if len(a) < len(b):
+        a, b = b, a
+    return a == b or (len(a) == len(b) + 1 and a[1:] == b)
+
+
+def backfill_model_codes(cur) -> int:
+    """model_code가 아직 없는(NULL) 상품의 상품명에서 모델 코드를 채움 (코드가 없으면 '')"""
+    from psycopg2.extras import execute_values
+    cur.execute("SELECT id, name FROM products WHERE model_code IS NULL")
+    rows = [(row["id"], extract_model_code(row["name"]) or "") for row in cur.fetchall()]
+    if rows:
+        execute_values(
+            cur,
+            "UPDATE products p SET model_code = v.code FROM (VALUES %s) AS v(id, code) WHERE p.id = v.id",
+            rows,
+        )
+    return len(rows)
+
+
 def get_product_urls_from_sitemap() -> List[str]:
     """사이트맵에서 상품 상세 페이지 URL을 추출합니다."""
     print(f"[SITEMAP] 사이트맵 불러오는 중: {SITEMAP_URL}")
     try:
-        response = http_session.get(SITEMAP_URL, timeout=15)
+        response = get_http_session("list").get(SITEMAP_URL, timeout=15)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, "xml")
 
@@ -439,6 +1132,21 @@ def get_product_urls_from_sitemap() -> List[str]:
 # ============================================
 BASE_URL = "https://replmoa1.com"
 
+IT_ID_RE = re.compile(r"it_id=(\d+)")
+
+
+def extract_it_id(url: str) -> Optional[str]:
+    """상품 URL에서 it_id를 추출합니다."""
+    m = IT_ID_RE.search(url or "")
+    return m.group(1) if m else None
+
+
+def canonical_item_url(url: str) -> str:
+    """사이트맵/리스트에서 온 상품 URL을 it_id 기준 표준 형태로 통일"""
+    it_id = extract_it_id(url)
+    return f"{BASE_URL}/shop/item.php?it_id={it_id}" if it_id else (url or "").strip()
+
+
 # 알려진 최상위 카테고리 ID
 KNOWN_TOP_CATEGORIES = {
     "10": "남성",
@@ -448,18 +1156,19 @@ KNOWN_TOP_CATEGORIES = {
 
 
 
-def get_product_urls_from_category_page(ca_id: str, page: int = 1) -> List[str]:
+def get_product_urls_from_category_page(ca_id: str, page: int = 1) -> Optional[List[str]]:
     """
     카테고리 리스트 페이지에서 상품 URL을 추출합니다.
-    Returns: 해당 페이지의 상품 URL 리스트 (빈 리스트면 마지막 페이지)
+    Returns: 해당 페이지의 상품 URL 리스트 (빈 리스트면 마지막 페이지, None이면 가져오기 실패)
     """
     import re
     url = f"{BASE_URL}/shop/list.php?ca_id={ca_id}&page={page}"
     try:
         time.sleep(SLEEP_BETWEEN_REQUEST)
-        response = http_session.get(url, timeout=15)
+        response = get_http_session("list").get(url, timeout=15)
         if response.status_code != 200:
-            return []
+            print(f"[CATEGORY] 페이지 로드 실패 ({ca_id}, page={page}): HTTP {response.status_code}")
+            return None
         
         soup = BeautifulSoup(response.text, "html.parser")
         
@@ -492,11 +1201,11 @@ def get_product_urls_from_category_page(ca_id: str, page: int = 1) -> List[str]:
         
     except Exception as e:
         print(f"[CATEGORY] 페이지 로드 실패 ({ca_id}, page={page}): {e}")
-        return []
+        return None
 
 
-def _fetch_category_page_batch(ca_id: str, pages: List[int]) -> Dict[int, List[str]]:
-    """여러 페이지를 병렬로 가져옵니다."""
+def _fetch_category_page_batch(ca_id: str, pages: List[int]) -> Dict[int, Optional[List[str]]]:
+    """여러 페이지를 병렬로 가져옵니다. (실패한 페이지는 None — 빈 페이지와 구분)"""
     results = {}
     
     def fetch_one(page):
@@ -509,25 +1218,37 @@ def _fetch_category_page_batch(ca_id: str, pages: List[int]) -> Dict[int, List[s
                 page, urls = future.result()
                 results[page] = urls
             except Exception:
-                results[futures[future]] = []
+                results[futures[future]] = None
     
     return results
 
 
-def get_product_urls_from_categories(category_filter: str = "") -> List[str]:
+def iter_product_urls_from_categories(category_filter: str = "",
+                                      is_known: Optional[Callable[[Optional[str]], bool]] = None,
+                                      known_pages: int = CATEGORY_KNOWN_PAGES,
+                                      stopped_early: Optional[Set[str]] = None) -> Iterator[Tuple[str, List[str]]]:
     """
-    최상위 카테고리(남성/여성/국내출고) 리스트 페이지를 끝까지 순회하며 
-    모든 상품 URL을 수집합니다.
-    
-    병렬 페이지 수집: 한 번에 여러 페이지를 동시에 요청하여 수집 속도를 대폭 향상합니다.
+    최상위 카테고리(남성/여성/국내출고) 리스트 페이지를 끝까지 순회하며
+    페이지 단위로 새로 발견한 상품 URL을 바로 내보내는 스트리밍 제너레이터.
+
+    병렬 페이지 수집: 한 번에 여러 페이지를 동시에 요청하고, 페이지 번호 순으로
+    (ca_id, 신규 URL 리스트)를 yield 합니다. 소비자가 느리면 제너레이터도 멈추므로
+    bounded 큐와 함께 쓰면 자연스럽게 backpressure가 걸립니다.
+
+    증분 모드: is_known(it_id)을 넘기면 페이지의 모든 it_id가 이미 아는 상품인 페이지가
+    known_pages번 연속될 때 그 카테고리를 중단합니다 (리스트는 최신순이라 이후는 전부 기존 상품).
+    가져오지 못한 페이지는 건너뛰고(연속 실패가 이어지면 카테고리 중단), 증분 중단과 함께
+    stopped_early에 ca_id를 기록하므로 호출자는 목록이 끝까지 읽히지 않았음을 알 수 있습니다.
     """
-    import re
     print("[CATEGORY] 카테고리 리스트 페이지에서 상품 URL 수집 시작...")
     print(f"[CATEGORY] 병렬 수집 모드 (동시 {URL_COLLECT_WORKERS}페이지씩)")
     
     # 크롤링 대상 최상위 카테고리 결정
     target_categories = dict(KNOWN_TOP_CATEGORIES)
     
+    if is_known:
+        print(f"[CATEGORY] 증분 모드: 기존 상품만 {known_pages}페이지 연속이면 카테고리 중단")
+    
     if category_filter:
         filter_lower = category_filter.lower().strip().split(">")[0].strip()
         filtered = {}
@@ -538,8 +1259,8 @@ def get_product_urls_from_categories(category_filter: str = "") -> List[str]:
             target_categories = filtered
             print(f"[CATEGORY] 필터 '{category_filter}' 적용: {list(target_categories.values())}")
     
-    all_urls = []
     seen_urls = set()
+    total_urls = 0
     
     for ca_id, cat_name in target_categories.items():
         if check_stop_flag():
@@ -550,6 +1271,8 @@ def get_product_urls_from_categories(category_filter: str = "") -> List[str]:
         max_pages = 2000
         cat_urls = 0
         consecutive_no_new = 0
+        consecutive_known = 0
+        consecutive_failed = 0
         finished = False
         
         while page <= max_pages and not finished:
@@ -568,29 +1291,49 @@ def get_product_urls_from_categories(category_filter: str = "") -> List[str]:
                 
                 urls = batch_results[p]
                 
+                # 가져오기 실패: 마지막 페이지로 보지 않고 건너뜀 (목록 불완전 → 판매 종료 정리 안 함)
+                if urls is None:
+                    if stopped_early is not None:
+                        stopped_early.add(ca_id)
+                    consecutive_failed += 1
+                    if consecutive_failed >= CATEGORY_MAX_FAILED_PAGES:
+                        print(f"[CATEGORY] '{cat_name}' page={p}: {consecutive_failed}페이지 연속 로드 실패 → 중단")
+                        finished = True
+                        break
+                    continue
+                consecutive_failed = 0
+                
                 # 상품이 없으면 마지막 페이지
                 if not urls:
                     print(f"[CATEGORY] '{cat_name}' page={p}: 상품 없음 → 완료")
                     finished = True
                     break
                 
-                # 현재 페이지의 it_id 추출
-                current_ids = set()
-                for u in urls:
-                    m = re.search(r"it_id=(\d+)", u)
-                    if m:
-                        current_ids.add(m.group(1))
-                
-                new_count = 0
+                new_urls = []
                 for url in urls:
                     if url not in seen_urls:
                         seen_urls.add(url)
-                        all_urls.append(url)
-                        new_count += 1
-                        cat_urls += 1
+                        new_urls.append(url)
+                cat_urls += len(new_urls)
+                total_urls += len(new_urls)
+                
+                # 증분 모드: 페이지 전체가 DB에 있는 상품이면 카운트 (신규가 하나라도 있으면 초기화)
+                if is_known:
+                    if all(is_known(extract_it_id(url)) for url in urls):
+                        consecutive_known += 1
+                    else:
+                        consecutive_known = 0
+                    if consecutive_known >= known_pages:
+                        if new_urls:
+                            yield ca_id, new_urls
+                        print(f"[CATEGORY] '{cat_name}' page={p}: {known_pages}페이지 연속 기존 상품만 → 증분 수집 중단")
+                        if stopped_early is not None:
+                            stopped_early.add(ca_id)
+                        finished = True
+                        break
                 
                 # 새 URL이 없으면 카운트
-                if new_count == 0:
+                if not new_urls:
                     consecutive_no_new += 1
                     if consecutive_no_new >= 3:
                         print(f"[CATEGORY] '{cat_name}' page={p}: 3페이지 연속 새 URL 없음 → 완료")
@@ -598,6 +1341,8 @@ def get_product_urls_from_categories(category_filter: str = "") -> List[str]:
                         break
                 else:
                     consecutive_no_new = 0
+                    # 페이지 단위로 즉시 전달 (소비자가 처리할 때까지 여기서 대기할 수 있음)
+                    yield ca_id, new_urls
             
             # 진행 상황 로그
             if page % 50 < URL_COLLECT_WORKERS:
@@ -607,7 +1352,19 @@ def get_product_urls_from_categories(category_filter: str = "") -> List[str]:
         
         print(f"[CATEGORY] '{cat_name}': 총 {cat_urls}개 상품 URL 수집 완료 (~{page-1}페이지)")
     
-    print(f"[CATEGORY] 카테고리 리스트에서 총 {len(all_urls)}개 상품 URL 수집 완료")
+    print(f"[CATEGORY] 카테고리 리스트에서 총 {total_urls}개 상품 URL 수집 완료")
+
+
+def get_product_urls_from_categories(category_filter: str = "",
+                                     is_known: Optional[Callable[[Optional[str]], bool]] = None,
+                                     known_pages: int = CATEGORY_KNOWN_PAGES) -> List[str]:
+    """
+    카테고리 리스트 페이지의 모든 상품 URL을 리스트로 반환합니다.
+    (iter_product_urls_from_categories의 일괄 수집 래퍼, is_known을 넘기면 증분 모드)
+    """
+    all_urls: List[str] = []
+    for _ca_id, page_urls in iter_product_urls_from_categories(category_filter, is_known, known_pages):
+        all_urls.extend(page_urls)
     return all_urls
 
 
@@ -641,127 +1398,918 @@ def get_product_urls() -> List[str]:
                 new_from_category += 1
         print(f"[COLLECT] 카테고리 페이지에서 {len(category_urls)}개 수집 (신규: {new_from_category}개)")
     
-    # 3. URL 셔플 (특정 카테고리에 편중되지 않도록)
-    random.shuffle(all_urls)
+    # 3. 우선순위 정렬 (기본: it_id 기준 최신 상품 먼저, CRAWL_PRIORITY로 변경)
+    all_urls.sort(key=get_priority_scorer(), reverse=True)
     
     print(f"[COLLECT] 총 {len(all_urls)}개 고유 상품 URL 수집 완료")
     return all_urls
 
 
-def parse_product_options(soup: BeautifulSoup) -> List[Dict[str, any]]:
-    """상품 옵션(사이즈, 컬러 등)을 추출합니다."""
-    options = []
-    
-    option_selectors = [
-        "#sit_opt_added select",
-        ".sit_opt_added select",
-        "#sit_option select",
-        ".sit_option select",
-        "select[name^='opt']",
-        "select[id^='it_opt']",
-        ".item_option select",
-    ]
-    
-    for selector in option_selectors:
-        for select_tag in soup.select(selector):
-            option_name = ""
-            label = select_tag.find_previous("label")
-            if label:
-                option_name = label.get_text(strip=True)
-            else:
-                prev = select_tag.find_previous(string=True)
-                if prev:
-                    option_name = prev.strip().rstrip(":")
-            
-            if not option_name:
-                name_attr = select_tag.get("name", "") or select_tag.get("id", "")
-                if "color" in name_attr.lower() or "컬러" in name_attr:
-                    option_name = "컬러"
-                elif "size" in name_attr.lower() or "사이즈" in name_attr:
-                    option_name = "사이즈"
-                else:
-                    option_name = "옵션"
-            
-            option_values = []
-            for opt in select_tag.find_all("option"):
-                val = opt.get_text(strip=True)
-                if val and "선택" not in val and val != "-":
-                    import re
-                    price_add = 0
-                    if "(" in val and "원" in val:
-                        price_match = re.search(r"\(([+-]?\s*[\d,]+)\s*원\)", val)
-                        if price_match:
-                            price_str = price_match.group(1).replace(",", "").replace(" ", "")
-                            try:
-                                price_add = int(price_str)
-                            except:
-                                pass
-                        val = re.sub(r"\([+-]?\s*[\d,]+\s*원\)", "", val).strip()
-                    
-                    val = re.sub(r"\s*[+-]\s*\d+\s*원", "", val).strip()
-                    
-                    if val:
-                        option_values.append({
-                            "value": val,
-                            "price_add": price_add
-                        })
-            
-            if option_values:
-                options.append({
-                    "name": option_name,
-                    "values": option_values
-                })
-    
-    seen_names = set()
-    unique_options = []
-    for opt in options:
-        if opt["name"] not in seen_names:
-            seen_names.add(opt["name"])
-            unique_options.append(opt)
-    
-    return unique_options
+# ============================================
+# URL 프론티어 (수집 스레드 → 크롤링 루프)
+# ============================================
+FRONTIER_MAXSIZE = int(os.environ.get("CRAWL_FRONTIER_SIZE", str(BATCH_SIZE * 10)))
+PRIORITY_MODE = os.environ.get("CRAWL_PRIORITY", "recency").lower().strip()  # "recency", "random", "fifo"
 
 
-def parse_product_detail(url: str, upload_to_s3: bool = True) -> Optional[Dict[str, any]]:
-    """개별 상품 페이지에서 정보를 추출합니다."""
-    try:
-        # 랜덤 지연 (차단 방지)
-        time.sleep(random.uniform(0.3, 1.5))
-        response = http_session.get(url, timeout=20)
-        if response.status_code != 200:
-            return None
+def score_by_recency(url: str) -> float:
+    """it_id가 등록 시각(Unix timestamp)이므로 값이 클수록 최신 상품 → 먼저 처리"""
+    it_id = extract_it_id(url)
+    return float(it_id) if it_id else 0.0
 
-        soup = BeautifulSoup(response.text, "html.parser")
 
-        # 1. 상품명 추출
-        title_tag = soup.select_one("#sit_title") or soup.select_one(".stitle")
-        title = title_tag.text.strip() if title_tag else "상품명 없음"
+def score_random(url: str) -> float:
+    return random.random()
 
-        # 2. 카테고리 추출
-        category = ""
-        sit_ov = soup.select_one("#sit_ov")
-        if sit_ov:
-            text_candidates = [
-                t.strip()
-                for t in sit_ov.stripped_strings
-                if ">" in t and "상품간략정보" not in t
-            ]
-            if text_candidates:
-                category = text_candidates[0]
 
-        # 3. 시중가격 / 판매가격
-        market_price = ""
-        sale_price = ""
-        market_tag = soup.select_one(".price_wr.price_og span")
-        sale_tag = soup.select_one(".price_wr.price span")
-        if market_tag:
-            market_price = market_tag.get_text(strip=True)
-        if sale_tag:
-            sale_price = sale_tag.get_text(strip=True)
+def score_fifo(url: str) -> float:
+    return 0.0  # 동점이면 들어온 순서대로
 
-        # 4. 대표 이미지 URL 추출
-        img_tag = soup.select_one("#sit_pvi_big img") or soup.select_one(".sit_pvi img")
-        img_url = ""
+
+PRIORITY_SCORERS: Dict[str, Callable[[str], float]] = {
+    "recency": score_by_recency,
+    "random": score_random,
+    "fifo": score_fifo,
+}
+
+
+def get_priority_scorer(mode: str = PRIORITY_MODE) -> Callable[[str], float]:
+    return PRIORITY_SCORERS.get(mode, score_by_recency)
+
+
+class UrlFrontier:
+    """
+    URL 수집 스레드(생산자)와 크롤링 루프(소비자) 사이의 bounded 우선순위 큐.
+
+    - put(): 큐가 가득 차면 소비될 때까지 블로킹 (sleep 폴링 대신 backpressure)
+      admit(url)이 제외 사유를 반환하면 큐에 넣지 않고 사유별로 집계만 함
+    - 버킷(사이트맵, 카테고리 ca_id 등)마다 score(url) 내림차순 힙을 두고
+      get_batch()는 버킷을 돌아가며 꺼냄 → 최신 상품 우선이면서 카테고리 분산 유지
+      (strict_priority면 버킷과 무관하게 점수가 가장 높은 URL부터: 시간 제한 모드)
+    - get_batch(): URL이 하나라도 들어올 때까지 (timeout초까지) 대기 후 최대 size개를 꺼냄
+    - put_delayed(): 재시도 URL을 지정한 시간 뒤에 다시 꺼낼 수 있도록 예약
+    - producer_done(): 생산자가 모두 끝나고 큐와 재시도 예약이 비는 순간 exhausted
+    - close(): 소비자가 먼저 끝날 때 호출 → 블로킹된 생산자를 깨워 종료시킴
+    """
+
+    def __init__(self, maxsize: int = FRONTIER_MAXSIZE, producers: int = 1,
+                 admit: Optional[Callable[[str], Optional[str]]] = None,
+                 score: Optional[Callable[[str], float]] = None):
+        self.maxsize = max(1, maxsize)
+        self.discovered = 0
+        self.admit = admit
+        self.score = score or get_priority_scorer()
+        self.rejected: Dict[str, int] = {}
+        self._buckets: Dict[str, List[Tuple[float, int, str]]] = {}  # 버킷별 (-score, seq, url) 힙
+        self._bucket_order = deque()  # 라운드로빈 순서
+        self.strict_priority = False
+        self._size = 0
+        self._seq = 0
+        self._ready_retries = deque()  # 기한이 된 재시도 URL (가장 먼저 꺼냄)
+        self._delayed = []  # (ready_at, seq, url) 힙
+        self._delayed_seq = 0
+        self._seen = set()
+        self._producers = producers
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def exhausted(self) -> bool:
+        """생산자가 모두 끝났고 남은 URL도 없는지"""
+        with self._cond:
+            return self._closed or (self._producers <= 0 and not len(self) and not self._delayed)
+
+    @property
+    def pending_retries(self) -> int:
+        return len(self._delayed)
+
+    def __len__(self) -> int:
+        return self._size + len(self._ready_retries)
+
+    def seen_it_ids(self) -> set:
+        """이번 실행에서 발견한 상품 it_id (사전 제외된 URL 포함)"""
+        with self._cond:
+            return {extract_it_id(url) for url in self._seen} - {None}
+
+    def put(self, url: str, bucket: str = "default") -> bool:
+        """URL을 추가합니다. 중복이거나 프론티어가 닫혔으면 False"""
+        clean = canonical_item_url(url)
+        with self._cond:
+            if not clean or clean in self._seen or self._closed:
+                return False
+            self._seen.add(clean)
+            reason = self.admit(clean) if self.admit else None
+            if reason:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+                return False
+            while self._size >= self.maxsize and not self._closed:
+                if check_stop_flag():
+                    return False
+                self._cond.wait(timeout=1.0)
+            if self._closed:
+                return False
+            if bucket not in self._buckets:
+                self._buckets[bucket] = []
+                self._bucket_order.append(bucket)
+            self._seq += 1
+            heapq.heappush(self._buckets[bucket], (-self.score(clean), self._seq, clean))
+            self._size += 1
+            self.discovered += 1
+            self._cond.notify_all()
+            return True
+
+    def put_delayed(self, url: str, delay: float) -> None:
+        """재시도 URL을 delay초 뒤에 꺼낼 수 있도록 예약 (중복 체크/용량 제한 없음)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._delayed_seq += 1
+            heapq.heappush(self._delayed, (time.time() + max(0.0, delay), self._delayed_seq, url))
+            self._cond.notify_all()
+
+    def _promote_due(self) -> Optional[float]:
+        """기한이 된 재시도 URL을 큐 앞쪽으로 옮기고, 다음 예약까지 남은 시간을 반환"""
+        now = time.time()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, url = heapq.heappop(self._delayed)
+            self._ready_retries.append(url)
+        return self._delayed[0][0] - now if self._delayed else None
+
+    def _pop_next(self) -> Optional[str]:
+        """재시도 URL → 버킷 라운드로빈(각 버킷은 점수 높은 순)"""
+        if self._ready_retries:
+            return self._ready_retries.popleft()
+        if self.strict_priority:
+            heads = [(heap[0], bucket) for bucket, heap in self._buckets.items() if heap]
+            if not heads:
+                return None
+            _, bucket = min(heads)  # (-score, seq): 점수가 가장 높고 먼저 들어온 URL
+            _, _, url = heapq.heappop(self._buckets[bucket])
+            self._size -= 1
+            return url
+        while self._bucket_order:
+            bucket = self._bucket_order.popleft()
+            heap = self._buckets[bucket]
+            if not heap:
+                del self._buckets[bucket]
+                continue
+            _, _, url = heapq.heappop(heap)
+            self._size -= 1
+            self._bucket_order.append(bucket)
+            return url
+        return None
+
+    def get_batch(self, size: int, timeout: Optional[float] = None) -> List[str]:
+        """
+        최대 size개의 URL을 꺼냅니다. 비어 있으면 생산자가 넣거나 재시도 기한이 될 때까지
+        대기하며, exhausted 이거나 중지 요청이 있거나 timeout초가 지나면 빈 리스트를 반환합니다.
+        """
+        give_up_at = time.time() + timeout if timeout is not None else None
+        with self._cond:
+            while not self._closed:
+                next_due = self._promote_due()
+                if len(self) or (self._producers <= 0 and next_due is None):
+                    break
+                if check_stop_flag() or (give_up_at is not None and time.time() >= give_up_at):
+                    return []
+                self._cond.wait(timeout=min(1.0, next_due) if next_due is not None else 1.0)
+            batch = []
+            while len(batch) < size:
+                url = self._pop_next()
+                if url is None:
+                    break
+                batch.append(url)
+            if batch:
+                self._cond.notify_all()
+            return batch
+
+    def producer_done(self) -> None:
+        with self._cond:
+            self._producers -= 1
+            self._cond.notify_all()
+
+    def complete(self, url: str, status: str = "done") -> bool:
+        """URL 처리 완료 표시. 이 프로세스가 결과를 저장해도 되면 True"""
+        return True
+
+    def throttle(self) -> None:
+        """요청 전 전역 속도 제한 (로컬 프론티어는 배치 대기로 조절하므로 없음)"""
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def format_rejected(rejected: Dict[str, int]) -> str:
+    """프론티어 사전 제외 집계를 한 줄로"""
+    return ", ".join(f"{reason} {n:,}개" for reason, n in rejected.items()) or "없음"
+
+
+# ============================================
+# 분산 크롤링: Postgres 공유 작업 큐
+# 여러 크롤러 프로세스/호스트가 하나의 프론티어를 나눠 처리
+# (SELECT ... FOR UPDATE SKIP LOCKED로 선점, 리스 + 하트비트, 전역 속도 제한)
+# ============================================
+COORDINATOR = os.environ.get("CRAWL_COORDINATOR", "").lower().strip()  # "" 또는 "postgres"
+CRAWL_ROLE = os.environ.get("CRAWL_ROLE", "coordinator").lower().strip()  # "coordinator" 또는 "worker"
+NODE_ID = os.environ.get("CRAWL_NODE_ID", "") or f"{socket.gethostname()}-{os.getpid()}"
+LEASE_SECONDS = int(os.environ.get("CRAWL_LEASE_SECONDS", "120"))
+GLOBAL_RATE = float(os.environ.get("CRAWL_GLOBAL_RATE", "0"))  # 전체 노드 합산 초당 상품 페이지 요청 수 (0 = 제한 없음)
+WORKER_JOIN_TIMEOUT = int(os.environ.get("CRAWL_WORKER_WAIT", "60"))  # 워커가 실행 중인 크롤을 기다리는 시간
+# 리스 만료로 회수된 횟수가 이만큼이면 failed 처리 (가져가는 노드마다 죽게 만드는 URL이 무한히 돌지 않게)
+LEASE_MAX_ATTEMPTS = int(os.environ.get("CRAWL_LEASE_MAX_ATTEMPTS", "5"))
+
+DISTRIBUTED_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS crawl_runs (
+        id SERIAL PRIMARY KEY,
+        started_by VARCHAR(128),
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        discovery_done BOOLEAN DEFAULT false,
+        finished_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS crawl_frontier (
+        run_id INTEGER NOT NULL REFERENCES crawl_runs(id) ON DELETE CASCADE,
+        url TEXT NOT NULL,
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        priority DOUBLE PRECISION DEFAULT 0,
+        attempts INTEGER DEFAULT 0,
+        next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        lease_owner VARCHAR(128),
+        lease_expires_at TIMESTAMP,
+        PRIMARY KEY (run_id, url)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_crawl_frontier_claim ON crawl_frontier(run_id, status, next_attempt_at)",
+    # 참여 노드의 마지막 하트비트 (죽은 coordinator가 남긴 미종료 실행에 워커가 합류하지 않게)
+    "ALTER TABLE crawl_runs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP",
+    """
+    CREATE TABLE IF NOT EXISTS crawl_rate_limits (
+        name VARCHAR(64) PRIMARY KEY,
+        tokens DOUBLE PRECISION NOT NULL,
+        updated_at TIMESTAMP NOT NULL DEFAULT clock_timestamp()
+    )
+    """,
+]
+
+
+class PostgresFrontier:
+    """
+    UrlFrontier와 같은 인터페이스의 Postgres 기반 공유 프론티어.
+
+    - coordinator: 새 crawl_runs 행을 만들고 URL 수집 결과를 crawl_frontier에 적재
+    - worker: 진행 중인 최신 run에 합류해 작업만 선점
+    - 선점한 URL은 lease_owner/lease_expires_at으로 리스하고 하트비트 스레드가 연장.
+      프로세스가 죽으면 리스가 만료되어 다른 노드가 다시 가져감
+    - complete(): 리스를 아직 보유한 경우에만 done 처리 → 저장은 최대 한 번
+    """
+
+    FLUSH_SIZE = 200
+
+    def __init__(self, db_config: Dict, role: str = CRAWL_ROLE, producers: int = 1,
+                 node_id: str = NODE_ID, lease_seconds: int = LEASE_SECONDS,
+                 global_rate: float = GLOBAL_RATE,
+                 admit: Optional[Callable[[str], Optional[str]]] = None,
+                 score: Optional[Callable[[str], float]] = None):
+        self.node_id = node_id
+        self.admit = admit
+        self.score = score or get_priority_scorer()
+        self.rejected: Dict[str, int] = {}
+        self._seen = set()
+        self.lease_seconds = lease_seconds
+        self.global_rate = global_rate
+        self.maxsize = self.FLUSH_SIZE
+        self.is_coordinator = role != "worker"
+        self._producers = producers if self.is_coordinator else 0
+        self._closed = False
+        self._buffer: List[str] = []
+        self._stats_cache = (0.0, 0, 0)  # (조회 시각, 전체 URL 수, 재시도 대기 수)
+        self._lock = threading.RLock()
+        import psycopg2
+        self._conn = psycopg2.connect(**db_config)
+        self._conn.autocommit = True
+        self._cur = self._conn.cursor()
+        for statement in DISTRIBUTED_SCHEMA_SQL:
+            self._cur.execute(statement)
+
+        if self.is_coordinator:
+            self._cur.execute(
+                "INSERT INTO crawl_runs (started_by, heartbeat_at) VALUES (%s, NOW()) RETURNING id", (node_id,)
+            )
+            self.run_id = self._cur.fetchone()[0]
+            print(f"[COORD] 분산 크롤 실행 #{self.run_id} 생성 (노드 {node_id})")
+        else:
+            self.run_id = self._wait_for_run()
+            print(f"[COORD] 분산 크롤 실행 #{self.run_id}에 워커로 합류 (노드 {node_id})")
+
+        if self.global_rate > 0:
+            self._cur.execute(
+                "INSERT INTO crawl_rate_limits (name, tokens) VALUES ('item_page', %s) ON CONFLICT (name) DO NOTHING",
+                (self.global_rate,),
+            )
+            print(f"[COORD] 전역 속도 제한: 초당 {self.global_rate}회")
+
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="frontier-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _wait_for_run(self) -> int:
+        """하트비트가 최근(리스 2배 이내)인 미종료 실행 중 최신 것에 합류"""
+        deadline = time.time() + WORKER_JOIN_TIMEOUT
+        while True:
+            self._cur.execute(
+                """
+                SELECT id FROM crawl_runs
+                WHERE finished_at IS NULL
+                  AND COALESCE(heartbeat_at, started_at) > NOW() - make_interval(secs => %s)
+                ORDER BY id DESC LIMIT 1
+                """,
+                (self.lease_seconds * 2,),
+            )
+            row = self._cur.fetchone()
+            if row:
+                return row[0]
+            if time.time() >= deadline or check_stop_flag():
+                raise RuntimeError("참여할 분산 크롤 실행이 없습니다 (coordinator를 먼저 시작하세요)")
+            time.sleep(2)
+
+    def _heartbeat_loop(self) -> None:
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self._heartbeat_stop.wait(interval):
+            try:
+                with self._lock:
+                    self._cur.execute(
+                        """
+                        UPDATE crawl_frontier
+                        SET lease_expires_at = NOW() + make_interval(secs => %s)
+                        WHERE run_id=%s AND lease_owner=%s AND status='leased'
+                        """,
+                        (self.lease_seconds, self.run_id, self.node_id),
+                    )
+                    self._cur.execute(
+                        "UPDATE crawl_runs SET heartbeat_at=NOW() WHERE id=%s AND finished_at IS NULL",
+                        (self.run_id,),
+                    )
+            except Exception as e:
+                print(f"[COORD] 하트비트 실패 (무시): {e}")
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _stats(self, max_age: float = 10.0) -> Tuple[int, int]:
+        """(이 실행에 적재된 전체 URL 수, 재시도 대기 수) — 진행률 표시용이라 짧게 캐시"""
+        checked_at, total, retries = self._stats_cache
+        if not self._closed and time.time() - checked_at > max_age:
+            with self._lock:
+                self._cur.execute(
+                    """
+                    SELECT COUNT(*), COUNT(*) FILTER (WHERE status='pending' AND attempts > 0)
+                    FROM crawl_frontier WHERE run_id=%s
+                    """,
+                    (self.run_id,),
+                )
+                total, retries = self._cur.fetchone()
+            self._stats_cache = (time.time(), total, retries)
+        return total, retries
+
+    @property
+    def pending_retries(self) -> int:
+        return self._stats()[1]
+
+    @property
+    def discovered(self) -> int:
+        return self._stats()[0]
+
+    @property
+    def exhausted(self) -> bool:
+        """URL 수집이 끝났고 대기/리스 중인 작업이 하나도 없는지"""
+        if self._closed:
+            return True
+        with self._lock:
+            self._flush()
+            self._cur.execute(
+                """
+                SELECT r.discovery_done,
+                       EXISTS (SELECT 1 FROM crawl_frontier f
+                               WHERE f.run_id = r.id AND f.status IN ('pending', 'leased')) AS has_work
+                FROM crawl_runs r WHERE r.id=%s
+                """,
+                (self.run_id,),
+            )
+            row = self._cur.fetchone()
+        return bool(row is None or (row[0] and not row[1]))
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        from psycopg2.extras import execute_values
+        rows = [(self.run_id, url, self.score(url)) for url in self._buffer]
+        self._buffer = []
+        execute_values(
+            self._cur,
+            "INSERT INTO crawl_frontier (run_id, url, priority) VALUES %s ON CONFLICT (run_id, url) DO NOTHING",
+            rows,
+        )
+
+    def seen_it_ids(self) -> set:
+        """이 노드가 발견한 상품 it_id (URL 수집은 coordinator만 하므로 coordinator 기준으로 완전)"""
+        with self._lock:
+            return {extract_it_id(url) for url in self._seen} - {None}
+
+    def put(self, url: str, bucket: str = "default") -> bool:
+        """공유 프론티어는 priority 컬럼(score) 순으로 선점하므로 bucket은 사용하지 않음"""
+        clean = canonical_item_url(url)
+        if not clean or self._closed:
+            return False
+        with self._lock:
+            if clean in self._seen:
+                return False
+            self._seen.add(clean)
+            reason = self.admit(clean) if self.admit else None
+            if reason:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+                return False
+            self._buffer.append(clean)
+            if len(self._buffer) >= self.FLUSH_SIZE:
+                self._flush()
+        return True
+
+    def put_delayed(self, url: str, delay: float) -> None:
+        with self._lock:
+            self._cur.execute(
+                """
+                UPDATE crawl_frontier
+                SET status='pending', lease_owner=NULL, lease_expires_at=NULL,
+                    next_attempt_at = NOW() + make_interval(secs => %s)
+                WHERE run_id=%s AND url=%s AND lease_owner=%s
+                """,
+                (max(0.0, delay), self.run_id, url, self.node_id),
+            )
+
+    def _claim(self, size: int) -> List[str]:
+        with self._lock:
+            self._flush()
+            # 리스 만료로 여러 번 회수된 URL은 다시 나눠주지 않음 (attempts는 선점마다 증가)
+            self._cur.execute(
+                """
+                UPDATE crawl_frontier
+                SET status='failed', lease_owner=NULL, lease_expires_at=NULL
+                WHERE run_id=%s AND status='leased' AND lease_expires_at < NOW() AND attempts >= %s
+                RETURNING url
+                """,
+                (self.run_id, LEASE_MAX_ATTEMPTS),
+            )
+            for (url,) in self._cur.fetchall():
+                print(f"[COORD] 리스 만료 {LEASE_MAX_ATTEMPTS}회 → 실패 처리: {url}")
+            self._cur.execute(
+                """
+                UPDATE crawl_frontier f
+                SET status='leased', lease_owner=%s, attempts = f.attempts + 1,
+                    lease_expires_at = NOW() + make_interval(secs => %s)
+                FROM (
+                    SELECT url FROM crawl_frontier
+                    WHERE run_id=%s
+                      AND ((status='pending' AND next_attempt_at <= NOW())
+                           OR (status='leased' AND lease_expires_at < NOW()))
+                    ORDER BY priority DESC, next_attempt_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ) claimable
+                WHERE f.run_id=%s AND f.url = claimable.url
+                RETURNING f.url
+                """,
+                (self.node_id, self.lease_seconds, self.run_id, size, self.run_id),
+            )
+            return [row[0] for row in self._cur.fetchall()]
+
+    def get_batch(self, size: int, timeout: Optional[float] = None) -> List[str]:
+        give_up_at = time.time() + timeout if timeout is not None else None
+        while not self._closed:
+            batch = self._claim(size)
+            if batch or self.exhausted or check_stop_flag():
+                return batch
+            if give_up_at is not None and time.time() >= give_up_at:
+                return []
+            time.sleep(1.0)
+        return []
+
+    def complete(self, url: str, status: str = "done") -> bool:
+        """리스를 보유한 경우에만 완료 처리 (리스를 잃었으면 다른 노드가 처리 중이므로 저장 금지)"""
+        with self._lock:
+            self._cur.execute(
+                """
+                UPDATE crawl_frontier
+                SET status=%s, lease_owner=NULL, lease_expires_at=NULL
+                WHERE run_id=%s AND url=%s AND lease_owner=%s AND status='leased'
+                RETURNING url
+                """,
+                (status, self.run_id, url, self.node_id),
+            )
+            return self._cur.fetchone() is not None
+
+    def throttle(self) -> None:
+        """모든 노드가 공유하는 토큰 버킷에서 토큰 1개를 얻을 때까지 대기"""
+        if self.global_rate <= 0:
+            return
+        while not check_stop_flag():
+            with self._lock:
+                self._cur.execute(
+                    """
+                    UPDATE crawl_rate_limits
+                    SET tokens = LEAST(%(burst)s, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * %(rate)s) - 1,
+                        updated_at = clock_timestamp()
+                    WHERE name = 'item_page'
+                      AND LEAST(%(burst)s, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * %(rate)s) >= 1
+                    RETURNING tokens
+                    """,
+                    {"burst": max(1.0, self.global_rate), "rate": self.global_rate},
+                )
+                if self._cur.fetchone() is not None:
+                    return
+            time.sleep(random.uniform(0.5, 1.5) / self.global_rate)
+
+    def producer_done(self) -> None:
+        with self._lock:
+            self._producers -= 1
+            self._flush()
+            if self._producers <= 0 and self.is_coordinator:
+                self._cur.execute("UPDATE crawl_runs SET discovery_done=true WHERE id=%s", (self.run_id,))
+                print(f"[COORD] 실행 #{self.run_id} URL 수집 완료 표시")
+
+    def close(self) -> None:
+        """리스 중인 작업을 반납하고, 작업이 모두 끝났으면 실행을 종료 처리"""
+        if self._closed:
+            return
+        finished = self.exhausted
+        self._stats(max_age=0)  # 종료 후 요약 출력용 최종 집계
+        self._closed = True
+        self._heartbeat_stop.set()
+        with self._lock:
+            self._cur.execute(
+                """
+                UPDATE crawl_frontier SET status='pending', lease_owner=NULL, lease_expires_at=NULL
+                WHERE run_id=%s AND lease_owner=%s AND status='leased'
+                """,
+                (self.run_id, self.node_id),
+            )
+            if finished:
+                self._cur.execute(
+                    "UPDATE crawl_runs SET finished_at=NOW() WHERE id=%s AND finished_at IS NULL",
+                    (self.run_id,),
+                )
+            self._cur.close()
+            self._conn.close()
+
+
+# ============================================
+# 실패 분류 & 재시도 스케줄러
+# ============================================
+MAX_RETRIES = int(os.environ.get("CRAWL_MAX_RETRIES", "3"))             # URL당 최대 재시도 횟수
+RETRY_BASE_DELAY = float(os.environ.get("CRAWL_RETRY_BASE", "2.0"))     # 첫 재시도 대기(초)
+RETRY_MAX_DELAY = float(os.environ.get("CRAWL_RETRY_MAX", "120.0"))     # 재시도 대기 상한(초)
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP-date)를 대기 초로 변환"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class FetchError(Exception):
+    """
+    상품 페이지 요청 실패.
+    kind: "timeout" | "connection" | "http" | "error"
+    retryable: 나중에 다시 시도하면 성공할 수 있는 실패인지
+    """
+
+    def __init__(self, kind: str, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None, retryable: bool = False):
+        super().__init__(message)
+        self.kind = kind
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+    @classmethod
+    def from_response(cls, response) -> "FetchError":
+        status = response.status_code
+        return cls(
+            "http",
+            f"HTTP {status}",
+            status=status,
+            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            retryable=status in RETRYABLE_STATUS,
+        )
+
+    @classmethod
+    def from_exception(cls, exc: Exception) -> "FetchError":
+        """예외 메시지 문자열이 아니라 예외 타입으로 분류"""
+        if isinstance(exc, FetchError):
+            return exc
+        if isinstance(exc, requests.exceptions.Timeout):
+            return cls("timeout", str(exc), retryable=True)
+        if isinstance(exc, requests.exceptions.ConnectionError):
+            return cls("connection", str(exc), retryable=True)
+        if isinstance(exc, requests.exceptions.ChunkedEncodingError):
+            return cls("connection", str(exc), retryable=True)
+        return cls("error", str(exc), retryable=False)
+
+
+class RetryScheduler:
+    """
+    재시도 가능한 실패 URL에 URL별 지수 백오프 + 지터 대기시간을 계산합니다.
+    Retry-After가 있으면 그보다 먼저 재시도하지 않습니다.
+    """
+
+    def __init__(self, max_retries: int = MAX_RETRIES, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempts: Dict[str, int] = {}
+        self.scheduled = 0
+        self.gave_up: List[str] = []
+        self._lock = threading.Lock()
+
+    def schedule(self, url: str, error: FetchError) -> Optional[float]:
+        """다음 재시도까지 대기할 초를 반환. 재시도하지 않을 실패면 None"""
+        with self._lock:
+            if not error.retryable:
+                return None
+            attempt = self.attempts.get(url, 0) + 1
+            if attempt > self.max_retries:
+                self.gave_up.append(url)
+                return None
+            self.attempts[url] = attempt
+            self.scheduled += 1
+        backoff = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(backoff / 2, backoff)  # equal jitter: 동시 실패가 한꺼번에 몰리지 않도록
+        if error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return delay
+
+
+# ============================================
+# 변경률 기반 재방문 스케줄 (--continuous / CRAWL_URL_SOURCE=due)
+# ============================================
+RECRAWL_BUDGET = int(os.environ.get("CRAWL_RECRAWL_BUDGET", "600"))            # 연속 모드 시간당 상품 페이지 요청 수
+RECRAWL_CYCLE = int(os.environ.get("CRAWL_RECRAWL_CYCLE", "600"))              # 연속 모드 한 주기(초), 주기마다 예산만큼 꺼냄
+RECRAWL_MIN_HOURS = float(os.environ.get("CRAWL_RECRAWL_MIN_HOURS", "6"))      # 재방문 간격 하한
+RECRAWL_MAX_DAYS = float(os.environ.get("CRAWL_RECRAWL_MAX_DAYS", "30"))       # 재방문 간격 상한
+RECRAWL_STALENESS = float(os.environ.get("CRAWL_RECRAWL_STALENESS", "0.3"))    # 재방문 시점에 이미 바뀌어 있을 확률 목표
+
+
+class RecrawlScheduler:
+    """
+    it_id별 방문/변경 이력으로 변경률을 추정하고 다음 방문까지의 간격을 정합니다.
+
+    변경은 포아송 과정으로 보고, n번의 재방문 중 X번 변경을 감지했을 때
+    λ = -ln((n - X + 0.5) / (n + 0.5)) / 평균 방문 간격 (Cho & Garcia-Molina 추정식)을 씁니다.
+    다음 방문은 그 사이 변경됐을 확률이 RECRAWL_STALENESS가 되는 시점이고,
+    변경이 한 번도 없던 상품은 지금까지 안정적이었던 기간만큼 간격을 늘립니다.
+    """
+
+    def __init__(self, min_interval: float = RECRAWL_MIN_HOURS * 3600,
+                 max_interval: float = RECRAWL_MAX_DAYS * 86400, staleness: float = RECRAWL_STALENESS):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.staleness = staleness
+        self.items: Dict[str, List[float]] = {}  # it_id → [가져온 횟수, 변경 횟수, 최초 방문(epoch)]
+
+    def load(self, it_id: str, fetch_count: int, change_count: int, first_seen: Optional[float]) -> None:
+        fetch_count = fetch_count or 0
+        change_count = min(change_count or 0, max(fetch_count - 1, 0))  # 변경은 재방문에서만 셈
+        self.items[it_id] = [fetch_count, change_count, first_seen or time.time()]
+
+    @staticmethod
+    def estimate_rate(observations: int, changes: int, span_seconds: float) -> float:
+        """변경률 (회/일). 관찰이 없으면 0"""
+        if observations <= 0 or span_seconds <= 0:
+            return 0.0
+        changes = min(changes, observations)  # 지문만 있고 fetch_count=0이던 행 등 (로그 인자가 0 이하가 되지 않게)
+        interval_days = span_seconds / 86400 / observations
+        return max(0.0, -math.log((observations - changes + 0.5) / (observations + 0.5)) / interval_days)
+
+    def observe(self, it_id: str, changed: bool, now: Optional[float] = None) -> Tuple[int, int, float, float]:
+        """방문 1회를 반영하고 (가져온 횟수, 변경 횟수, 변경률, 다음 방문까지 초)를 반환"""
+        now = now or time.time()
+        entry = self.items.setdefault(it_id, [0, 0, now])
+        if changed and entry[0] > 0:  # 첫 방문은 재방문이 아니므로 변경으로 세지 않음
+            entry[1] += 1
+        entry[0] += 1
+        fetches, changes, first_seen = entry
+        span = now - first_seen
+        rate = self.estimate_rate(fetches - 1, changes, span)
+        if rate > 0:
+            delay = -math.log(1 - self.staleness) / rate * 86400
+        else:
+            delay = span  # 변경 없음: 안정적이었던 기간만큼 (방문마다 간격이 늘어남)
+        delay = min(self.max_interval, max(self.min_interval, delay))
+        return int(fetches), int(changes), rate, delay
+
+
+# 옵션 select 판정 → 이전 선택자 목록에서의 순번 (출력 순서를 예전과 같게 유지)
+#   0 "#sit_opt_added select"  1 ".sit_opt_added select"  2 "#sit_option select"  3 ".sit_option select"
+#   4 "select[name^='opt']"    5 "select[id^='it_opt']"   6 ".item_option select"
+OPTION_CONTAINER_IDS = {"sit_opt_added": 0, "sit_option": 2}
+OPTION_CONTAINER_CLASSES = {"sit_opt_added": 1, "sit_option": 3, "item_option": 6}
+OPTION_PRICE_RE = re.compile(r"\(([+-]?\s*[\d,]+)\s*원\)")
+OPTION_PRICE_STRIP_RE = re.compile(r"\([+-]?\s*[\d,]+\s*원\)")
+OPTION_SUFFIX_RE = re.compile(r"\s*[+-]\s*\d+\s*원")
+
+
+def _option_select_rank(select_tag) -> Optional[int]:
+    """옵션 select면 가장 앞선 선택자 순번, 아니면 None (조상은 한 번만 거슬러 올라감)"""
+    ranks = []
+    if (select_tag.get("name") or "").startswith("opt"):
+        ranks.append(4)
+    if (select_tag.get("id") or "").startswith("it_opt"):
+        ranks.append(5)
+    for parent in select_tag.parents:
+        attrs = parent.attrs
+        if attrs.get("id") in OPTION_CONTAINER_IDS:
+            ranks.append(OPTION_CONTAINER_IDS[attrs["id"]])
+        classes = attrs.get("class") or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        ranks.extend(OPTION_CONTAINER_CLASSES[c] for c in classes if c in OPTION_CONTAINER_CLASSES)
+    return min(ranks) if ranks else None
+
+
+def _parse_option_values(select_tag) -> List[Dict[str, any]]:
+    option_values = []
+    for opt in select_tag.find_all("option"):
+        val = opt.get_text(strip=True)
+        if not val or "선택" in val or val == "-":
+            continue
+        price_add = 0
+        if "(" in val and "원" in val:
+            price_match = OPTION_PRICE_RE.search(val)
+            if price_match:
+                try:
+                    price_add = int(price_match.group(1).replace(",", "").replace(" ", ""))
+                except ValueError:
+                    pass
+            val = OPTION_PRICE_STRIP_RE.sub("", val).strip()
+        val = OPTION_SUFFIX_RE.sub("", val).strip()
+        if val:
+            option_values.append({"value": val, "price_add": price_add})
+    return option_values
+
+
+def parse_product_options(soup: BeautifulSoup) -> List[Dict[str, any]]:
+    """
+    상품 옵션(사이즈, 컬러 등)을 추출합니다.
+
+    문서를 한 번 순회하면서 select마다 직전 label/문자열을 함께 기록합니다.
+    (select마다 find_previous로 문서를 거꾸로 훑던 것과 같은 결과, 이름 중복은 먼저 나온 것만)
+    """
+    candidates = []
+    last_label = None
+    last_string = None
+    for node in soup.descendants:
+        if isinstance(node, NavigableString):
+            last_string = node
+        elif node.name == "label":
+            last_label = node
+        elif node.name == "select":
+            rank = _option_select_rank(node)
+            if rank is not None:
+                candidates.append((rank, len(candidates), node, last_label, last_string))
+
+    options = []
+    seen_names = set()
+    for _, _, select_tag, label, prev in sorted(candidates, key=lambda c: c[:2]):
+        option_name = ""
+        if label:
+            option_name = label.get_text(strip=True)
+        elif prev:
+            option_name = prev.strip().rstrip(":")
+
+        if not option_name:
+            name_attr = select_tag.get("name", "") or select_tag.get("id", "")
+            if "color" in name_attr.lower() or "컬러" in name_attr:
+                option_name = "컬러"
+            elif "size" in name_attr.lower() or "사이즈" in name_attr:
+                option_name = "사이즈"
+            else:
+                option_name = "옵션"
+
+        if option_name in seen_names:
+            continue
+        option_values = _parse_option_values(select_tag)
+        if option_values:
+            seen_names.add(option_name)
+            options.append({"name": option_name, "values": option_values})
+
+    return options
+
+
+def compute_product_fingerprint(info: Dict[str, any]) -> str:
+    """
+    파싱 결과의 안정적인 콘텐츠 지문 (상품명/가격/카테고리/이미지 원본 URL/옵션).
+    S3 업로드 전 원본 URL 기준으로 계산해야 재수집 간 값이 같습니다.
+    """
+    payload = {
+        "title": info.get("상품명", ""),
+        "market_price": info.get("시중가격", ""),
+        "sale_price": info.get("판매가격", ""),
+        "category": info.get("카테고리", ""),
+        "main_image": info.get("대표이미지", ""),
+        "images": [u for u in (info.get("설명이미지들") or "").split(";") if u],
+        "options": info.get("옵션", []),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def materialize_product_images(info: Dict[str, any], skip_s3: bool = SKIP_S3_UPLOAD) -> Dict[str, any]:
+    """대표이미지/설명이미지를 S3에 올리고 info의 URL을 S3 URL로 교체합니다."""
+    if not get_s3_client(skip_s3):
+        return info
+
+    img_url = info.get("대표이미지") or ""
+    if img_url:
+        s3_img_url = upload_image_to_s3(img_url, prefix="products", skip_s3=skip_s3)
+        if s3_img_url and s3_img_url != img_url:
+            info["대표이미지"] = s3_img_url
+
+    desc_img_urls = [u for u in (info.get("설명이미지들") or "").split(";") if u]
+    if desc_img_urls:
+        s3_urls = upload_images_batch_to_s3(desc_img_urls, prefix="products/desc", skip_s3=skip_s3)
+        # 크기 범위를 벗어난 이미지(None)는 제외, 첫 번째(대표이미지 자리)는 원본 URL로 유지
+        info["설명이미지들"] = ";".join(
+            s3_url or original
+            for idx, (s3_url, original) in enumerate(zip(s3_urls, desc_img_urls))
+            if s3_url or idx == 0
+        )
+    return info
+
+
+def parse_product_detail(url: str, upload_to_s3: bool = True, raise_errors: bool = False) -> Optional[Dict[str, any]]:
+    """
+    개별 상품 페이지에서 정보를 추출합니다.
+    raise_errors=True면 실패 시 None 대신 FetchError를 던져 재시도 여부를 판단할 수 있게 합니다.
+    """
+    try:
+        # 랜덤 지연 (차단 방지)
+        time.sleep(random.uniform(0.3, 1.5))
+        response = get_http_session("page").get(url, timeout=20)
+        if response.status_code != 200:
+            if raise_errors:
+                raise FetchError.from_response(response)
+            return None
+
+        soup = BeautifulSoup(response.text, "html.parser")
+
+        # 1. 상품명 추출
+        title_tag = soup.select_one("#sit_title") or soup.select_one(".stitle")
+        title = title_tag.text.strip() if title_tag else "상품명 없음"
+
+        # 2. 카테고리 추출
+        category = ""
+        sit_ov = soup.select_one("#sit_ov")
+        if sit_ov:
+            text_candidates = [
+                t.strip()
+                for t in sit_ov.stripped_strings
+                if ">" in t and "상품간략정보" not in t
+            ]
+            if text_candidates:
+                category = text_candidates[0]
+
+        # 3. 시중가격 / 판매가격
+        market_price = ""
+        sale_price = ""
+        market_tag = soup.select_one(".price_wr.price_og span")
+        sale_tag = soup.select_one(".price_wr.price span")
+        if market_tag:
+            market_price = market_tag.get_text(strip=True)
+        if sale_tag:
+            sale_price = sale_tag.get_text(strip=True)
+
+        # 4. 대표 이미지 URL 추출
+        img_tag = soup.select_one("#sit_pvi_big img") or soup.select_one(".sit_pvi img")
+        img_url = ""
         if img_tag:
             img_url = img_tag.get("src", "")
             if img_url and not img_url.startswith("http"):
@@ -829,18 +2377,7 @@ def parse_product_detail(url: str, upload_to_s3: bool = True) -> Optional[Dict[s
         # 6. 옵션 추출
         options = parse_product_options(soup)
 
-        # 7. S3에 이미지 업로드 (SKIP_S3_UPLOAD=true이면 원본 URL 그대로 사용)
-        if not SKIP_S3_UPLOAD and upload_to_s3 and s3_client:
-            if img_url:
-                s3_img_url = upload_image_to_s3(img_url, prefix="products")
-                if s3_img_url and s3_img_url != img_url:
-                    img_url = s3_img_url
-            
-            if desc_img_urls:
-                s3_desc_urls = upload_images_batch_to_s3(desc_img_urls, prefix="products/desc")
-                desc_img_urls = s3_desc_urls
-
-        return {
+        info = {
             "상품명": title,
             "카테고리": category,
             "시중가격": market_price,
@@ -851,153 +2388,840 @@ def parse_product_detail(url: str, upload_to_s3: bool = True) -> Optional[Dict[s
             "옵션": options,
         }
 
+        # 7. S3에 이미지 업로드 (SKIP_S3_UPLOAD=true이면 원본 URL 그대로 사용)
+        if upload_to_s3:
+            materialize_product_images(info)
+
+        return info
+
     except Exception as exc:
         # 타임아웃은 짧게, 나머지는 상세히
-        exc_str = str(exc)
-        if "timed out" in exc_str.lower() or "max retries" in exc_str.lower():
-            import re as _re
-            m = _re.search(r"it_id=(\d+)", url)
-            it_id = m.group(1) if m else url[-20:]
-            print(f"  [TIMEOUT] it_id={it_id}")
-        else:
-            print(f"  [ERROR] ({url[:50]}): {exc_str[:80]}")
+        error = FetchError.from_exception(exc)
+        if error.kind == "timeout":
+            print(f"  [TIMEOUT] it_id={extract_it_id(url) or url[-20:]}")
+        elif error.kind != "http":
+            print(f"  [ERROR] ({url[:50]}): {str(exc)[:80]}")
+        if raise_errors:
+            raise error from exc
         return None
 
 
-def main() -> None:
-    import threading
-    from collections import deque
+# ============================================
+# 판매 종료 상품 정리 (실행 종료 시 발견 목록과 DB를 집합 단위로 대조)
+# ============================================
+DELIST_ENABLED = os.environ.get("CRAWL_DELIST", "true").lower() == "true"
+DELIST_SAMPLE = int(os.environ.get("CRAWL_DELIST_SAMPLE", "20"))            # 확인 요청을 보낼 후보 수
+DELIST_CONFIRM_RATIO = float(os.environ.get("CRAWL_DELIST_CONFIRM", "0.8"))  # 표본 중 실제로 사라진 비율 하한
+DELIST_MAX_RATIO = float(os.environ.get("CRAWL_DELIST_MAX_RATIO", "0.2"))    # 활성 상품 대비 후보 비율 상한
+
+
+def probe_item_gone(url: str) -> Optional[bool]:
+    """
+    상품 페이지가 사라졌는지 확인. True=없음, False=있음, None=판단 불가.
+    영카트는 없는 상품도 200 + alert 페이지를 주므로 HEAD가 200이면 본문에서 상품명 영역을 확인합니다.
+    """
+    session = get_http_session("page")
+    try:
+        head = session.head(url, timeout=10, allow_redirects=False)
+        if head.status_code in (404, 410):
+            return True
+        if head.status_code in (301, 302, 303, 307, 308):
+            return "item.php" not in (head.headers.get("Location") or "")
+        if head.status_code != 200:
+            return None
+        body = session.get(url, timeout=15).text
+        return 'id="sit_title"' not in body and 'class="stitle"' not in body
+    except requests.exceptions.RequestException:
+        return None
+
+
+def reconcile_delisted(cur, discovered_it_ids: set) -> Dict[str, int]:
+    """
+    DB의 활성 크롤링 상품 중 이번 실행에서 발견되지 않은 it_id를 후보로 잡고,
+    표본 확인과 비율 가드를 통과하면 한 번의 UPDATE로 비활성화합니다.
+    이전에 비활성화했는데 다시 발견된 상품은 재활성화합니다.
+    """
+    result = {"candidates": 0, "deactivated": 0, "reactivated": 0}
+
+    cur.execute(
+        """
+        UPDATE products p SET is_active = true, updated_at = NOW()
+        FROM crawler_items c
+        WHERE c.product_id = p.id AND c.delisted_at IS NOT NULL AND c.it_id = ANY(%s)
+        """,
+        (list(discovered_it_ids),),
+    )
+    result["reactivated"] = cur.rowcount
+    cur.execute("UPDATE crawler_items SET delisted_at = NULL WHERE delisted_at IS NOT NULL AND it_id = ANY(%s)",
+                (list(discovered_it_ids),))
 
-    speed_label = "⚡ 고속" if SPEED_MODE == "fast" else "일반"
-    s3_label = "스킵 (원본 URL 사용)" if SKIP_S3_UPLOAD else "활성화"
-    print(f"[CONFIG] 모드: {speed_label}, 워커: {MAX_WORKERS}, 배치: {BATCH_SIZE}, 대기: {SLEEP_BETWEEN_BATCH}s")
+    cur.execute(
+        """
+        SELECT c.it_id FROM crawler_items c JOIN products p ON p.id = c.product_id
+        WHERE p.is_active AND c.delisted_at IS NULL
+        """
+    )
+    active = [row["it_id"] for row in cur.fetchall()]
+    candidates = [it_id for it_id in active if it_id not in discovered_it_ids]
+    result["candidates"] = len(candidates)
+    if not candidates:
+        return result
+    if len(candidates) > len(active) * DELIST_MAX_RATIO:
+        print(f"[DELIST] 후보 {len(candidates):,}개가 활성 상품 {len(active):,}개의 "
+              f"{DELIST_MAX_RATIO:.0%}를 넘어 건너뜁니다 (발견 목록이 불완전할 가능성)")
+        return result
+
+    sample = random.sample(candidates, min(DELIST_SAMPLE, len(candidates)))
+    with ThreadPoolExecutor(max_workers=min(len(sample), URL_COLLECT_WORKERS)) as executor:
+        answers = dict(zip(sample, executor.map(
+            lambda it_id: probe_item_gone(f"{BASE_URL}/shop/item.php?it_id={it_id}"), sample)))
+    answered = [gone for gone in answers.values() if gone is not None]
+    confirmed = sum(1 for gone in answered if gone)
+    if len(answered) < len(sample) / 2 or confirmed < len(answered) * DELIST_CONFIRM_RATIO:
+        print(f"[DELIST] 표본 확인 실패: {len(sample)}개 중 응답 {len(answered)}개, 사라짐 {confirmed}개 → 비활성화하지 않습니다")
+        return result
+
+    # 표본에서 살아 있던 상품은 제외
+    alive = {it_id for it_id, gone in answers.items() if gone is False}
+    targets = [it_id for it_id in candidates if it_id not in alive]
+    cur.execute(
+        """
+        WITH delisted AS (
+            UPDATE crawler_items SET delisted_at = NOW()
+            WHERE it_id = ANY(%s) AND product_id IS NOT NULL
+            RETURNING product_id
+        )
+        UPDATE products p SET is_active = false, updated_at = NOW()
+        FROM delisted d WHERE p.id = d.product_id AND p.is_active
+        """,
+        (targets,),
+    )
+    result["deactivated"] = cur.rowcount
+    print(f"[DELIST] 판매 종료 {result['deactivated']:,}개 비활성화 (후보 {len(candidates):,}개, 표본 {confirmed}/{len(answered)} 확인)")
+    return result
+
+
+# ============================================
+# 카탈로그 스냅샷 (CDN에서 읽는 정적 상품 목록)
+# 크롤링이 끝나면 카테고리 slug별 목록 앞쪽 페이지와 상품 수를 gzip JSON으로 S3에 올립니다.
+#   {prefix}/{버전}/list/{slug}/{page}.json  ← GET /api/products?category=slug&page=N&limit=20 과 같은 형태
+#   {prefix}/{버전}/counts.json               ← slug → 활성 상품 수
+#   {prefix}/latest.json                      ← 현재 버전 (마지막에 올려서 버전 전환)
+# 버전 경로는 내용이 바뀌지 않으므로 immutable 캐시. 이전 버전 정리는 S3 수명 주기 규칙으로.
+# ============================================
+CATALOG_SNAPSHOT_ENABLED = os.environ.get("CRAWL_CATALOG_SNAPSHOT", "true").lower() == "true"
+CATALOG_PREFIX = os.environ.get("CRAWL_CATALOG_PREFIX", "catalog")
+CATALOG_PAGE_SIZE = 20  # Products.js 목록 limit과 같게
+CATALOG_PAGES = int(os.environ.get("CRAWL_CATALOG_PAGES", "5"))  # slug별 앞쪽 N페이지만 (뒤쪽은 API)
+CATALOG_ALL_SLUG = "_all"  # 카테고리 없이 전체 목록
+CATALOG_MANIFEST_MAX_AGE = 60  # latest.json 캐시 (초)
+
+
+def _catalog_json_default(value):
+    """node-postgres 응답과 같은 표기: NUMERIC은 문자열, 시각은 ISO 8601"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _catalog_gzip(payload) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_catalog_json_default)
+    return gzip.compress(body.encode("utf-8"), compresslevel=9, mtime=0)
+
+
+def build_catalog_snapshot(conn) -> Tuple[Dict[str, List[Dict]], Dict[str, int]]:
+    """
+    활성 상품을 최신순으로 한 번 훑어 slug별 앞쪽 CATALOG_PAGES 페이지와 상품 수를 만듭니다.
+    productController.getProducts와 같게 상위 slug 목록에는 하위 카테고리 상품도 포함되고
+    (slug = X 또는 slug LIKE 'X-%'), 리뷰 수는 상품마다 서브쿼리 대신 한 번 집계합니다.
+    """
+    from psycopg2.extras import RealDictCursor
+
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("SELECT id, name, slug, parent_id, depth FROM categories")
+        categories = {row["id"]: row for row in cur.fetchall()}
+    slugs = {c["slug"] for c in categories.values()}
+    paths: Dict[int, List[Dict]] = {}
+
+    def category_path(category_id) -> List[Dict]:
+        if category_id not in paths:
+            chain, node, hops = [], categories.get(category_id), 0
+            while node and hops < 8:
+                chain.append({"name": node["name"], "slug": node["slug"]})
+                node, hops = categories.get(node["parent_id"]), hops + 1
+            paths[category_id] = chain[::-1]
+        return paths[category_id]
+
+    per_slug = CATALOG_PAGE_SIZE * CATALOG_PAGES
+    listings: Dict[str, List[Dict]] = {}
+    counts: Dict[str, int] = {}
+    # 상품 수가 많아도 한 번에 메모리에 올리지 않도록 서버 측 커서로 스트리밍
+    with conn.cursor(name="catalog_snapshot", cursor_factory=RealDictCursor, withhold=True) as cur:
+        cur.itersize = 2000
+        cur.execute(
+            """
+            SELECT p.*,
+                   c.name AS category_name,
+                   c.slug AS category_slug,
+                   c.depth AS category_depth,
+                   c.parent_id AS category_parent_id,
+                   COALESCE(r.review_count, 0) AS review_count
+            FROM products p
+            LEFT JOIN categories c ON p.category_id = c.id
+            LEFT JOIN (
+                SELECT product_id, COUNT(*) AS review_count FROM reviews
+                WHERE is_active = true GROUP BY product_id
+            ) r ON r.product_id = p.id
+            WHERE p.is_active = true
+            ORDER BY p.created_at DESC, p.id DESC
+            """
+        )
+        for row in cur:
+            slug = row["category_slug"] or ""
+            parts = slug.split("-")
+            keys = [CATALOG_ALL_SLUG] + [
+                prefix for prefix in ("-".join(parts[:i]) for i in range(1, len(parts) + 1))
+                if prefix in slugs
+            ]
+            product = None
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+                listing = listings.setdefault(key, [])
+                if len(listing) >= per_slug:
+                    continue
+                if product is None:
+                    product = dict(row)
+                    product.pop("search_text", None)  # 검색 전용 파생 컬럼
+                    path = category_path(row["category_id"])
+                    product["category_full_path"] = " > ".join(p["name"] for p in path)
+                    product["category_path_array"] = path
+                listing.append(product)
+    return listings, counts
+
+
+def publish_catalog_snapshot(conn, skip_s3: bool = SKIP_S3_UPLOAD) -> Optional[str]:
+    """카탈로그 스냅샷을 만들어 새 버전 경로에 올리고 latest.json을 전환. 올린 버전(없으면 None) 반환"""
+    s3_client = get_s3_client(skip_s3)
+    if s3_client is None:
+        print("[SNAPSHOT] S3를 사용할 수 없어 카탈로그 스냅샷을 건너뜁니다.")
+        return None
+
+    start = time.time()
+    listings, counts = build_catalog_snapshot(conn)
+    version = time.strftime("%Y%m%d-%H%M%S")
+    base = f"{CATALOG_PREFIX}/{version}"
+    files: Dict[str, bytes] = {f"{base}/counts.json": _catalog_gzip(counts)}
+    for slug, products in listings.items():
+        total = counts[slug]
+        total_pages = math.ceil(total / CATALOG_PAGE_SIZE)
+        for page in range(1, min(total_pages, CATALOG_PAGES) + 1):
+            chunk = products[(page - 1) * CATALOG_PAGE_SIZE:page * CATALOG_PAGE_SIZE]
+            files[f"{base}/list/{slug}/{page}.json"] = _catalog_gzip({
+                "products": chunk,
+                "pagination": {"total": total, "page": page, "limit": CATALOG_PAGE_SIZE, "totalPages": total_pages},
+            })
+
+    def put(item: Tuple[str, bytes]) -> None:
+        key, body = item
+        s3_client.put_object(
+            Bucket=AWS_S3_BUCKET, Key=key, Body=body,
+            ContentType="application/json; charset=utf-8", ContentEncoding="gzip",
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=IMAGE_UPLOAD_WORKERS) as executor:
+            list(executor.map(put, files.items()))
+        # 모든 파일이 올라간 뒤에 버전 전환 (프론트가 반쯤 올라간 버전을 읽지 않도록)
+        manifest = {
+            "version": version, "base": base, "page_size": CATALOG_PAGE_SIZE, "pages": CATALOG_PAGES,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        }
+        s3_client.put_object(
+            Bucket=AWS_S3_BUCKET, Key=f"{CATALOG_PREFIX}/latest.json",
+            Body=json.dumps(manifest).encode("utf-8"), ContentType="application/json; charset=utf-8",
+            CacheControl=f"public, max-age={CATALOG_MANIFEST_MAX_AGE}",
+        )
+    except Exception as e:
+        print(f"[SNAPSHOT] 카탈로그 스냅샷 업로드 실패 (이전 버전 유지): {e}")
+        return None
+
+    size_kb = sum(len(body) for body in files.values()) / 1024
+    print(f"[SNAPSHOT] 카탈로그 {version}: 카테고리 {len(listings) - (CATALOG_ALL_SLUG in listings):,}개, 파일 {len(files):,}개"
+          f" ({size_kb:,.0f}KB gzip), {time.time() - start:.1f}초")
+    return version
+
+
+# ============================================
+# 메모리 상한 (RSS 감시 → backpressure)
+# 같은 인스턴스에서 Node 백엔드도 돌므로, 한도에 가까워지면 동시성을 줄이고 URL 수집을 멈춤
+# ============================================
+MEMORY_LIMIT_MB = int(os.environ.get("CRAWL_MEMORY_LIMIT_MB", "900"))  # 0이면 감시 안 함
+MEMORY_SOFT_RATIO = 0.8    # 이상이면 워커/이미지 동시성 절반, URL 수집 일시정지
+MEMORY_HARD_RATIO = 0.95   # 이상이면 워커 1개 + gc.collect
+MEMORY_RESUME_RATIO = 0.7  # 이 아래로 내려와야 정상 동시성 복구 (경계에서 흔들리지 않도록)
+MEMORY_SAMPLE_INTERVAL = 1.0  # 초
+
+
+def read_rss_bytes() -> Optional[int]:
+    """현재 프로세스 RSS (Linux는 /proc, 그 외에는 psutil이 설치되어 있으면 사용)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+class MemoryWatchdog:
+    """
+    RSS를 주기적으로 재서 압박 단계(0 정상, 1 감속, 2 위험)를 정하고, 단계별로
+    페이지 워커/이미지 동시성을 줄이고 URL 수집을 멈추게 합니다. 단계(stage)별 최대 RSS도 기록.
+    """
+
+    def __init__(self, limit_mb: int = MEMORY_LIMIT_MB, interval: float = MEMORY_SAMPLE_INTERVAL):
+        self.limit = limit_mb * 1024 * 1024
+        self.interval = interval
+        self.level = 0
+        self.rss = 0
+        self.throttled = 0  # 감속/위험 단계로 올라간 횟수
+        self.stage = "시작"
+        self.peaks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def start(self) -> None:
+        """샘플링 스레드 시작 (이미 돌고 있으면 그대로, 데몬은 작업 간 계속 사용)"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        if read_rss_bytes() is None:
+            self.limit = 0
+            print("[WARNING] RSS를 읽을 수 없어 메모리 감시를 끕니다. (Linux가 아니면 pip install psutil)")
+            return
+        self._thread = threading.Thread(target=self._run, name="memory-watchdog", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self.sample()
+            time.sleep(self.interval)
+
+    def set_stage(self, stage: str) -> None:
+        with self._lock:
+            self.stage = stage
+        self.sample()
+
+    def reset_peaks(self) -> None:
+        with self._lock:
+            self.peaks = {}
+            self.throttled = 0
+
+    def sample(self) -> None:
+        if not self.enabled:
+            return
+        rss = read_rss_bytes() or 0
+        with self._lock:
+            self.rss = rss
+            self.peaks[self.stage] = max(self.peaks.get(self.stage, 0), rss)
+            previous = self.level
+            if rss >= self.limit * MEMORY_HARD_RATIO:
+                self.level = 2
+            elif rss >= self.limit * MEMORY_SOFT_RATIO:
+                self.level = 1
+            elif rss < self.limit * MEMORY_RESUME_RATIO:
+                self.level = 0
+            else:
+                self.level = min(self.level, 1)  # 복구선과 감속선 사이: 현재 단계 유지
+            if self.level > previous:
+                self.throttled += 1
+        if self.level != previous:
+            state = {0: "정상 동시성 복구", 1: "동시성 절반 + URL 수집 일시정지", 2: "워커 1개 + URL 수집 일시정지"}[self.level]
+            print(f"[MEMORY] RSS {rss / 1048576:.0f}MB / 한도 {self.limit / 1048576:.0f}MB → {state}")
+            if self.level == 2:
+                gc.collect()
+
+    def limit_workers(self, workers: int) -> int:
+        if self.level >= 2:
+            return 1
+        return max(1, workers // 2) if self.level == 1 else workers
+
+    def image_workers(self) -> int:
+        return 1 if self.level >= 1 else IMAGE_UPLOAD_WORKERS
+
+    def wait_for_discovery(self, has_backlog: Callable[[], bool]) -> None:
+        """
+        압박 단계면 URL 수집을 멈추고 기다림. 처리할 URL이 남아 있을 때만 멈추므로
+        (큐가 비면 수집을 계속해야 진행됨) 교착 없이 처리량만 줄어듦
+        """
+        while self.level >= 1 and has_backlog() and not check_stop_flag():
+            time.sleep(self.interval)
+
+    def format_peaks(self) -> str:
+        with self._lock:
+            parts = [f"{stage} {peak / 1048576:.0f}MB" for stage, peak in self.peaks.items()]
+        return ", ".join(parts) or "측정 없음"
+
+
+memory_watchdog = MemoryWatchdog()
+
+
+# ============================================
+# 시간 제한 모드 (CRAWL_DEADLINE)
+# 남은 시간과 실측 처리 속도로 처리 가능한 URL 수를 추정해 신규 상품부터 처리하고,
+# 대기열만으로 남은 시간이 차면 URL 수집을 멈추고, 마감 전에 진행 중인 배치를 마무리하고 종료
+# ============================================
+DEADLINE_RE = re.compile(r"^(?:(\d{1,2}):(\d{2})|\+(\d+)([smh]))$")
+KST_OFFSET = 9 * 3600  # 관리자 화면과 같은 한국 시간 기준 (서머타임 없음)
+DEADLINE_TIER_SCALE = 1e10  # 등급을 it_id(등록 시각, 약 1.7e9) 점수보다 큰 단위로 앞에 둠
+
+
+def parse_deadline(value: str, now: Optional[float] = None) -> float:
+    """
+    CRAWL_DEADLINE 값 → 마감 시각(epoch). 'HH:MM'은 다음에 오는 해당 시각(KST),
+    '+90m'/'+2h'/'+600s'는 지금부터. 빈 값이면 0 (제한 없음), 형식이 틀리면 ValueError
+    """
+    value = (value or "").strip().lower()
+    if not value:
+        return 0.0
+    now = now or time.time()
+    m = DEADLINE_RE.match(value)
+    if not m or (m.group(1) and (int(m.group(1)) > 23 or int(m.group(2)) > 59)):
+        raise ValueError(f"마감 시각 형식 오류: {value!r} (예: 04:00, +90m, +2h)")
+    if m.group(3):
+        return now + int(m.group(3)) * {"s": 1, "m": 60, "h": 3600}[m.group(4)]
+    local_now = now + KST_OFFSET
+    target = local_now - local_now % 86400 + int(m.group(1)) * 3600 + int(m.group(2)) * 60
+    if target <= local_now:
+        target += 86400
+    return target - KST_OFFSET
+
+
+def format_deadline(deadline: float) -> str:
+    return time.strftime("%m-%d %H:%M KST", time.gmtime(deadline + KST_OFFSET))
+
+
+def format_time_left(seconds: float) -> str:
+    seconds = max(0, int(seconds))
+    return f"{seconds}초" if seconds < 120 else f"{seconds // 60}분"
+
+
+class DeadlineBudget:
+    """
+    마감까지 남은 시간 / 최근 배치의 URL당 소요 시간(지수 이동 평균) → 처리 가능한 URL 수.
+    stop_at(마감 - 정리 여유)까지 다음 배치가 끝나지 않을 것 같으면 새 배치를 시작하지 않습니다.
+    """
+
+    def __init__(self, deadline: float, margin: float = DEADLINE_MARGIN, smoothing: float = 0.3):
+        self.deadline = deadline
+        self.stop_at = deadline - margin
+        self.smoothing = smoothing
+        self.batch_seconds = 0.0
+        self.url_seconds = 0.0
+
+    def remaining(self) -> float:
+        return self.stop_at - time.time()
+
+    def record_batch(self, seconds: float, size: int) -> None:
+        if size <= 0:
+            return
+        if not self.batch_seconds:
+            self.batch_seconds, self.url_seconds = seconds, seconds / size
+            return
+        a = self.smoothing
+        self.batch_seconds = a * seconds + (1 - a) * self.batch_seconds
+        self.url_seconds = a * seconds / size + (1 - a) * self.url_seconds
+
+    def capacity(self) -> int:
+        """남은 시간에 처리할 수 있는 URL 수 (아직 측정 전이면 매우 큰 값)"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            return 0
+        return int(remaining / self.url_seconds) if self.url_seconds else 10 ** 9
+
+    def can_start_batch(self) -> bool:
+        return self.remaining() > self.batch_seconds
+
+
+def apply_speed_preset(speed_mode: str) -> None:
+    """
+    작업의 speed_mode에 맞춰 URL 수집 병렬 수/요청 간 대기를 바꿈 (워커/배치는 CrawlControl).
+    데몬은 작업마다 다른 모드를 받으므로 기동 시 환경변수 값에 고정하지 않음.
+    """
+    global SLEEP_BETWEEN_REQUEST, URL_COLLECT_WORKERS
+    preset = SPEED_PRESETS["fast" if speed_mode == "fast" else "normal"]
+    SLEEP_BETWEEN_REQUEST = preset["request_sleep"]
+    URL_COLLECT_WORKERS = preset["collect_workers"]
+    ensure_http_pool_size("list", URL_COLLECT_WORKERS + 1)
+
+
+class CrawlJob:
+    """크롤링 작업 파라미터 (spawn 실행은 환경변수, 데몬은 요청 JSON에서 생성)"""
+
+    def __init__(self, limit: int = MAX_SAVE, category: str = CATEGORY_FILTER, url_source: str = URL_SOURCE,
+                 speed_mode: str = SPEED_MODE, skip_s3: bool = SKIP_S3_UPLOAD, refresh: bool = REFRESH_EXISTING,
+                 fetch_budget: int = 0, deadline: str = CRAWL_DEADLINE,
+                 incremental: bool = CATEGORY_INCREMENTAL):
+        self.limit = limit
+        self.category = category
+        self.url_source = url_source
+        self.speed_mode = speed_mode
+        self.skip_s3 = skip_s3
+        self.refresh = refresh or url_source == "due"  # 재방문 작업은 항상 기존 상품을 다시 가져옴
+        self.fetch_budget = fetch_budget  # url_source="due"에서 꺼낼 최대 상품 수 (0 = RECRAWL_BUDGET)
+        self.deadline = deadline  # 마감 (parse_deadline 형식, 실행 시작 시점에 해석)
+        self.incremental = incremental  # 카테고리 순회를 기존 상품 페이지에서 조기 중단
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, any]) -> "CrawlJob":
+        """admin.js와 같은 규칙으로 검증 (limit 0 = 무제한)"""
+        raw_limit = int(data.get("limit", MAX_SAVE))
+        url_source = data.get("url_source", URL_SOURCE)
+        deadline = str(data.get("deadline", CRAWL_DEADLINE) or "").strip()
+        parse_deadline(deadline)  # 형식 검증 (ValueError → 400)
+        return cls(
+            limit=999999 if raw_limit == 0 else max(1, raw_limit),
+            category=(data.get("category") or "").strip(),
+            url_source=url_source if url_source in ("sitemap", "category", "both", "due") else "both",
+            speed_mode="fast" if data.get("speed_mode", SPEED_MODE) == "fast" else "normal",
+            skip_s3=bool(data.get("skip_s3", SKIP_S3_UPLOAD)),
+            refresh=bool(data.get("refresh", REFRESH_EXISTING)),
+            fetch_budget=int(data.get("fetch_budget", 0)),
+            deadline=deadline,
+            incremental=bool(data.get("incremental", CATEGORY_INCREMENTAL)),
+        )
+
+    def to_dict(self) -> Dict[str, any]:
+        return dict(vars(self))
+
+
+class CrawlControl:
+    """
+    실행 중인 작업의 일시정지/동시성과 진행 상태.
+    루프는 배치마다 값을 다시 읽으므로 데몬 제어 API에서 바꾼 값이 다음 배치부터 반영됩니다.
+    """
+
+    def __init__(self, workers: int = MAX_WORKERS, batch_size: int = BATCH_SIZE,
+                 batch_sleep: float = SLEEP_BETWEEN_BATCH):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_sleep = batch_sleep
+        self.status: Dict[str, any] = {"phase": "init"}
+        self._running = threading.Event()
+        self._running.set()
+
+    @classmethod
+    def for_speed(cls, speed_mode: str) -> "CrawlControl":
+        preset = SPEED_PRESETS["fast" if speed_mode == "fast" else "normal"]
+        control = cls(preset["workers"], preset["batch_size"], preset["batch_sleep"])
+        control.set_concurrency(workers=preset["workers"])
+        return control
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def pause(self) -> None:
+        self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def wait_if_paused(self) -> None:
+        """일시정지 중이면 재개 또는 중지 요청까지 대기"""
+        if self._running.is_set():
+            return
+        print("[PAUSE] 일시정지됨 - 재개 요청을 기다립니다...")
+        while not self._running.wait(0.5):
+            if check_stop_flag():
+                return
+        print("[PAUSE] 재개")
+
+    def set_concurrency(self, workers: Optional[int] = None, batch_size: Optional[int] = None,
+                        batch_sleep: Optional[float] = None) -> None:
+        if workers:
+            self.workers = max(1, int(workers))
+            ensure_http_pool_size("page", self.workers)
+            ensure_http_pool_size("image", self.workers * IMAGE_UPLOAD_WORKERS)
+        if batch_size:
+            self.batch_size = max(1, int(batch_size))
+        if batch_sleep is not None:
+            self.batch_sleep = max(0.0, float(batch_sleep))
+
+    def to_dict(self) -> Dict[str, any]:
+        return {
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "batch_sleep": self.batch_sleep,
+            "paused": self.paused,
+        }
+
+
+class CrawlState:
+    """
+    작업 간 유지되는 DB 연결과 캐시 (카테고리, it_id → product_id/지문).
+    spawn 실행은 작업 하나에 쓰고 닫고, 데몬은 계속 재사용합니다.
+    """
+
+    def __init__(self, db_config: Dict = DB_CONFIG):
+        self.db_config = db_config
+        self.conn = None
+        self.cur = None
+        self.check_conn = None  # 워커 스레드용 읽기 전용 연결 (중복 판정)
+        self.check_lock = threading.Lock()
+        self.category_cache: Dict[str, Dict[str, any]] = {}
+        self.existing_it_ids = set()
+        self.item_products: Dict[str, int] = {}
+        self.item_fingerprints: Dict[str, str] = {}
+        self.item_categories: Dict[str, str] = {}  # 저장하지 않은(필터 불일치) 상품의 카테고리
+        self.item_categories_loaded = False
+        self.recrawl = RecrawlScheduler()
+        self.claimed_keys = set()  # 이번 작업에서 이미 업로드/저장 단계로 넘긴 (상품명, 카테고리 slug)
+        self.claimed_codes: Dict[str, List[str]] = {}  # 이번 작업에서 새 상품으로 넘긴 모델 코드 → 상품명
+        self.connect()
+        self.load_item_cache()
+
+    def connect(self) -> None:
+        import psycopg2
+        from psycopg2.extras import RealDictCursor
+        self.conn = psycopg2.connect(**self.db_config)
+        self.conn.autocommit = True
+        self.cur = self.conn.cursor(cursor_factory=RealDictCursor)
+        self.check_conn = psycopg2.connect(**self.db_config)
+        self.check_conn.autocommit = True
+        self.category_cache = load_category_cache(self.cur)
+
+    def ensure_connected(self) -> None:
+        """유휴 중 끊긴 연결이면 다시 연결 (메모리 캐시는 유지)"""
+        try:
+            self.cur.execute("SELECT 1")
+            self.cur.fetchone()
+            with self.check_conn.cursor() as check_cur:
+                check_cur.execute("SELECT 1")
+        except Exception as e:
+            print(f"[DB] 연결이 끊겨 다시 연결합니다: {e}")
+            self.close()
+            self.connect()
+
+    def load_item_cache(self) -> None:
+        """URL 기반 빠른 중복 체크용 캐시: crawler_items + (이전 버전 호환) description에 저장된 URL의 it_id"""
+        from psycopg2.extras import execute_values
+        cur = self.cur
+        try:
+            ensure_crawler_schema(cur)
+            cur.execute(
+                """
+                SELECT it_id, product_id, fingerprint, fetch_count, change_count,
+                       EXTRACT(EPOCH FROM LOCALTIMESTAMP - first_seen_at) AS age_seconds
+                FROM crawler_items WHERE product_id IS NOT NULL
+                """
+            )
+            for row in cur:
+                self.item_products[row["it_id"]] = row["product_id"]
+                if row["fingerprint"]:
+                    self.item_fingerprints[row["it_id"]] = row["fingerprint"]
+                if row["fetch_count"]:
+                    first_seen = time.time() - float(row["age_seconds"] or 0)
+                    self.recrawl.load(row["it_id"], row["fetch_count"], row["change_count"], first_seen)
+            
+            cur.execute("SELECT id, description FROM products WHERE description LIKE '%it_id=%'")
+            backfill = []
+            for row in cur.fetchall():
+                it_id = extract_it_id(row["description"])
+                if it_id and it_id not in self.item_products:
+                    self.item_products[it_id] = row["id"]
+                    backfill.append((it_id, row["id"]))
+            if backfill:
+                execute_values(
+                    cur,
+                    "INSERT INTO crawler_items (it_id, product_id) VALUES %s ON CONFLICT (it_id) DO NOTHING",
+                    backfill,
+                )
+            self.existing_it_ids.update(self.item_products)
+            
+            # 모델 코드 중복으로 기존 상품에 연결된 it_id (상품 행은 없지만 이미 처리됨)
+            cur.execute(
+                "SELECT it_id, fingerprint FROM crawler_items WHERE product_id IS NULL AND duplicate_of IS NOT NULL"
+            )
+            for row in cur:
+                self.existing_it_ids.add(row["it_id"])
+                if row["fingerprint"]:
+                    self.item_fingerprints[row["it_id"]] = row["fingerprint"]
+            filled = backfill_model_codes(cur)
+            if filled:
+                print(f"[SKIP] 상품 {filled}개의 모델 코드 추출")
+            print(f"[SKIP] 기존 상품 {len(self.existing_it_ids)}개의 it_id 캐시 완료 (지문 {len(self.item_fingerprints)}개)")
+        except Exception as e:
+            print(f"[SKIP] it_id 캐시 로드 실패 (무시): {e}")
+
+    def load_item_categories(self) -> None:
+        """카테고리 필터 작업에서만 필요 → 처음 필요할 때 한 번 읽음"""
+        if self.item_categories_loaded:
+            return
+        try:
+            self.cur.execute("SELECT it_id, category FROM crawler_items WHERE product_id IS NULL AND category IS NOT NULL")
+            for row in self.cur:
+                self.item_categories.setdefault(row["it_id"], row["category"])
+            self.item_categories_loaded = True
+        except Exception as e:
+            print(f"[SKIP] 카테고리 캐시 로드 실패 (무시): {e}")
+
+    def close(self) -> None:
+        for resource in (self.cur, self.conn, self.check_conn):
+            try:
+                if resource is not None:
+                    resource.close()
+            except Exception:
+                pass
+
+
+def run_crawl(job: CrawlJob, state: Optional[CrawlState] = None,
+              control: Optional[CrawlControl] = None) -> Dict[str, any]:
+    """
+    크롤링 작업 하나를 실행하고 최종 집계를 반환합니다.
+    state를 넘기면 DB 연결/캐시를 재사용하고 닫지 않습니다 (데몬 모드).
+    """
+    control = control or CrawlControl.for_speed(job.speed_mode)
+    apply_speed_preset(job.speed_mode)
+    category_filter = job.category
+    refresh = job.refresh
+    max_save = job.limit
+
+    speed_label = "⚡ 고속" if job.speed_mode == "fast" else "일반"
+    s3_label = "스킵 (원본 URL 사용)" if job.skip_s3 else "활성화"
+    print(f"[CONFIG] 모드: {speed_label}, 워커: {control.workers}, 배치: {control.batch_size}, 대기: {control.batch_sleep}s")
     print(f"[CONFIG] S3 업로드: {s3_label}, URL 수집 병렬: {URL_COLLECT_WORKERS}페이지")
 
+    if not DB_CONFIG["password"]:
+        print("[ERROR] DB_PASSWORD 환경변수가 비어있습니다.")
+        return {}
+    try:
+        deadline_at = parse_deadline(job.deadline)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return {}
+    deadline_budget = DeadlineBudget(deadline_at) if deadline_at else None
+    if deadline_budget:
+        print(f"[DEADLINE] 마감 {format_deadline(deadline_at)} (정리 여유 {DEADLINE_MARGIN}초)"
+              f" → 신규 상품 우선, 남은 시간에 맞춰 URL 수집 조기 종료")
+
+    from psycopg2.extras import execute_values
+    if not job.skip_s3:
+        get_s3_client(job.skip_s3)  # 연결 결과를 시작 로그에 남김 (크롤링 중 첫 업로드를 기다리지 않음)
+
     # ============================================
-    # 1단계: 사이트맵 URL 빠르게 수집 (즉시 처리 시작용)
+    # 1단계: URL 수집 스레드 시작 (사이트맵/카테고리 → bounded 프론티어)
+    # 수집과 크롤링이 동시에 진행되어 어떤 소스 모드에서도 바로 처리 시작
     # ============================================
-    source = URL_SOURCE.lower().strip()
-    seen_urls = set()
-    urls = []
-
+    source = job.url_source.lower().strip()
+    producers = []
     if source in ("sitemap", "both"):
-        sitemap_urls = get_product_urls_from_sitemap()
-        for url in sitemap_urls:
-            clean = url.strip()
-            if clean and clean not in seen_urls:
-                seen_urls.add(clean)
-                urls.append(clean)
-        print(f"[COLLECT] 사이트맵에서 {len(urls)}개 수집 → 즉시 처리 시작!")
-    
-    # 카테고리 URL을 백그라운드에서 수집하여 큐에 추가
-    category_url_queue = deque()
+        producers.append("sitemap")
+    if source in ("category", "both"):
+        producers.append("category")
+    if source == "due":
+        producers.append("due")
+    if COORDINATOR == "postgres":
+        # 분산 모드: coordinator만 URL을 수집하고, worker는 공유 프론티어에서 작업만 선점
+        if CRAWL_ROLE == "worker":
+            producers = []
+        frontier = PostgresFrontier(DB_CONFIG, role=CRAWL_ROLE, producers=len(producers))
+    else:
+        frontier = UrlFrontier(producers=len(producers))
     category_collect_done = threading.Event()
-    
-    def background_category_collect():
-        """백그라운드에서 카테고리 URL을 수집하여 큐에 넣는 스레드"""
-        if source not in ("category", "both"):
-            category_collect_done.set()
-            return
-        
-        print("[CATEGORY-BG] 백그라운드 카테고리 URL 수집 시작...")
-        cat_urls = get_product_urls_from_categories(CATEGORY_FILTER)
-        new_count = 0
-        for url in cat_urls:
-            clean = url.strip()
-            if clean and clean not in seen_urls:
-                seen_urls.add(clean)
-                category_url_queue.append(clean)
-                new_count += 1
-        print(f"[CATEGORY-BG] 카테고리에서 신규 {new_count}개 추가 완료")
+    if "category" not in producers:
         category_collect_done.set()
-    
-    # 백그라운드 스레드 시작
-    cat_thread = threading.Thread(target=background_category_collect, daemon=True)
-    cat_thread.start()
-
-    if not urls and source == "category":
-        # 카테고리 전용 모드: 첫 배치가 올 때까지 잠시 대기
-        print("[COLLECT] 카테고리 URL 수집 대기 중...")
-        while len(category_url_queue) == 0 and not category_collect_done.is_set():
-            time.sleep(1)
-        urls = list(category_url_queue)
-        category_url_queue.clear()
-    
-    if not urls and category_collect_done.is_set():
-        print("상품 URL을 찾지 못해 종료합니다.")
-        return
+    # 수집원별로 목록을 끝까지 읽었는지 (판매 종료 판정은 발견 목록이 완전할 때만)
+    discovery_complete = {name: False for name in producers}
+    sitemap_it_ids = set()
+    discovery_cutoff = threading.Event()  # 시간 제한 모드: 대기열만으로 남은 시간이 차면 수집 중단
 
-    random.shuffle(urls)
-    print(f"크롤링 시작 (초기 {len(urls)}개 + 카테고리 추가 수집 중)...")
+    def has_backlog() -> bool:
+        return len(frontier) > 0
 
-    # 2. DB 연결
-    if not DB_CONFIG["password"]:
-        print("[ERROR] DB_PASSWORD 환경변수가 비어있습니다.")
-        return
+    def collect_sitemap():
+        """사이트맵 URL을 프론티어에 넣는 스레드"""
+        try:
+            sitemap_urls = get_product_urls_from_sitemap()
+            sitemap_it_ids.update(extract_it_id(url) for url in sitemap_urls)
+            discovery_complete["sitemap"] = bool(sitemap_urls)
+            # 프론티어는 용량만큼만 정렬할 수 있으므로 사이트맵은 미리 우선순위 순으로 정렬
+            sitemap_urls.sort(key=frontier.score, reverse=True)
+            print(f"[COLLECT] 사이트맵에서 {len(sitemap_urls)}개 수집 → 즉시 처리 시작!")
+            added = 0
+            for url in sitemap_urls:
+                if frontier.closed or discovery_cutoff.is_set():
+                    break
+                memory_watchdog.wait_for_discovery(has_backlog)
+                if frontier.put(url, bucket="sitemap"):
+                    added += 1
+            sitemap_urls.clear()  # it_id는 sitemap_it_ids에 남김
+            print(f"[COLLECT] 사이트맵 URL {added}개 큐 투입 완료 (사전 제외 누적: {format_rejected(frontier.rejected)})")
+        finally:
+            frontier.producer_done()
 
-    conn = psycopg2.connect(**DB_CONFIG)
-    conn.autocommit = True
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    def collect_categories():
+        """카테고리 리스트 페이지를 순회하며 페이지 단위로 프론티어에 넣는 스레드"""
+        new_count = 0
+        stopped_early: Set[str] = set()
+        try:
+            print("[CATEGORY-BG] 백그라운드 카테고리 URL 수집 시작...")
+            # 증분 모드: 이미 저장했거나 필터로 판정한 it_id만 나오는 페이지가 이어지면 중단
+            is_known = (lambda it_id: it_id in existing_it_ids or it_id in item_categories) if job.incremental else None
+            for ca_id, page_urls in iter_product_urls_from_categories(category_filter, is_known,
+                                                                      stopped_early=stopped_early):
+                memory_watchdog.wait_for_discovery(has_backlog)
+                for url in page_urls:
+                    if frontier.put(url, bucket=f"category-{ca_id}"):
+                        new_count += 1
+                if frontier.closed or discovery_cutoff.is_set():
+                    break
+            else:
+                # 증분 중단/로드 실패한 카테고리가 있으면 목록이 불완전 → 판매 종료 정리 안 함
+                discovery_complete["category"] = not frontier.closed and not stopped_early
+        finally:
+            print(f"[CATEGORY-BG] 카테고리에서 신규 {new_count}개 추가 완료")
+            print(f"[SKIP] 큐 투입 전 제외 (누적): {format_rejected(frontier.rejected)}")
+            category_collect_done.set()
+            frontier.producer_done()
 
-    def slugify(text: str) -> str:
-        import re
-        slug = (
-            re.sub(r"[^0-9a-zA-Z\-]+", "-", text.strip().lower())
-            .strip("-")
-            .replace("--", "-")
-        )
-        return slug or "etc"
+    due_urls: List[str] = []
 
-    def ensure_category_single(name: str, slug: str, parent_id: int = None, parent_slug: str = None, depth: int = 1) -> int:
-        cur.execute("SELECT id FROM categories WHERE slug=%s", (slug,))
-        row = cur.fetchone()
-        if row:
-            if parent_slug:
-                cur.execute(
-                    "UPDATE categories SET parent_slug=%s WHERE slug=%s AND (parent_slug IS NULL OR parent_slug = '')",
-                    (parent_slug, slug)
-                )
-            return row["id"]
-        cur.execute(
-            "INSERT INTO categories (name, slug, parent_id, parent_slug, depth, description) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
-            (name, slug, parent_id, parent_slug, depth, "imported from crawler"),
-        )
-        return cur.fetchone()["id"]
+    def collect_due():
+        """재방문 시각이 된 기존 상품을 프론티어에 넣는 스레드"""
+        added = 0
+        try:
+            for url in due_urls:
+                if frontier.closed or discovery_cutoff.is_set():
+                    break
+                if frontier.put(url, bucket="due"):
+                    added += 1
+        finally:
+            print(f"[RECRAWL] 재방문 대상 {added}개 큐 투입 완료")
+            frontier.producer_done()
 
-    def ensure_category_4depth(cat_raw: str) -> int:
-        cat_info = normalize_category_4depth(cat_raw)
-        
-        parent_id = None
-        parent_slug = None
-        final_id = None
-        
-        if cat_info["depth1"]:
-            d1 = cat_info["depth1"]
-            parent_id = ensure_category_single(d1["name"], d1["slug"], None, None, 1)
-            parent_slug = d1["slug"]
-            final_id = parent_id
-        
-        if cat_info["depth2"]:
-            d2 = cat_info["depth2"]
-            parent_id = ensure_category_single(d2["name"], d2["slug"], parent_id, parent_slug, 2)
-            parent_slug = d2["slug"]
-            final_id = parent_id
-        
-        if cat_info["depth3"]:
-            d3 = cat_info["depth3"]
-            parent_id = ensure_category_single(d3["name"], d3["slug"], parent_id, parent_slug, 3)
-            parent_slug = d3["slug"]
-            final_id = parent_id
-        
-        if cat_info["depth4"]:
-            d4 = cat_info["depth4"]
-            final_id = ensure_category_single(d4["name"], d4["slug"], parent_id, parent_slug, 4)
-        
-        return final_id or ensure_category_single("기타", "etc", None, None, 1)
+    # 2. DB 연결 (기존 it_id 캐시를 먼저 읽어야 큐 투입 전 필터링 가능)
+    memory_watchdog.start()
+    memory_watchdog.reset_peaks()
+    memory_watchdog.set_stage("캐시 로드")
+    own_state = state is None
+    if own_state:
+        state = CrawlState()
+    else:
+        state.ensure_connected()
+        print(f"[SKIP] 캐시 재사용: 기존 상품 {len(state.existing_it_ids)}개의 it_id (지문 {len(state.item_fingerprints)}개)")
+    cur = state.cur
+    category_cache = state.category_cache
 
-    # 기존 호환용
-    def ensure_category_3depth(cat_raw: str) -> int:
-        return ensure_category_4depth(cat_raw)
+    def ensure_category_4depth(cat_raw: str) -> int:
+        return resolve_category_id(cur, cat_raw, category_cache)
 
     def already_exists(name: str, category_id: int) -> bool:
         cur.execute(
@@ -1006,27 +3230,19 @@ def main() -> None:
         )
         return cur.fetchone() is not None
 
-    # URL 기반 빠른 중복 체크용 캐시 (it_id → True)
-    # DB에 저장된 상품의 URL에서 it_id를 추출하여 캐시
-    existing_it_ids = set()
-    try:
-        import re as _re
-        cur.execute("SELECT description FROM products WHERE description LIKE '%it_id=%'")
-        for row in cur:
-            m = _re.search(r"it_id=(\d+)", row["description"])
-            if m:
-                existing_it_ids.add(m.group(1))
-        print(f"[SKIP] 기존 상품 {len(existing_it_ids)}개의 it_id 캐시 완료")
-    except Exception as e:
-        print(f"[SKIP] it_id 캐시 로드 실패 (무시): {e}")
+    # URL 기반 빠른 중복 체크용 캐시 (it_id → product_id / 지문)
+    existing_it_ids = state.existing_it_ids
+    item_products = state.item_products
+    item_fingerprints = state.item_fingerprints
+    item_categories = state.item_categories
+    if category_filter:
+        state.load_item_categories()
+    if refresh:
+        print("[REFRESH] 기존 상품도 다시 수집하여 변경된 상품만 갱신합니다.")
 
     def is_already_crawled_by_url(url: str) -> bool:
         """URL의 it_id로 빠르게 중복 체크 (DB 쿼리 없이 메모리에서)"""
-        import re as _re
-        m = _re.search(r"it_id=(\d+)", url)
-        if m and m.group(1) in existing_it_ids:
-            return True
-        return False
+        return extract_it_id(url) in existing_it_ids
 
     def save_product_options(product_id: int, options: List[Dict]) -> int:
         option_count = 0
@@ -1047,12 +3263,26 @@ def main() -> None:
                     option_count += 1
         return option_count
 
+    def save_product_images(product_id: int, info, replace: bool = False) -> int:
+        """설명 이미지를 순서대로 일괄 저장 (replace면 기존 목록을 교체)"""
+        if replace:
+            cur.execute("DELETE FROM product_images WHERE product_id=%s", (product_id,))
+        rows = product_image_rows(product_id, info)
+        if rows:
+            execute_values(
+                cur,
+                "INSERT INTO product_images (product_id, image_url, sort_order) VALUES %s"
+                " ON CONFLICT (product_id, sort_order) DO NOTHING",
+                rows,
+            )
+        return len(rows)
+
     def matches_category_filter(product_category: str) -> bool:
-        if not CATEGORY_FILTER:
+        if not category_filter:
             return True
         
         product_cat_lower = product_category.lower().strip()
-        filter_lower = CATEGORY_FILTER.lower().strip()
+        filter_lower = category_filter.lower().strip()
         
         if product_cat_lower.startswith(filter_lower):
             return True
@@ -1070,27 +3300,97 @@ def main() -> None:
         
         return False
     
-    if CATEGORY_FILTER:
-        print(f"[FILTER] 카테고리 필터 적용: '{CATEGORY_FILTER}'")
+    if category_filter:
+        print(f"[FILTER] 카테고리 필터 적용: '{category_filter}'")
+
+    # 워커 스레드용 읽기 전용 연결: 이미지 업로드 전에 (상품명, 카테고리) 중복을 판정
+    # (메인 스레드의 cur는 저장 전용이라 스레드 간 공유하지 않음)
+    check_conn = state.check_conn
+    check_lock = state.check_lock
+    claimed_keys = state.claimed_keys
+    claimed_keys.clear()
+    claimed_codes = state.claimed_codes
+    claimed_codes.clear()
+
+    def is_duplicate_before_upload(info) -> bool:
+        """기존 상품이거나 이번 실행의 다른 워커가 먼저 가져간 상품이면 True"""
+        leaf_slug = normalize_category_4depth(info.get("카테고리") or "기타")["leaf_slug"] or "etc"
+        key = (info["상품명"], leaf_slug)
+        with check_lock:
+            if key in claimed_keys:
+                return True
+            with check_conn.cursor() as check_cur:
+                check_cur.execute(
+                    """
+                    SELECT 1 FROM products p JOIN categories c ON c.id = p.category_id
+                    WHERE c.slug=%s AND p.name=%s LIMIT 1
+                    """,
+                    (leaf_slug, info["상품명"]),
+                )
+                if check_cur.fetchone() is not None:
+                    return True
+            claimed_keys.add(key)
+        return False
 
-    def to_price(val: str) -> float:
-        digits = "".join([c for c in val if c.isdigit()])
-        return float(digits) if digits else 0.0
+    def find_model_duplicate(info) -> Optional[int]:
+        """
+        모델 코드와 상품명이 같은 기존 상품 id (인덱스로 후보를 찾고 same_listing으로 확인).
+        이번 실행의 다른 워커가 먼저 가져간 상품이면 -1, 중복이 아니면 None (선점 기록)
+        """
+        name = info["상품명"]
+        code = extract_model_code(name)
+        if not code:
+            return None
+        with check_lock:
+            if any(same_listing(name, other, code) for other in claimed_codes.get(code, ())):
+                return -1
+            with check_conn.cursor() as check_cur:
+                check_cur.execute("SELECT id, name FROM products WHERE model_code=%s ORDER BY id", (code,))
+                for product_id, other in check_cur.fetchall():
+                    if same_listing(name, other, code):
+                        return product_id
+            claimed_codes.setdefault(code, []).append(name)
+        return None
 
     def fetch_and_filter(url_idx_tuple):
         idx, url = url_idx_tuple
         try:
             # 빠른 중복 체크 (파싱 전에 it_id로 확인 → 네트워크 요청 절약)
-            if is_already_crawled_by_url(url):
+            if not refresh and is_already_crawled_by_url(url):
                 return None, idx, url, "이미 수집된 상품 (스킵)"
             
-            info = parse_product_detail(url)
+            try:
+                frontier.throttle()
+                info = parse_product_detail(url, upload_to_s3=False, raise_errors=True)
+            except FetchError as e:
+                return None, idx, url, e
             if not info:
                 return None, idx, url, "파싱 실패"
             
+            # 지문이 저장된 값과 같으면 S3 업로드/DB 쓰기 모두 생략
+            info["fingerprint"] = compute_product_fingerprint(info)
+            it_id = extract_it_id(url)
+            if it_id in existing_it_ids and item_fingerprints.get(it_id) == info["fingerprint"]:
+                return None, idx, url, "변경 없음 (스킵)"
+            
+            # 필터/중복 판정을 이미지 업로드보다 먼저 → 저장하지 않을 상품은 S3 트래픽 없음
             product_category = info.get("카테고리") or "기타"
             if not matches_category_filter(product_category):
                 return None, idx, url, f"카테고리 불일치: {product_category}"
+            if it_id not in item_products and is_duplicate_before_upload(info):
+                return None, idx, url, "중복 상품 (스킵)"
+            if it_id not in item_products and DUPLICATE_POLICY in ("link", "skip", "reuse"):
+                duplicate_of = find_model_duplicate(info)
+                if duplicate_of == -1 or (duplicate_of and DUPLICATE_POLICY == "skip"):
+                    return None, idx, url, "중복 상품 (스킵)"
+                if duplicate_of:
+                    # link/reuse: 기존 상품의 이미지를 쓰므로 다운로드/업로드 없이 저장 단계로
+                    info["duplicate_of"] = duplicate_of
+                    return info, idx, url, None
+            
+            # 통과한 상품만 이미지 materialize (lazy stage)
+            if not job.skip_s3:
+                materialize_product_images(info, skip_s3=job.skip_s3)
             
             return info, idx, url, None
         except Exception as e:
@@ -1099,12 +3399,122 @@ def main() -> None:
     count = 0
     scanned = 0
     skip_count = 0      # 중복 스킵
+    unchanged_count = 0 # 재수집했지만 지문이 같아 스킵
+    updated_count = 0   # 재수집 후 변경 내용 갱신
+    duplicate_count = 0 # 모델 코드 중복 (link: 기존 상품에 연결, reuse: 이미지 재사용)
     fail_count = 0      # 파싱 실패
     timeout_count = 0   # 타임아웃
-    retry_urls = []     # 타임아웃/에러 발생한 URL (나중에 재시도)
+    retry_scheduler = RetryScheduler()  # 재시도 가능한 실패 → 백오프 후 프론티어로 재투입
+    
+    def record_crawled_item(it_id: Optional[str], product_id: int, fingerprint: Optional[str],
+                            changed: bool = False) -> None:
+        """it_id ↔ product_id 매핑과 지문, 재방문 스케줄을 저장하고 메모리 캐시에 반영"""
+        if not it_id:
+            return
+        try:
+            fetches, changes, rate, delay = state.recrawl.observe(it_id, changed)
+        except (ArithmeticError, ValueError) as e:
+            # 추정 실패로 저장/실행이 중단되지 않게 최소 간격으로 다시 방문
+            print(f"[RECRAWL] {it_id} 재방문 간격 추정 실패 (최소 간격 사용): {e}")
+            fetches, changes = (int(v) for v in state.recrawl.items.get(it_id, [1, 0])[:2])
+            rate, delay = None, state.recrawl.min_interval
+        cur.execute(
+            """
+            INSERT INTO crawler_items (it_id, product_id, fingerprint, last_fetched_at, last_changed_at,
+                                       fetch_count, change_count, change_rate, next_due_at)
+            VALUES (%s, %s, %s, NOW(), NOW(), %s, %s, %s, NOW() + %s * INTERVAL '1 second')
+            ON CONFLICT (it_id) DO UPDATE SET
+                product_id = EXCLUDED.product_id,
+                fingerprint = EXCLUDED.fingerprint,
+                last_fetched_at = EXCLUDED.last_fetched_at,
+                last_changed_at = EXCLUDED.last_changed_at,
+                fetch_count = EXCLUDED.fetch_count,
+                change_count = EXCLUDED.change_count,
+                change_rate = EXCLUDED.change_rate,
+                next_due_at = EXCLUDED.next_due_at
+            """,
+            (it_id, product_id, fingerprint, fetches, changes, rate, delay),
+        )
+        existing_it_ids.add(it_id)
+        item_products[it_id] = product_id
+        if fingerprint:
+            item_fingerprints[it_id] = fingerprint
+    
+    def update_product_in_db(product_id: int, info) -> bool:
+        """재수집한 상품의 변경 내용을 기존 행에 반영 (옵션은 새로 교체)"""
+        nonlocal updated_count
+        
+        category_id = ensure_category_4depth(info.get("카테고리") or "기타")
+        name, description, price_val, department_price, image_url = product_row_values(info)
+        try:
+            # FROM 서브쿼리는 갱신 전 행을 보므로 이전 가격을 같은 문장에서 돌려받음
+            cur.execute(
+                """
+                UPDATE products p
+                SET name=%s, description=%s, price=%s, department_price=%s,
+                    category_id=%s, image_url=%s, model_code=%s, updated_at=NOW()
+                FROM (SELECT id, price, department_price FROM products WHERE id=%s) old
+                WHERE p.id = old.id
+                RETURNING old.price AS old_price, old.department_price AS old_department_price
+                """,
+                (name, description, price_val, department_price, category_id, image_url,
+                 extract_model_code(name) or "", product_id),
+            )
+            old = cur.fetchone()
+            if old is None:
+                return False
+            if (float(old["old_price"] or 0), float(old["old_department_price"] or 0)) != \
+                    (float(price_val or 0), float(department_price or 0)):
+                record_price(product_id, price_val, department_price)
+            cur.execute("DELETE FROM product_options WHERE product_id=%s", (product_id,))
+            save_product_images(product_id, info, replace=True)
+        except Exception as exc:
+            print(f"[ERROR] DB 갱신 오류: {exc}")
+            return False
+        
+        options = info.get("옵션", [])
+        if options:
+            save_product_options(product_id, options)
+        # 이전 지문이 없던 상품(지문 도입 전 수집)은 변경을 관찰한 것이 아님
+        it_id = extract_it_id(info.get("URL", ""))
+        record_crawled_item(it_id, product_id, info.get("fingerprint"), changed=it_id in item_fingerprints)
+        
+        updated_count += 1
+        sale = info.get("판매가격") or "가격 없음"
+        print(f"  [UPD {updated_count}] {name[:35]} | {sale} | 변경 내용 갱신")
+        return True
+    
+    def link_duplicate_item(it_id: Optional[str], duplicate_of: int, info) -> None:
+        """모델 코드가 같은 기존 상품에 it_id를 연결 (상품 행/이미지는 만들지 않음)"""
+        nonlocal duplicate_count
+        if not it_id:
+            return
+        cur.execute(
+            """
+            INSERT INTO crawler_items (it_id, duplicate_of, fingerprint, last_fetched_at)
+            VALUES (%s, %s, %s, NOW())
+            ON CONFLICT (it_id) DO UPDATE SET duplicate_of = EXCLUDED.duplicate_of,
+                fingerprint = EXCLUDED.fingerprint, last_fetched_at = EXCLUDED.last_fetched_at
+            """,
+            (it_id, duplicate_of, info.get("fingerprint")),
+        )
+        existing_it_ids.add(it_id)
+        if info.get("fingerprint"):
+            item_fingerprints[it_id] = info["fingerprint"]
+        duplicate_count += 1
+        print(f"  [DUP] {info['상품명'][:35]} | it_id={it_id} → 기존 상품 #{duplicate_of} (모델 코드 {extract_model_code(info['상품명'])})")
     
     def save_product_to_db(info):
-        nonlocal count
+        nonlocal count, duplicate_count
+        
+        it_id = extract_it_id(info.get("URL", ""))
+        if it_id in item_products and update_product_in_db(item_products[it_id], info):
+            return True
+        
+        duplicate_of = info.get("duplicate_of")
+        if duplicate_of and DUPLICATE_POLICY == "link":
+            link_duplicate_item(it_id, duplicate_of, info)
+            return False
         
         product_category = info.get("카테고리") or "기타"
         category_id = ensure_category_4depth(product_category)
@@ -1112,29 +3522,38 @@ def main() -> None:
         if already_exists(info["상품명"], category_id):
             return False
 
-        price_val = to_price(info.get("판매가격") or "")
-        department_price = to_price(info.get("시중가격") or "")
-        
-        if price_val and price_val > MAX_DB_PRICE:
-            price_val = MAX_DB_PRICE
-        if department_price and department_price > MAX_DB_PRICE:
-            department_price = MAX_DB_PRICE
-            
-        description = f"{info.get('URL','')}\n{info.get('설명이미지들','')}".strip()
-        image_url = info.get("대표이미지") or ""
+        name, description, price_val, department_price, image_url = product_row_values(info)
+        if duplicate_of:
+            # reuse: 이미지는 기존 상품(이미 S3에 올라간 것)을 그대로 사용
+            cur.execute("SELECT image_url FROM products WHERE id=%s", (duplicate_of,))
+            row = cur.fetchone()
+            if row and row["image_url"]:
+                image_url = row["image_url"]
 
         try:
             cur.execute(
                 """
-                INSERT INTO products (name, description, price, department_price, category_id, image_url, stock, is_active)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, true)
+                INSERT INTO products (name, description, price, department_price, category_id, image_url,
+                                      model_code, stock, is_active)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, true)
                 RETURNING id
                 """,
-                (info["상품명"], description, price_val, 
-                 department_price if department_price > 0 else None,
-                 category_id, image_url, 10),
+                (name, description, price_val, department_price,
+                 category_id, image_url, extract_model_code(name) or "", 10),
             )
             product_id = cur.fetchone()["id"]
+            if duplicate_of:
+                cur.execute(
+                    """
+                    INSERT INTO product_images (product_id, image_url, sort_order)
+                    SELECT %s, image_url, sort_order FROM product_images WHERE product_id=%s
+                    """,
+                    (product_id, duplicate_of),
+                )
+                duplicate_count += 1
+            else:
+                save_product_images(product_id, info)
+            record_price(product_id, price_val, department_price)
         except Exception as exc:
             print(f"[ERROR] DB 저장 오류: {exc}")
             return False
@@ -1148,71 +3567,178 @@ def main() -> None:
         cat_short = (info.get("카테고리") or "")[:20]
         print(f"  [+{count}] {info['상품명'][:35]} | {sale} | {cat_short}{opt_info}")
         
-        # 저장 성공 시 it_id 캐시에 추가 (같은 세션 중복 방지)
-        import re as _re
-        m = _re.search(r"it_id=(\d+)", info.get("URL", ""))
-        if m:
-            existing_it_ids.add(m.group(1))
+        # 저장 성공 시 it_id 캐시/매핑에 추가 (같은 세션 중복 방지)
+        record_crawled_item(it_id, product_id, info.get("fingerprint"))
         
         return True
 
+    def admit_url(url: str) -> Optional[str]:
+        """
+        큐 투입 전 판정: 네트워크 요청이 필요 없는 URL이면 제외 사유를 반환.
+        (워커 슬롯과 배치 대기 시간은 실제로 가져올 URL에만 쓰이도록)
+        """
+        it_id = extract_it_id(url)
+        if not it_id:
+            return None
+        if not refresh and it_id in existing_it_ids:
+            return "기존"
+        if it_id in item_categories and not matches_category_filter(item_categories[it_id]):
+            return "카테고리 불일치"
+        return None
+
+    price_buffer: List[tuple] = []
+
+    def record_price(product_id: Optional[int], price_val, department_price, flush: bool = False) -> None:
+        """신규/변경된 가격 관찰을 모아서 가격 이력에 일괄 기록"""
+        if product_id:
+            price_buffer.append((product_id, time.time(), price_val, department_price))
+        if price_buffer and (flush or len(price_buffer) >= PRICE_HISTORY_BATCH):
+            try:
+                write_price_history(cur, price_buffer)
+            except Exception as e:
+                print(f"[PRICE] 가격 이력 기록 실패 (무시): {e}")
+            price_buffer.clear()
+
+    unchanged_buffer: List[tuple] = []
+
+    def record_unchanged(url: str, flush: bool = False) -> None:
+        """지문이 같았던 방문을 모아 방문 횟수/변경률/다음 방문 시각만 일괄 갱신"""
+        it_id = extract_it_id(url)
+        if it_id:
+            unchanged_buffer.append((it_id, *state.recrawl.observe(it_id, changed=False)))
+        if unchanged_buffer and (flush or len(unchanged_buffer) >= 100):
+            try:
+                execute_values(
+                    cur,
+                    """
+                    UPDATE crawler_items AS c SET
+                        fetch_count = v.fetch_count, change_count = v.change_count,
+                        change_rate = v.change_rate, last_fetched_at = NOW(),
+                        next_due_at = NOW() + v.delay * INTERVAL '1 second'
+                    FROM (VALUES %s) AS v(it_id, fetch_count, change_count, change_rate, delay)
+                    WHERE c.it_id = v.it_id
+                    """,
+                    unchanged_buffer,
+                    template="(%s, %s::int, %s::int, %s::float8, %s::float8)",
+                )
+            except Exception as e:
+                print(f"[RECRAWL] 방문 기록 실패 (무시): {e}")
+            unchanged_buffer.clear()
+
+    deferred_due: List[str] = []
+
+    def defer_failed_item(url: str, flush: bool = False) -> None:
+        """가져오지 못한 기존 상품은 재방문을 하한 간격만큼 미룸 (매 주기 같은 실패 상품이 예산을 차지하지 않도록)"""
+        it_id = extract_it_id(url)
+        if it_id and it_id in item_products:
+            deferred_due.append(it_id)
+        if deferred_due and (flush or len(deferred_due) >= 100):
+            try:
+                cur.execute(
+                    "UPDATE crawler_items SET next_due_at = NOW() + %s * INTERVAL '1 second' WHERE it_id = ANY(%s)",
+                    (state.recrawl.min_interval, deferred_due),
+                )
+            except Exception as e:
+                print(f"[RECRAWL] 재방문 연기 실패 (무시): {e}")
+            deferred_due.clear()
+
+    mismatch_buffer: List[Tuple[str, str]] = []
+
+    def record_category_mismatch(url: str, category: str, flush: bool = False) -> None:
+        """필터에 걸러진 상품의 카테고리를 모아서 일괄 기록 (다음 실행의 사전 제외용)"""
+        it_id = extract_it_id(url)
+        if it_id and category:
+            mismatch_buffer.append((it_id, category))
+            item_categories[it_id] = category
+        if mismatch_buffer and (flush or len(mismatch_buffer) >= 100):
+            try:
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO crawler_items (it_id, category, last_fetched_at) VALUES %s
+                    ON CONFLICT (it_id) DO UPDATE SET category = EXCLUDED.category,
+                        last_fetched_at = EXCLUDED.last_fetched_at
+                    """,
+                    [(i, c) for i, c in dict(mismatch_buffer).items()],
+                    template="(%s, %s, NOW())",
+                )
+            except Exception as e:
+                print(f"[FILTER] 카테고리 기록 실패 (무시): {e}")
+            mismatch_buffer.clear()
+
+    # URL 수집 스레드 시작 (캐시/필터 준비 후 → 큐 투입 시점에 사전 제외)
+    frontier.admit = admit_url
+    if "due" in producers:
+        budget = job.fetch_budget or RECRAWL_BUDGET
+        due_urls.extend(load_due_urls(cur, budget))
+        print(f"[RECRAWL] 재방문 시각이 된 상품 {len(due_urls):,}개 (이번 작업 예산 {budget:,}개)")
+    if deadline_at:
+        # 신규 상품 → 재방문 시각이 된 상품 → 그 밖의 기존 상품 순 (같은 등급은 기존 점수 순)
+        base_score = frontier.score
+        due_it_ids = {extract_it_id(url) for url in due_urls}
+
+        def deadline_score(url: str) -> float:
+            it_id = extract_it_id(url)
+            tier = 2 if it_id not in existing_it_ids else 1 if it_id in due_it_ids else 0
+            return tier * DEADLINE_TIER_SCALE + base_score(url)
+
+        frontier.score = deadline_score
+        frontier.strict_priority = True
+    collector_threads = []
+    collectors = {"sitemap": collect_sitemap, "category": collect_categories, "due": collect_due}
+    for name in producers:
+        target = collectors[name]
+        t = threading.Thread(target=target, name=f"collect-{name}", daemon=True)
+        t.start()
+        collector_threads.append(t)
+
     # ============================================
     # 병렬 처리 (사이트맵 즉시 처리 + 카테고리 백그라운드 수집)
     # ============================================
-    if SKIP_S3_UPLOAD:
+    if job.skip_s3:
         print(f"[S3] S3 업로드 스킵 모드 - 원본 이미지 URL을 그대로 사용합니다.")
-    print(f"[SCAN] 병렬 크롤링 시작 (워커 {MAX_WORKERS}개, 배치 {BATCH_SIZE}개)...")
-    print(f"[SCAN] 사이트맵 URL 즉시 처리 시작, 카테고리 URL은 백그라운드 수집 중...")
+    print(f"[SCAN] 병렬 크롤링 시작 (워커 {control.workers}개, 배치 {control.batch_size}개)...")
+    print(f"[SCAN] URL 수집과 동시에 처리 시작 (프론티어 최대 {frontier.maxsize}개)...")
     
     start_time = time.time()
+    image_stats_start = dict(image_fetch_stats)
     batch_idx = 0
-    url_index = 0  # 현재 처리 위치
     
+    control.status.update(phase="crawling", started_at=start_time,
+                          deadline=deadline_at or None)
+    memory_watchdog.set_stage("크롤링")
+    deadline_hit = False
     while True:
+        control.wait_if_paused()
         # 중지 요청 확인
         if check_stop_flag():
             print(f"[STOP] 중지됨 - {count}개 저장 완료")
             break
-        if count >= MAX_SAVE:
-            print(f"[DONE] 목표 {MAX_SAVE}개 달성!")
+        if count >= max_save:
+            print(f"[DONE] 목표 {max_save}개 달성!")
+            break
+        if deadline_budget and not deadline_budget.can_start_batch():
+            print(f"[DEADLINE] 마감 {format_deadline(deadline_at)} 전에 배치를 끝낼 시간이 없어 종료합니다"
+                  f" (남은 대기열 {len(frontier):,}개)")
+            deadline_hit = True
             break
         
-        # 카테고리 큐에서 새 URL 가져오기
-        new_urls_added = 0
-        while category_url_queue:
-            try:
-                new_url = category_url_queue.popleft()
-                urls.append(new_url)
-                new_urls_added += 1
-            except IndexError:
-                break
-        if new_urls_added > 0 and new_urls_added >= 100:
-            print(f"[QUEUE] 카테고리에서 {new_urls_added}개 URL 추가 (총 {len(urls)}개)")
-        
-        # 처리할 URL이 없고, 카테고리 수집도 끝났으면 종료
-        if url_index >= len(urls):
-            if category_collect_done.is_set():
-                # 마지막으로 큐 비우기
-                while category_url_queue:
-                    try:
-                        urls.append(category_url_queue.popleft())
-                    except IndexError:
-                        break
-                if url_index >= len(urls):
-                    print(f"[DONE] 모든 URL 처리 완료!")
-                    break
-            else:
-                # 카테고리 수집 중이면 잠시 대기
-                time.sleep(1)
-                continue
-        
-        # 현재 배치 추출
-        batch = urls[url_index:url_index + BATCH_SIZE]
+        # 프론티어에서 다음 배치 가져오기 (비어 있으면 수집 스레드가 채울 때까지 대기)
+        batch_size = memory_watchdog.limit_workers(control.batch_size)
+        wait_limit = None
+        if deadline_budget:
+            batch_size = max(1, min(batch_size, deadline_budget.capacity()))  # 마지막 배치는 남은 시간에 맞춤
+            wait_limit = max(0.0, deadline_budget.remaining())
+        batch = frontier.get_batch(batch_size, timeout=wait_limit)
         if not batch:
-            time.sleep(0.5)
+            if frontier.exhausted:
+                print(f"[DONE] 모든 URL 처리 완료!")
+                break
             continue
         
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        cache_skips = 0  # 네트워크 요청 없이 끝난 URL 수 (같은 실행 중 저장된 it_id 등)
+        batch_started = time.time()
+        with ThreadPoolExecutor(max_workers=memory_watchdog.limit_workers(control.workers)) as executor:
             futures = {
                 executor.submit(fetch_and_filter, (scanned + i + 1, url)): url 
                 for i, url in enumerate(batch)
@@ -1227,28 +3753,64 @@ def main() -> None:
                 scanned += 1
                 
                 if info:
-                    save_product_to_db(info)
-                    if count >= MAX_SAVE:
+                    # 분산 모드에서 리스를 잃었으면 다른 노드가 처리하므로 저장하지 않음
+                    if frontier.complete(url):
+                        save_product_to_db(info)
+                    else:
+                        print(f"  [COORD] 리스 만료로 저장 생략: it_id={extract_it_id(url)}")
+                    if count >= max_save:
                         break
-                elif error:
-                    error_str = str(error).lower()
-                    if "timed out" in error_str or "max retries" in error_str:
+                elif isinstance(error, FetchError):
+                    if error.kind == "timeout":
                         timeout_count += 1
-                        retry_urls.append(url)
-                    elif "이미 수집" in str(error):
-                        skip_count += 1
+                    delay = retry_scheduler.schedule(url, error)
+                    if delay is not None:
+                        frontier.put_delayed(url, delay)
+                        attempt = retry_scheduler.attempts[url]
+                        print(f"  [RETRY] it_id={extract_it_id(url)} {attempt}차 재시도 예약 ({delay:.1f}초 후, {error})")
                     else:
+                        frontier.complete(url, status="failed")
+                        defer_failed_item(url)
+                        if error.kind != "timeout":
+                            fail_count += 1
+                else:
+                    frontier.complete(url)
+                    if error and "이미 수집" in str(error):
+                        skip_count += 1
+                        cache_skips += 1
+                    elif error and "중복 상품" in str(error):
+                        skip_count += 1
+                    elif error and "변경 없음" in str(error):
+                        skip_count += 1
+                        unchanged_count += 1
+                        record_unchanged(url)
+                    elif error and str(error).startswith("카테고리 불일치: "):
+                        fail_count += 1
+                        record_category_mismatch(url, str(error).split(": ", 1)[1])
+                    elif error:
                         fail_count += 1
         
-        url_index += len(batch)
         batch_idx += 1
+        if deadline_budget:
+            deadline_budget.record_batch(time.time() - batch_started, len(batch) - cache_skips)
+            if not discovery_cutoff.is_set() and len(frontier) >= deadline_budget.capacity():
+                discovery_cutoff.set()
+                print(f"[DEADLINE] 남은 {format_time_left(deadline_budget.remaining())} 동안 약 {deadline_budget.capacity():,}개"
+                      f" 처리 가능 → 대기열 {len(frontier):,}개만 처리하고 URL 수집 중단")
+        control.status.update(
+            saved=count, scanned=scanned, skipped=skip_count + sum(frontier.rejected.values()),
+            updated=updated_count, failed=fail_count, timeouts=timeout_count,
+            discovered=frontier.discovered, pending_retries=frontier.pending_retries,
+            collecting=not category_collect_done.is_set(), elapsed=time.time() - start_time,
+            rss_mb=round(memory_watchdog.rss / 1048576), memory_level=memory_watchdog.level,
+        )
         
         # 진행률 표시 (3배치마다)
         if batch_idx % 3 == 0:
             elapsed = time.time() - start_time
             rate = scanned / elapsed if elapsed > 0 else 0
             save_rate = count / elapsed if elapsed > 0 else 0
-            total_known = len(urls)
+            total_known = frontier.discovered
             cat_status = "수집 중" if not category_collect_done.is_set() else "완료"
             remaining_urls = total_known - scanned
             remaining_sec = remaining_urls / rate if rate > 0 else 0
@@ -1269,54 +3831,55 @@ def main() -> None:
             print(f"")
             print(f"  ────────────────────────────────────────")
             print(f"  진행: {scanned:,}/{total_known:,} ({pct:.1f}%) | 경과: {elapsed_str} | 남은: {remain_str}")
-            print(f"  저장: {count:,}개 ({save_rate:.2f}/초) | 스킵: {skip_count:,} | 실패: {fail_count:,} | 타임아웃: {timeout_count:,} ({timeout_rate:.0f}%)")
-            print(f"  성공률: {success_rate:.1f}% | 재시도 대기: {len(retry_urls):,}개 | 카테고리URL: {cat_status}")
+            prefiltered = sum(frontier.rejected.values())
+            print(f"  저장: {count:,}개 ({save_rate:.2f}/초) | 스킵: {skip_count + prefiltered:,} | 실패: {fail_count:,} | 타임아웃: {timeout_count:,} ({timeout_rate:.0f}%)")
+            print(f"  성공률: {success_rate:.1f}% | 재시도 대기: {frontier.pending_retries:,}개 | 카테고리URL: {cat_status}")
+            print(f"  연결: {format_http_pool_stats()}")
+            if memory_watchdog.enabled:
+                print(f"  메모리: {memory_watchdog.rss / 1048576:.0f}MB / {memory_watchdog.limit / 1048576:.0f}MB"
+                      f"{' (감속 중)' if memory_watchdog.level else ''}")
             print(f"  ────────────────────────────────────────")
             print(f"")
-            
-            if batch_idx % 15 == 0:
-                gc.collect()
         
-        time.sleep(SLEEP_BETWEEN_BATCH)
+        # 네트워크 요청이 하나도 없었던 배치는 대기할 필요 없음
+        if cache_skips < len(batch):
+            time.sleep(control.batch_sleep)
     
-    # 카테고리 수집 스레드 종료 대기
-    cat_thread.join(timeout=5)
+    # URL 수집 스레드 종료 (블로킹된 put을 깨움)
+    record_category_mismatch("", "", flush=True)
+    record_unchanged("", flush=True)
+    defer_failed_item("", flush=True)
+    record_price(None, None, None, flush=True)
+    frontier.close()
+    for t in collector_threads:
+        t.join(timeout=5)
+    if frontier.discovered == 0:
+        print("상품 URL을 찾지 못했습니다.")
     
-    # ============================================
-    # 실패한 URL 재시도 (최대 2회)
-    # ============================================
-    if retry_urls and not check_stop_flag() and count < MAX_SAVE:
-        print(f"\n[RETRY] 타임아웃/에러 {len(retry_urls)}개 URL 재시도 시작...")
-        retry_round = 0
-        while retry_urls and retry_round < 2 and not check_stop_flag() and count < MAX_SAVE:
-            retry_round += 1
-            current_retry = list(retry_urls)
-            retry_urls.clear()
-            print(f"[RETRY] {retry_round}차 재시도: {len(current_retry)}개")
-            
-            for i in range(0, len(current_retry), BATCH_SIZE):
-                if check_stop_flag() or count >= MAX_SAVE:
-                    break
-                batch = current_retry[i:i+BATCH_SIZE]
-                
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures = {
-                        executor.submit(fetch_and_filter, (0, url)): url
-                        for url in batch
-                    }
-                    for future in as_completed(futures):
-                        info, idx, url, error = future.result()
-                        if info:
-                            save_product_to_db(info)
-                        elif error and ("timed out" in str(error).lower() or "max retries" in str(error).lower()):
-                            retry_urls.append(url)
-                
-                time.sleep(SLEEP_BETWEEN_BATCH * 2)  # 재시도는 좀 더 여유 있게
-            
-            print(f"[RETRY] {retry_round}차 완료 (남은 실패: {len(retry_urls)}개)")
-        
-        if retry_urls:
-            print(f"[RETRY] 최종 실패: {len(retry_urls)}개 (삭제/비공개 상품일 가능성)")
+    delist_result = {}
+    memory_watchdog.set_stage("마무리")
+    if DELIST_ENABLED and producers and "due" not in producers and not category_filter:
+        if all(discovery_complete.values()) and not check_stop_flag() and not deadline_hit:
+            try:
+                delist_result = reconcile_delisted(cur, (frontier.seen_it_ids() | sitemap_it_ids) - {None})
+            except Exception as e:
+                print(f"[DELIST] 판매 종료 정리 실패 (무시): {e}")
+        else:
+            print("[DELIST] URL 수집이 끝까지 진행되지 않아 판매 종료 정리를 건너뜁니다.")
+    
+    if retry_scheduler.gave_up:
+        print(f"[RETRY] 최종 실패: {len(retry_scheduler.gave_up)}개 (삭제/비공개 상품일 가능성)")
+    
+    # 목록이 바뀐 실행이면 CDN용 카탈로그 스냅샷 갱신
+    catalog_changed = count or updated_count or delist_result.get("deactivated") or delist_result.get("reactivated")
+    if CATALOG_SNAPSHOT_ENABLED and not job.skip_s3 and catalog_changed:
+        if deadline_at and time.time() >= deadline_at:
+            print("[DEADLINE] 마감이 지나 카탈로그 스냅샷을 건너뜁니다 (--publish-catalog로 나중에 갱신)")
+        else:
+            try:
+                publish_catalog_snapshot(state.conn, skip_s3=job.skip_s3)
+            except Exception as e:
+                print(f"[SNAPSHOT] 카탈로그 스냅샷 생성 실패 (무시): {e}")
     
     elapsed_total = time.time() - start_time
     et_m, et_s = divmod(int(elapsed_total), 60)
@@ -1328,19 +3891,262 @@ def main() -> None:
     print(f"\n{'='*50}")
     print(f"  크롤링 완료!")
     print(f"{'='*50}")
-    print(f"  총 URL:     {len(urls):,}개")
+    print(f"  총 URL:     {frontier.discovered:,}개")
     print(f"  총 스캔:     {scanned:,}개")
     print(f"  저장 성공:   {count:,}개 ({success_rate:.1f}%)")
     print(f"  중복 스킵:   {skip_count:,}개")
+    print(f"  사전 제외:   {sum(frontier.rejected.values()):,}개 ({format_rejected(frontier.rejected)})")
+    if refresh:
+        print(f"  변경 갱신:   {updated_count:,}개 (변경 없음: {unchanged_count:,}개)")
+    if duplicate_count:
+        print(f"  모델 중복:   {duplicate_count:,}개 ({'기존 상품에 연결' if DUPLICATE_POLICY == 'link' else '이미지 재사용'})")
+    if delist_result:
+        print(f"  판매 종료:   {delist_result['deactivated']:,}개 비활성화 (재등록 {delist_result['reactivated']:,}개)")
     print(f"  파싱 실패:   {fail_count:,}개")
-    print(f"  타임아웃:    {timeout_count:,}개 (재시도 후 최종 실패: {len(retry_urls):,}개)")
+    print(f"  타임아웃:    {timeout_count:,}개 (재시도 {retry_scheduler.scheduled:,}회, 최종 실패: {len(retry_scheduler.gave_up):,}개)")
+    if deadline_at:
+        print(f"  마감:        {format_deadline(deadline_at)} ({'마감 전 정리 종료' if deadline_hit else '마감 전 완료'},"
+              f" {format_time_left(deadline_at - time.time())} 남음{', URL 수집 조기 종료' if discovery_cutoff.is_set() else ''})")
     print(f"  소요 시간:   {time_str}")
     print(f"  스캔 속도:   {avg_speed}")
     print(f"  저장 속도:   {save_speed}")
+    print(f"  HTTP 연결:   {format_http_pool_stats()}")
+    if memory_watchdog.enabled:
+        print(f"  최대 메모리: {memory_watchdog.format_peaks()} (한도 {memory_watchdog.limit / 1048576:.0f}MB,"
+              f" 감속 {memory_watchdog.throttled}회)")
+    image_stats = {k: v - image_stats_start[k] for k, v in image_fetch_stats.items()}
+    if any(image_stats.values()):
+        print(f"  이미지:      동시 요청 합침 {image_stats['coalesced']:,}건 | 실패 캐시로 건너뜀 "
+              f"{image_stats['fail_cache_hits']:,}건 (신규 기록 {image_stats['fail_cache_added']:,}건)"
+              f" | 크기 범위 밖 {image_stats['rejected']:,}건")
     print(f"{'='*50}")
+    flush_image_fail_cache()
     
-    cur.close()
-    conn.close()
+    control.status.update(
+        phase="stopped" if check_stop_flag() else "done",
+        saved=count, scanned=scanned, updated=updated_count, failed=fail_count, timeouts=timeout_count,
+        discovered=frontier.discovered, elapsed=elapsed_total,
+    )
+    if own_state:
+        state.close()
+    return dict(control.status)
+
+
+def main() -> None:
+    run_crawl(CrawlJob())
+
+
+def run_continuous(budget_per_hour: int = RECRAWL_BUDGET, cycle_seconds: int = RECRAWL_CYCLE) -> None:
+    """
+    재방문 시각이 된 상품만 가져오는 연속 모드 (--continuous).
+    주기마다 budget_per_hour * cycle / 3600개까지만 꺼내므로 시간당 요청 수가 예산을 넘지 않습니다
+    (재시도 요청은 별도).
+    """
+    if not DB_CONFIG["password"]:
+        print("[ERROR] DB_PASSWORD 환경변수가 비어있습니다.")
+        return
+
+    per_cycle = max(1, int(budget_per_hour * cycle_seconds / 3600))
+    print(f"[RECRAWL] 연속 모드: 시간당 {budget_per_hour:,}개 예산, {cycle_seconds}초마다 최대 {per_cycle:,}개")
+    state = CrawlState()
+    try:
+        while not check_stop_flag():
+            cycle_start = time.time()
+            run_crawl(CrawlJob(url_source="due", fetch_budget=per_cycle, limit=999999), state)
+            while not check_stop_flag() and time.time() - cycle_start < cycle_seconds:
+                STOP_EVENT.wait(1)
+    finally:
+        state.close()
+
+
+CSV_FIELDNAMES = ["상품명", "카테고리", "시중가격", "판매가격", "대표이미지", "설명이미지들", "URL", "옵션"]
+
+# crawl_only 출력 형식 (쉼표로 여러 개 지정 가능: csv,ndjson,parquet)
+EXPORT_FORMATS = [
+    f.strip().lower()
+    for f in os.environ.get("CRAWL_EXPORT_FORMAT", "csv").split(",")
+    if f.strip()
+]
+PARQUET_ROW_GROUP = int(os.environ.get("CRAWL_PARQUET_ROW_GROUP", "1000"))  # 이 개수마다 row group 플러시
+
+# 선택: Parquet 출력 (pip install pyarrow) — ParquetSink 생성 시 import
+pa = pq = None
+
+
+def _load_pyarrow() -> bool:
+    global pa, pq
+    if pq is None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("[WARNING] pyarrow가 설치되어 있지 않아 Parquet 출력을 사용하지 않습니다. pip install pyarrow로 설치해주세요.")
+            return False
+    return True
+
+
+def export_record(product: Dict) -> Dict:
+    """
+    분석/재적재용 레코드. CSV와 달리 가격은 정수(원), 이미지는 리스트,
+    옵션은 JSON 문자열이 아닌 중첩 구조 그대로 둡니다.
+    """
+    market_price = to_price(product.get("시중가격") or "")
+    sale_price = to_price(product.get("판매가격") or "")
+    url = product.get("URL", "")
+    return {
+        "it_id": extract_it_id(url),
+        "name": product.get("상품명", ""),
+        "category": product.get("카테고리", ""),
+        "market_price": int(market_price) if market_price else None,
+        "sale_price": int(sale_price) if sale_price else None,
+        "main_image": product.get("대표이미지", ""),
+        "images": [u for u in (product.get("설명이미지들") or "").split(";") if u],
+        "url": url,
+        "options": [
+            {
+                "name": opt.get("name", ""),
+                "values": [
+                    {"value": v.get("value", ""), "price_add": int(v.get("price_add", 0) or 0)}
+                    for v in opt.get("values", [])
+                ],
+            }
+            for opt in product.get("옵션") or []
+        ],
+    }
+
+
+class ExportSink:
+    """출력 싱크 공통 인터페이스: write(product)로 한 건씩 기록하고 close()로 마무리 (with 문 지원)"""
+
+    extension = ""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.count = 0
+
+    def write(self, product: Dict) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvSink(ExportSink):
+    """기존 CSV 형식 (옵션은 셀 안의 JSON, 설명이미지는 ';' 연결). 한 행씩 바로 기록합니다."""
+
+    extension = ".csv"
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self._file = open(filename, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDNAMES)
+        self._writer.writeheader()
+
+    def write(self, product: Dict) -> None:
+        options_str = json.dumps(product.get("옵션", []), ensure_ascii=False) if product.get("옵션") else ""
+        self._writer.writerow({
+            "상품명": product.get("상품명", ""),
+            "카테고리": product.get("카테고리", ""),
+            "시중가격": product.get("시중가격", ""),
+            "판매가격": product.get("판매가격", ""),
+            "대표이미지": product.get("대표이미지", ""),
+            "설명이미지들": product.get("설명이미지들", ""),
+            "URL": product.get("URL", ""),
+            "옵션": options_str,
+        })
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class NdjsonSink(ExportSink):
+    """한 줄에 상품 하나 (export_record 형식). 중간에 끊겨도 기록된 줄까지는 유효합니다."""
+
+    extension = ".ndjson"
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self._file = open(filename, "w", encoding="utf-8")
+
+    def write(self, product: Dict) -> None:
+        self._file.write(json.dumps(export_record(product), ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink(ExportSink):
+    """PARQUET_ROW_GROUP개씩 모아 row group 단위로 기록합니다. 메모리는 row group 하나 분량만 사용."""
+
+    extension = ".parquet"
+
+    def __init__(self, filename: str, row_group_size: int = PARQUET_ROW_GROUP):
+        if not _load_pyarrow():
+            raise RuntimeError("Parquet 출력에는 pyarrow가 필요합니다.")
+        super().__init__(filename)
+        self.row_group_size = max(1, row_group_size)
+        self._rows: List[Dict] = []
+        option_value = pa.struct([("value", pa.string()), ("price_add", pa.int64())])
+        self._schema = pa.schema([
+            ("it_id", pa.string()),
+            ("name", pa.string()),
+            ("category", pa.string()),
+            ("market_price", pa.int64()),
+            ("sale_price", pa.int64()),
+            ("main_image", pa.string()),
+            ("images", pa.list_(pa.string())),
+            ("url", pa.string()),
+            ("options", pa.list_(pa.struct([("name", pa.string()), ("values", pa.list_(option_value))]))),
+        ])
+        self._writer = pq.ParquetWriter(filename, self._schema, compression="zstd")
+
+    def write(self, product: Dict) -> None:
+        self._rows.append(export_record(product))
+        self.count += 1
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self._schema))
+        self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+EXPORT_SINKS = {
+    "csv": CsvSink,
+    "ndjson": NdjsonSink,
+    "parquet": ParquetSink,
+}
+
+
+def open_export_sinks(formats: List[str] = None, base_filename: str = CSV_FILENAME) -> List[ExportSink]:
+    """형식별 싱크 생성. 파일명은 CSV_FILENAME의 확장자만 바꿔 사용합니다."""
+    base = os.path.splitext(base_filename)[0]
+    sinks = []
+    for fmt in formats or EXPORT_FORMATS:
+        sink_cls = EXPORT_SINKS.get(fmt)
+        if sink_cls is None:
+            print(f"[WARNING] 알 수 없는 출력 형식: {fmt} (사용 가능: {', '.join(EXPORT_SINKS)})")
+            continue
+        if sink_cls is ParquetSink and not _load_pyarrow():
+            continue
+        sinks.append(sink_cls(base + sink_cls.extension))
+    return sinks
 
 
 def save_to_csv(products: List[Dict], filename: str = CSV_FILENAME) -> None:
@@ -1349,61 +4155,485 @@ def save_to_csv(products: List[Dict], filename: str = CSV_FILENAME) -> None:
         print("저장할 상품이 없습니다.")
         return
     
-    fieldnames = ["상품명", "카테고리", "시중가격", "판매가격", "대표이미지", "설명이미지들", "URL", "옵션"]
-    
-    with open(filename, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
+    with CsvSink(filename) as sink:
         for product in products:
-            options_str = json.dumps(product.get("옵션", []), ensure_ascii=False) if product.get("옵션") else ""
-            
-            writer.writerow({
-                "상품명": product.get("상품명", ""),
-                "카테고리": product.get("카테고리", ""),
-                "시중가격": product.get("시중가격", ""),
-                "판매가격": product.get("판매가격", ""),
-                "대표이미지": product.get("대표이미지", ""),
-                "설명이미지들": product.get("설명이미지들", ""),
-                "URL": product.get("URL", ""),
-                "옵션": options_str,
-            })
+            sink.write(product)
     
     print(f"[OK] CSV 파일 저장 완료: {filename} ({len(products)}개 상품)")
 
 
 def crawl_only() -> None:
-    """DB 저장 없이 크롤링만 수행하고 CSV로 저장합니다."""
+    """DB 저장 없이 크롤링만 수행하고 CRAWL_EXPORT_FORMAT 형식으로 한 건씩 기록합니다."""
     urls = get_product_urls()
     if not urls:
         print("상품 URL을 찾지 못해 종료합니다.")
         return
     
+    sinks = open_export_sinks()
+    if not sinks:
+        print("출력 형식이 없어 종료합니다.")
+        return
+    
     print(f"크롤링 시작 (총 {len(urls)}개 후보)...")
     
-    products = []
-    for idx, url in enumerate(urls, start=1):
-        if len(products) >= MAX_SAVE:
-            print(f"[STOP] 최대 {MAX_SAVE}개까지만 크롤링 후 중단합니다.")
-            break
-        
-        print(f"[{idx}/{len(urls)}] 수집 중: {url}")
-        info = parse_product_detail(url)
-        if info:
-            products.append(info)
-            options = info.get("옵션", [])
-            opt_info = f", 옵션 {sum(len(o.get('values', [])) for o in options)}개" if options else ""
-            print(f"  [OK] 수집: {info['상품명']}{opt_info}")
-        
-        time.sleep(random.uniform(1, 3))
+    count = 0
+    try:
+        for idx, url in enumerate(urls, start=1):
+            if count >= MAX_SAVE:
+                print(f"[STOP] 최대 {MAX_SAVE}개까지만 크롤링 후 중단합니다.")
+                break
+            
+            print(f"[{idx}/{len(urls)}] 수집 중: {url}")
+            info = parse_product_detail(url)
+            if info:
+                for sink in sinks:
+                    sink.write(info)
+                count += 1
+                options = info.get("옵션", [])
+                opt_info = f", 옵션 {sum(len(o.get('values', [])) for o in options)}개" if options else ""
+                print(f"  [OK] 수집: {info['상품명']}{opt_info}")
+            
+            time.sleep(random.uniform(1, 3))
+    finally:
+        flush_image_fail_cache()
+        for sink in sinks:
+            sink.close()
+            print(f"[OK] 파일 저장 완료: {sink.filename} ({sink.count}개 상품)")
     
-    save_to_csv(products)
-    print(f"완료! 총 {len(products)}개의 상품을 크롤링했습니다.")
+    print(f"완료! 총 {count}개의 상품을 크롤링했습니다.")
+
+
+IMPORT_COPY_CHUNK = 5000  # COPY 한 번에 보낼 행 수 (메모리 상한)
+
+
+def _copy_rows(cur, table: str, columns: List[str], rows: List[tuple]) -> None:
+    """rows를 CSV로 직렬화해 COPY FROM STDIN으로 적재"""
+    if not rows:
+        return
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')",
+        buf,
+    )
+
+
+def publish_catalog() -> None:
+    """크롤링 없이 현재 DB 기준으로 카탈로그 스냅샷만 다시 올림 (--publish-catalog)"""
+    import psycopg2
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    try:
+        publish_catalog_snapshot(conn)
+    finally:
+        conn.close()
+
+
+def import_csv(filename: str = CSV_FILENAME) -> None:
+    """
+    크롤링 CSV(save_to_csv 형식)를 DB에 일괄 적재합니다.
+
+    CSV를 스트리밍으로 읽으며 카테고리는 크롤러와 같은 normalize_category_4depth + 캐시로
+    해석하고, 상품/옵션은 COPY로 임시 스테이징 테이블에 넣은 뒤 한 번의 set-based
+    INSERT ... SELECT로 병합합니다. 같은 (상품명, 카테고리)가 이미 있으면 건너뜁니다.
+    """
+    if not os.path.exists(filename):
+        print(f"[IMPORT] 파일이 없습니다: {filename}")
+        return
+
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    start_time = time.time()
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    ensure_crawler_schema(cur)
+    category_cache = load_category_cache(cur)
+
+    cur.execute(
+        """
+        CREATE TEMP TABLE import_products (
+            row_no INTEGER PRIMARY KEY,
+            it_id VARCHAR(32),
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            price NUMERIC(15, 2),
+            department_price NUMERIC(15, 2),
+            category_id INTEGER,
+            image_url TEXT
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TEMP TABLE import_options (
+            row_no INTEGER,
+            option_name VARCHAR(100),
+            option_value VARCHAR(255),
+            price_adjustment NUMERIC(10, 2)
+        )
+        """
+    )
+    cur.execute("CREATE TEMP TABLE import_images (row_no INTEGER, image_url TEXT, sort_order INTEGER)")
+    cur.execute("CREATE TEMP TABLE import_map (row_no INTEGER PRIMARY KEY, product_id INTEGER)")
+
+    product_cols = ["row_no", "it_id", "name", "description", "price", "department_price", "category_id", "image_url"]
+    option_cols = ["row_no", "option_name", "option_value", "price_adjustment"]
+    image_cols = ["row_no", "image_url", "sort_order"]
+    product_rows: List[tuple] = []
+    option_rows: List[tuple] = []
+    image_rows: List[tuple] = []
+    total = 0
+    bad_options = 0
+
+    print(f"[IMPORT] {filename} 스트리밍 적재 시작...")
+    with open(filename, newline="", encoding="utf-8-sig") as f:
+        for row_no, row in enumerate(csv.DictReader(f), start=1):
+            if not row.get("상품명"):
+                continue
+            category_id = resolve_category_id(cur, row.get("카테고리") or "기타", category_cache)
+            name, description, price_val, department_price, image_url = product_row_values(row)
+            product_rows.append((row_no, extract_it_id(row.get("URL", "")), name[:255], description,
+                                 price_val, department_price, category_id, image_url))
+            image_rows.extend(product_image_rows(row_no, row))
+
+            if row.get("옵션"):
+                try:
+                    for option in json.loads(row["옵션"]):
+                        for val_info in option.get("values", []):
+                            if val_info.get("value"):
+                                option_rows.append((row_no, (option.get("name") or "옵션")[:100],
+                                                    val_info["value"][:255], val_info.get("price_add", 0)))
+                except (ValueError, AttributeError, TypeError):
+                    bad_options += 1
+
+            total += 1
+            if len(product_rows) >= IMPORT_COPY_CHUNK:
+                _copy_rows(cur, "import_products", product_cols, product_rows)
+                _copy_rows(cur, "import_options", option_cols, option_rows)
+                _copy_rows(cur, "import_images", image_cols, image_rows)
+                product_rows, option_rows, image_rows = [], [], []
+                print(f"[IMPORT] {total:,}행 스테이징...")
+
+    _copy_rows(cur, "import_products", product_cols, product_rows)
+    _copy_rows(cur, "import_options", option_cols, option_rows)
+    _copy_rows(cur, "import_images", image_cols, image_rows)
+    staged_at = time.time()
+
+    # 한 트랜잭션에서 set-based 병합
+    conn.autocommit = False
+    try:
+        cur.execute(
+            """
+            WITH src AS (
+                SELECT DISTINCT ON (name, category_id) *
+                FROM import_products
+                ORDER BY name, category_id, row_no
+            ), ins AS (
+                INSERT INTO products (name, description, price, department_price, category_id, image_url, stock, is_active)
+                SELECT src.name, src.description, COALESCE(src.price, 0), src.department_price,
+                       src.category_id, src.image_url, 10, true
+                FROM src
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM products p WHERE p.name = src.name AND p.category_id = src.category_id
+                )
+                RETURNING id, name, category_id
+            )
+            INSERT INTO import_map (row_no, product_id)
+            SELECT src.row_no, ins.id FROM ins JOIN src USING (name, category_id)
+            """
+        )
+        inserted = cur.rowcount
+        cur.execute(
+            """
+            INSERT INTO product_options (product_id, option_name, option_value, price_adjustment, stock)
+            SELECT m.product_id, o.option_name, o.option_value, COALESCE(o.price_adjustment, 0), 10
+            FROM import_options o JOIN import_map m USING (row_no)
+            ON CONFLICT DO NOTHING
+            """
+        )
+        option_count = cur.rowcount
+        cur.execute(
+            """
+            INSERT INTO product_images (product_id, image_url, sort_order)
+            SELECT m.product_id, i.image_url, i.sort_order
+            FROM import_images i JOIN import_map m USING (row_no)
+            ON CONFLICT (product_id, sort_order) DO NOTHING
+            """
+        )
+        image_count = cur.rowcount
+        # 같은 (상품명, 카테고리)로 합쳐진 행의 it_id도 모두 연결 (기존 상품 포함, 다음 크롤링에서 신규로 보지 않게)
+        cur.execute(
+            """
+            INSERT INTO crawler_items (it_id, product_id)
+            SELECT DISTINCT ON (s.it_id) s.it_id, p.id
+            FROM import_products s
+            JOIN products p ON p.name = s.name AND p.category_id = s.category_id
+            WHERE s.it_id IS NOT NULL
+            ORDER BY s.it_id, p.id
+            ON CONFLICT (it_id) DO NOTHING
+            """
+        )
+        ensure_price_history_partitions(cur)
+        cur.execute(
+            """
+            INSERT INTO product_price_history (product_id, observed_at, price, department_price)
+            SELECT m.product_id, LOCALTIMESTAMP, COALESCE(s.price, 0), s.department_price
+            FROM import_map m JOIN import_products s USING (row_no)
+            """
+        )
+        backfill_model_codes(cur)
+        conn.commit()
+    except Exception as exc:
+        conn.rollback()
+        print(f"[IMPORT] 병합 실패 (롤백): {exc}")
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    elapsed = time.time() - start_time
+    print(f"[IMPORT] 완료: {total:,}행 중 신규 {inserted:,}개, 옵션 {option_count:,}개, 설명 이미지 {image_count:,}개, 기존/중복 {total - inserted:,}개")
+    print(f"[IMPORT] 스테이징 {staged_at - start_time:.1f}초 + 병합 {time.time() - staged_at:.1f}초 = {elapsed:.1f}초"
+          f" (카테고리 {len(category_cache):,}개 캐시{f', 옵션 파싱 실패 {bad_options}행' if bad_options else ''})")
+
+
+# ============================================
+# 데몬 모드 (python3 replmoa_crawler.py --daemon)
+# 상주하면서 로컬 HTTP API로 작업을 받아 실행 → HTTP 풀/DB 연결/캐시를 작업 간 재사용
+#   GET  /status            상태(JSON)        GET  /logs?after=N  N번 이후 로그 줄
+#   POST /jobs              작업 시작 (limit, category, url_source, speed_mode, skip_s3, refresh, deadline,
+#                           incremental)
+#   POST /jobs/stop|pause|resume               POST /config       workers, batch_size, batch_sleep
+#   POST /shutdown
+# ============================================
+DAEMON_HOST = os.environ.get("CRAWL_DAEMON_HOST", "127.0.0.1")  # 인증이 없으므로 외부에 열지 않음
+DAEMON_PORT = int(os.environ.get("CRAWL_DAEMON_PORT", "8765"))
+DAEMON_LOG_LINES = 2000
+
+
+class LogBuffer(io.TextIOBase):
+    """stdout에 그대로 쓰면서 최근 줄을 일련번호와 함께 보관 (admin.js가 /logs로 이어 읽음)"""
+
+    def __init__(self, stream, maxlen: int = DAEMON_LOG_LINES):
+        self._stream = stream
+        self._lines = deque(maxlen=maxlen)
+        self._partial = ""
+        self._lock = threading.Lock()
+        self.seq = 0
+
+    def write(self, text: str) -> int:
+        self._stream.write(text)
+        with self._lock:
+            parts = (self._partial + text).split("\n")
+            self._partial = parts.pop()
+            for line in parts:
+                self.seq += 1
+                self._lines.append((self.seq, line))
+        return len(text)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+    def since(self, after: int) -> Tuple[int, List[str]]:
+        with self._lock:
+            return self.seq, [line for seq, line in self._lines if seq > after]
+
+
+class CrawlDaemon:
+    """작업 하나씩 실행하는 상주 크롤러. 제어 API 스레드와 작업 스레드가 공유"""
+
+    def __init__(self, log_buffer: Optional[LogBuffer] = None):
+        self.log_buffer = log_buffer
+        self.state = CrawlState()
+        self.job: Optional[CrawlJob] = None
+        self.control: Optional[CrawlControl] = None
+        self.result: Dict[str, any] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_job(self, params: Dict[str, any]) -> Tuple[int, Dict[str, any]]:
+        with self._lock:
+            if self.running:
+                return 409, {"message": "크롤링이 이미 진행 중입니다."}
+            try:
+                job = CrawlJob.from_dict(params)
+            except (TypeError, ValueError) as e:
+                return 400, {"message": f"잘못된 작업 파라미터: {e}"}
+            reset_stop_request()
+            self.job = job
+            self.control = CrawlControl.for_speed(job.speed_mode)
+            self.result = {}
+            self._thread = threading.Thread(target=self._run, args=(job, self.control), name="crawl-job", daemon=True)
+            self._thread.start()
+        return 200, {"message": "크롤링이 시작되었습니다.", "job": job.to_dict()}
+
+    def _run(self, job: CrawlJob, control: CrawlControl) -> None:
+        try:
+            self.result = run_crawl(job, self.state, control)
+        except Exception as e:
+            control.status["phase"] = "failed"
+            control.status["error"] = str(e)
+            print(f"[ERROR] 크롤링 작업 실패: {e}")
+
+    def stop_job(self) -> Tuple[int, Dict[str, any]]:
+        if not self.running:
+            return 400, {"message": "실행 중인 크롤링이 없습니다."}
+        STOP_EVENT.set()
+        self.control.resume()  # 일시정지 중이어도 바로 종료 단계로
+        return 200, {"message": "중지 요청을 보냈습니다."}
+
+    def pause_job(self, paused: bool) -> Tuple[int, Dict[str, any]]:
+        if not self.running:
+            return 400, {"message": "실행 중인 크롤링이 없습니다."}
+        if paused:
+            self.control.pause()
+        else:
+            self.control.resume()
+        return 200, {"paused": self.control.paused}
+
+    def configure(self, params: Dict[str, any]) -> Tuple[int, Dict[str, any]]:
+        if self.control is None:
+            return 400, {"message": "설정할 작업이 없습니다."}
+        try:
+            self.control.set_concurrency(
+                workers=params.get("workers"),
+                batch_size=params.get("batch_size"),
+                batch_sleep=params.get("batch_sleep"),
+            )
+        except (TypeError, ValueError) as e:
+            return 400, {"message": f"잘못된 설정 값: {e}"}
+        print(f"[CONFIG] 동시성 변경: 워커 {self.control.workers}, 배치 {self.control.batch_size}, 대기 {self.control.batch_sleep}s")
+        return 200, self.control.to_dict()
+
+    def status(self) -> Dict[str, any]:
+        return {
+            "node": NODE_ID,
+            "running": self.running,
+            "job": self.job.to_dict() if self.job else None,
+            "control": self.control.to_dict() if self.control else None,
+            "progress": dict(self.control.status) if self.control else None,
+            "cache": {
+                "it_ids": len(self.state.existing_it_ids),
+                "categories": len(self.state.category_cache),
+            },
+            "http": get_http_pool_stats(),
+            "log_seq": self.log_buffer.seq if self.log_buffer else 0,
+        }
+
+    def logs(self, after: int) -> Dict[str, any]:
+        if self.log_buffer is None:
+            return {"seq": 0, "lines": []}
+        seq, lines = self.log_buffer.since(after)
+        return {"seq": seq, "lines": lines}
+
+
+def _make_daemon_handler(daemon: CrawlDaemon, server_ref: List):
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import parse_qs
+
+    class DaemonHandler(BaseHTTPRequestHandler):
+        def _send(self, code: int, payload: Dict[str, any]) -> None:
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json_body(self) -> Dict[str, any]:
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length:
+                return {}
+            return json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            if path == "/status":
+                self._send(200, daemon.status())
+            elif path == "/logs":
+                after = int(parse_qs(query).get("after", ["0"])[0] or 0)
+                self._send(200, daemon.logs(after))
+            else:
+                self._send(404, {"message": "not found"})
+
+        def do_POST(self):
+            try:
+                params = self._json_body()
+            except ValueError:
+                self._send(400, {"message": "JSON 본문을 해석할 수 없습니다."})
+                return
+            if self.path == "/jobs":
+                self._send(*daemon.start_job(params))
+            elif self.path == "/jobs/stop":
+                self._send(*daemon.stop_job())
+            elif self.path == "/jobs/pause":
+                self._send(*daemon.pause_job(True))
+            elif self.path == "/jobs/resume":
+                self._send(*daemon.pause_job(False))
+            elif self.path == "/config":
+                self._send(*daemon.configure(params))
+            elif self.path == "/shutdown":
+                if daemon.running:
+                    daemon.stop_job()
+                self._send(200, {"message": "종료합니다."})
+                threading.Thread(target=server_ref[0].shutdown, daemon=True).start()
+            else:
+                self._send(404, {"message": "not found"})
+
+        def log_message(self, format, *args):
+            pass  # 상태 폴링 요청마다 stderr에 찍히지 않도록
+
+    return DaemonHandler
+
+
+def run_daemon(host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> None:
+    from http.server import ThreadingHTTPServer
+
+    if not DB_CONFIG["password"]:
+        print("[ERROR] DB_PASSWORD 환경변수가 비어있습니다.")
+        return
+
+    log_buffer = LogBuffer(sys.stdout)
+    sys.stdout = log_buffer
+    daemon = CrawlDaemon(log_buffer)
+    server_ref: List = []
+    server = ThreadingHTTPServer((host, port), _make_daemon_handler(daemon, server_ref))
+    server.daemon_threads = True
+    server_ref.append(server)
+    print(f"[DAEMON] 제어 API 대기 중: http://{host}:{port} (노드 {NODE_ID})")
+    try:
+        server.serve_forever()
+    finally:
+        STOP_EVENT.set()
+        if daemon._thread is not None:
+            daemon._thread.join(timeout=30)
+        server.server_close()
+        daemon.state.close()
+        sys.stdout = log_buffer._stream
+        print("[DAEMON] 종료")
 
 
 if __name__ == "__main__":
-    import sys
+    install_signal_handlers()
     if len(sys.argv) > 1 and sys.argv[1] == "--csv-only":
         crawl_only()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--import-csv":
+        import_csv(sys.argv[2] if len(sys.argv) > 2 else CSV_FILENAME)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+        run_daemon()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--continuous":
+        run_continuous()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--publish-catalog":
+        publish_catalog()
     else:
         main()
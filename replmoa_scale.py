@@ -0,0 +1,341 @@
+"""
+합성 카탈로그 규모 테스트 (수십만~100만 상품 대비)
+
+사용법:
+    DB_NAME=modern_shop_scale python3 replmoa_scale.py                 # 1만 → 10만 → 100만 단계
+    SCALE_STEPS=10000,50000 DB_NAME=modern_shop_scale python3 replmoa_scale.py
+    DB_NAME=modern_shop_scale python3 replmoa_scale.py --cleanup       # 합성 상품만 삭제
+
+스키마가 준비된 로컬 DB(backend/scripts/initDb.js)가 필요합니다. 실제 상품과 섞이지 않도록 별도 DB를
+권장하며, DB_HOST가 로컬(localhost/127.0.0.1/소켓 경로)이 아니면 실행하지 않습니다.
+
+단계마다 (누적 행 수 기준):
+  1) 목표 행 수까지 합성 상품을 CsvSink 형식 CSV로 만들어 import_csv(COPY 일괄 적재)로 채움
+  2) SCALE_SAVE_SAMPLE개를 run_crawl 저장 경로(카테고리 보장, 중복 판정, INSERT, 옵션/이미지)로 저장
+  3) it_id 캐시 로드, 카테고리 해석, 중복 판정 쿼리, 스토어 목록/검색 쿼리, 카탈로그 스냅샷 생성 시간 측정
+합성 상품의 it_id는 SYNTH_IT_ID_BASE부터, 이미지 호스트는 synthetic.invalid라 실제 데이터와 구분됩니다.
+"""
+import contextlib
+import csv
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List
+from unittest import mock
+
+import replmoa_crawler as crawler
+
+STEPS = [int(s) for s in os.environ.get("SCALE_STEPS", "10000,100000,1000000").split(",") if s.strip()]
+CHUNK_ROWS = int(os.environ.get("SCALE_CHUNK_ROWS", "100000"))  # import_csv 한 번에 넣는 행 수 (임시 CSV 크기 제한)
+SAVE_SAMPLE = int(os.environ.get("SCALE_SAVE_SAMPLE", "1000"))  # 단계마다 run_crawl 저장 경로로 넣을 상품 수
+QUERY_RUNS = int(os.environ.get("SCALE_QUERY_RUNS", "20"))
+SEED = int(os.environ.get("SCALE_SEED", "48"))
+VERBOSE = os.environ.get("SCALE_VERBOSE", "false").lower() == "true"  # 크롤러 출력 표시
+
+SYNTH_IT_ID_BASE = 8_000_000_000  # 실제 it_id(등록 시각 기반 17억대)와 겹치지 않는 범위
+SYNTH_IMAGE_HOST = "https://synthetic.invalid"
+
+# 카테고리는 normalize_category_4depth의 매핑에 있는 이름만 사용 (slug 생성 경로를 그대로 탐)
+MAIN_NAMES = ("남성", "여성", "국내출고상품")
+MAIN_WEIGHTS = (6, 3, 1)
+SUB_NAMES = ("가방", "지갑", "시계", "신발", "벨트", "악세서리", "모자", "의류", "선글라스&안경")
+SUB_WEIGHTS = (20, 25, 20, 10, 5, 8, 3, 7, 2)
+DETAIL_NAMES = {
+    "가방": ("크로스&숄더백", "토트백", "클러치&파우치", "백팩", "숄더백", "미니백", "서류가방"),
+    "지갑": ("카드지갑", "반지갑", "장지갑", "지퍼월렛", "키홀더"),
+    "신발": ("스니커즈", "로퍼", "부츠", "샌들", "슬리퍼", "뮬"),
+    "의류": ("아우터", "티셔츠", "니트", "맨투맨", "셔츠", "팬츠"),
+    "악세서리": ("목걸이", "팔찌", "반지", "귀걸이", "스카프", "넥타이"),
+}
+assert all(name in crawler.CATEGORY_MAIN_MAP for name in MAIN_NAMES)
+assert all(name in crawler.CATEGORY_SUB_MAP for name in SUB_NAMES)
+assert all(name in crawler.CATEGORY_DETAIL_MAP for names in DETAIL_NAMES.values() for name in names)
+
+# 실제 CSV가 없을 때의 브랜드 (있으면 CSV의 3뎁스 이름을 사용)
+FALLBACK_BRANDS = ("프라다", "구찌", "루이비통", "샤넬", "디올", "에르메스", "고야드", "보테가베네타",
+                   "생로랑", "발렌시아가", "롤렉스", "오메가", "까르띠에", "톰브라운", "몽클레어", "버버리")
+NAME_WORDS = ("모노그램", "사피아노", "레더", "캔버스", "퀼팅", "클래식", "미니", "라지", "빈티지", "로고",
+              "스트라이프", "체인", "버클", "지퍼", "더블", "오리지널", "시그니처", "에센셜")
+COLOR_VALUES = ("블랙", "화이트", "네이비", "베이지", "브라운", "그레이", "카키", "레드")
+SIZE_VALUES = {
+    "신발": ("230", "240", "250", "260", "270", "280"),
+    "의류": ("S", "M", "L", "XL", "XXL"),
+    "벨트": ("90", "95", "100", "105", "110"),
+}
+MODEL_LETTERS = "ABCDEFGHJKLMNPRSTUVWXZ"
+
+# 스토어 목록 쿼리 (productController.getProducts와 같은 형태)
+STOREFRONT_LIST_SQL = """
+    SELECT p.*, c.name as category_name, c.slug as category_slug, c.depth as category_depth,
+           c.parent_id as category_parent_id,
+           COALESCE((SELECT COUNT(*) FROM reviews r WHERE r.product_id = p.id AND r.is_active = true), 0) as review_count
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = true {where}
+    ORDER BY p.created_at DESC, p.id DESC LIMIT 20 OFFSET %s
+"""
+STOREFRONT_COUNT_SQL = """
+    SELECT COUNT(*) FROM products p LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.is_active = true {where}
+"""
+CATEGORY_WHERE = "AND (c.slug = %s OR c.slug LIKE (%s || '-%%'))"
+SEARCH_WHERE = "AND p.search_text LIKE %s"
+
+
+def load_brand_names(filename: str = crawler.CSV_FILENAME) -> List[str]:
+    """실제 크롤링 CSV의 3뎁스(브랜드) 이름. 없으면 FALLBACK_BRANDS"""
+    brands = set()
+    if os.path.exists(filename):
+        with open(filename, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                parts = [p.strip() for p in (row.get("카테고리") or "").split(">") if p.strip()]
+                if len(parts) > 2:
+                    brands.add(parts[2])
+    return sorted(brands) or list(FALLBACK_BRANDS)
+
+
+class CatalogGenerator:
+    """CsvSink/parse_product_detail과 같은 키를 가진 합성 상품 dict를 만듭니다 (serial마다 같은 결과)"""
+
+    def __init__(self, seed: int = SEED):
+        self.seed = seed
+        self.brands = load_brand_names()
+
+    def category(self, rng: random.Random) -> str:
+        main = rng.choices(MAIN_NAMES, MAIN_WEIGHTS)[0]
+        sub = rng.choices(SUB_NAMES, SUB_WEIGHTS)[0]
+        parts = [main, sub, rng.choice(self.brands)]
+        if sub in DETAIL_NAMES and rng.random() < 0.7:
+            parts.append(rng.choice(DETAIL_NAMES[sub]))
+        return " > ".join(parts)
+
+    def options(self, rng: random.Random, sub: str) -> List[Dict]:
+        options = []
+        if sub in SIZE_VALUES:
+            values = SIZE_VALUES[sub]
+            options.append({"name": "사이즈", "values": [
+                {"value": v, "price_add": rng.choice((0, 0, 0, 5000))} for v in values[:rng.randint(2, len(values))]
+            ]})
+        if rng.random() < 0.4:
+            options.append({"name": "컬러", "values": [
+                {"value": v, "price_add": 0} for v in rng.sample(COLOR_VALUES, rng.randint(1, 4))
+            ]})
+        return options
+
+    def product(self, serial: int) -> Dict:
+        rng = random.Random(self.seed * 1_000_003 + serial)
+        it_id = SYNTH_IT_ID_BASE + serial
+        category = self.category(rng)
+        parts = category.split(" > ")
+        brand, sub = parts[2], parts[1]
+        # 모델 코드에 serial을 넣어 상품명이 겹치지 않게 (extract_model_code가 인식하는 형태)
+        code = f"{rng.randint(1, 9)}{rng.choice(MODEL_LETTERS)}{rng.choice(MODEL_LETTERS)}{serial:07d}"
+        label = parts[3] if len(parts) > 3 else sub
+        name = f"{brand} {' '.join(rng.sample(NAME_WORDS, rng.randint(1, 3)))} {label} {code}"
+        price = rng.randint(30, 900) * 1000 if sub != "시계" else rng.randint(300, 3000) * 1000
+        department = int(price * rng.uniform(2.5, 3.5)) // 1000 * 1000
+        item_dir = f"{SYNTH_IMAGE_HOST}/data/item/{it_id}"
+        editor = [f"{SYNTH_IMAGE_HOST}/data/editor/{it_id}_{i}.jpg" for i in range(rng.randint(0, 12))]
+        return {
+            "상품명": name,
+            "카테고리": category,
+            "시중가격": f"{department:,}원",
+            "판매가격": f"{price:,}원",
+            "대표이미지": f"{item_dir}/thumb-1_576x576.jpg",
+            "설명이미지들": ";".join(editor),
+            "URL": f"{crawler.BASE_URL}/shop/item.php?it_id={it_id}",
+            "옵션": self.options(rng, sub),
+        }
+
+    def products(self, start: int, stop: int) -> Iterator[Dict]:
+        for serial in range(start, stop):
+            yield self.product(serial)
+
+
+@contextlib.contextmanager
+def quiet():
+    """크롤러의 진행 출력 숨김 (SCALE_VERBOSE=true면 그대로)"""
+    if VERBOSE:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def timed(fn: Callable, runs: int = 1) -> float:
+    """fn을 runs번 실행한 중앙값 (ms)"""
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def report(rows: int, label: str, value: str) -> None:
+    print(f"[scale {rows:>9,}] {label:<26} {value}", flush=True)
+
+
+def connect():
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    conn = psycopg2.connect(**crawler.DB_CONFIG)
+    conn.autocommit = True
+    return conn, conn.cursor(cursor_factory=RealDictCursor)
+
+
+def synthetic_serials(cur) -> int:
+    """이미 적재한 합성 상품의 다음 serial (crawler_items 기준)"""
+    cur.execute(
+        "SELECT MAX(it_id::BIGINT) AS last FROM crawler_items WHERE it_id ~ '^8[0-9]{9}$'"
+    )
+    last = cur.fetchone()["last"]
+    return 0 if last is None else int(last) - SYNTH_IT_ID_BASE + 1
+
+
+def bulk_load(gen: CatalogGenerator, start: int, stop: int) -> float:
+    """[start, stop) serial을 CHUNK_ROWS씩 CSV로 써서 import_csv로 적재, 걸린 시간(초) 반환"""
+    elapsed = 0.0
+    for chunk_start in range(start, stop, CHUNK_ROWS):
+        chunk_stop = min(stop, chunk_start + CHUNK_ROWS)
+        fd, path = tempfile.mkstemp(suffix=".csv", prefix="replmoa_scale_")
+        os.close(fd)
+        try:
+            with crawler.CsvSink(path) as sink:
+                for product in gen.products(chunk_start, chunk_stop):
+                    sink.write(product)
+            t0 = time.perf_counter()
+            with quiet():
+                crawler.import_csv(path)
+            elapsed += time.perf_counter() - t0
+        finally:
+            os.remove(path)
+    return elapsed
+
+
+def run_save_path(gen: CatalogGenerator, start: int, count: int) -> Dict:
+    """합성 상품 count개를 run_crawl 저장 경로로 넣음 (페이지/이미지 요청 대신 생성기 결과 사용)"""
+    sample = {f"{crawler.BASE_URL}/shop/item.php?it_id={SYNTH_IT_ID_BASE + s}": s for s in range(start, start + count)}
+    control = crawler.CrawlControl(workers=crawler.MAX_WORKERS, batch_size=50, batch_sleep=0)
+    job = crawler.CrawlJob(limit=count, category="", url_source="sitemap", skip_s3=True, refresh=False)
+    # 이 실행 동안만 크롤러 모듈을 바꿔 끼움 (이후 measure 등은 원래 함수로)
+    with mock.patch.multiple(
+        crawler,
+        get_product_urls_from_sitemap=lambda: list(sample),
+        parse_product_detail=lambda url, upload_to_s3=True, raise_errors=False: gen.product(sample[url]),
+        DELIST_ENABLED=False,  # 합성 URL만 발견되므로 실제 상품을 판매 종료로 보지 않도록
+    ), quiet():
+        return crawler.run_crawl(job, control=control)
+
+
+def measure(cur, conn, gen: CatalogGenerator, rows: int) -> None:
+    rng = random.Random(SEED + rows)
+
+    t0 = time.perf_counter()
+    with quiet():
+        state = crawler.CrawlState()
+    report(rows, "it_id 캐시 로드", f"{(time.perf_counter() - t0) * 1000:8.1f}ms ({len(state.existing_it_ids):,}개)")
+    state.close()
+
+    categories = [gen.category(rng) for _ in range(1000)]
+    cache_ms = timed(lambda: crawler.load_category_cache(cur))
+    cache = crawler.load_category_cache(cur)
+    warm_ms = timed(lambda: [crawler.resolve_category_id(cur, cat, cache) for cat in categories])
+    cold_ms = timed(lambda: [crawler.resolve_category_id(cur, cat) for cat in categories[:200]])
+    report(rows, "카테고리 해석", f"캐시 로드 {cache_ms:.1f}ms ({len(cache):,}개) | 캐시 {warm_ms:.1f}ms/1000건"
+           f" | 캐시 없이 {cold_ms / 200:.3f}ms/건")
+
+    cur.execute(
+        """
+        SELECT p.name, p.category_id, c.slug FROM products p JOIN categories c ON c.id = p.category_id
+        ORDER BY random() LIMIT 50
+        """
+    )
+    existing = cur.fetchall()
+    exists_ms = timed(lambda: [
+        cur.execute("SELECT id FROM products WHERE name=%s AND category_id=%s", (r["name"], r["category_id"]))
+        for r in existing
+    ], runs=3) / len(existing)
+    before_upload_ms = timed(lambda: [
+        cur.execute(
+            "SELECT 1 FROM products p JOIN categories c ON c.id = p.category_id WHERE c.slug=%s AND p.name=%s LIMIT 1",
+            (r["slug"], r["name"]),
+        ) for r in existing
+    ], runs=3) / len(existing)
+    report(rows, "중복 판정 쿼리", f"already_exists {exists_ms:.2f}ms/건 | 업로드 전 판정 {before_upload_ms:.2f}ms/건")
+
+    slug = crawler.normalize_category_4depth(f"{MAIN_NAMES[0]} > {SUB_NAMES[0]}")["leaf_slug"]
+    where = CATEGORY_WHERE
+    queries = {
+        f"목록 {slug} 1쪽": (STOREFRONT_LIST_SQL.format(where=where), (slug, slug, 0)),
+        f"목록 {slug} 50쪽": (STOREFRONT_LIST_SQL.format(where=where), (slug, slug, 980)),
+        f"개수 {slug}": (STOREFRONT_COUNT_SQL.format(where=where), (slug, slug)),
+        "전체 목록 1쪽": (STOREFRONT_LIST_SQL.format(where=""), (0,)),
+        "검색 '사피아노'": (STOREFRONT_LIST_SQL.format(where=SEARCH_WHERE), ("%사피아노%", 0)),
+    }
+    for label, (sql, params) in queries.items():
+        report(rows, f"스토어 {label}", f"{timed(lambda: cur.execute(sql, params), runs=QUERY_RUNS):8.1f}ms")
+
+    with quiet():
+        snapshot_ms = timed(lambda: crawler.build_catalog_snapshot(conn))
+    report(rows, "카탈로그 스냅샷 생성", f"{snapshot_ms:8.1f}ms")
+
+
+def run_steps() -> None:
+    gen = CatalogGenerator()
+    conn, cur = connect()
+    crawler.ensure_crawler_schema(cur)
+    print(f"[scale] DB {crawler.DB_CONFIG['dbname']} | 단계 {', '.join(f'{s:,}' for s in STEPS)}"
+          f" | 브랜드 {len(gen.brands)}개 | 저장 경로 표본 {SAVE_SAMPLE:,}개")
+    for target in STEPS:
+        cur.execute("SELECT COUNT(*) AS n FROM products")
+        current = cur.fetchone()["n"]
+        serial = synthetic_serials(cur)
+        if target - SAVE_SAMPLE > current:
+            load_rows = target - SAVE_SAMPLE - current
+            seconds = bulk_load(gen, serial, serial + load_rows)
+            serial += load_rows
+            report(target, "일괄 적재 (import_csv)", f"{load_rows:,}행 {seconds:6.1f}초 ({load_rows / seconds:,.0f}행/초)")
+        if SAVE_SAMPLE:
+            result = run_save_path(gen, serial, SAVE_SAMPLE)
+            rate = result.get("saved", 0) / result["elapsed"] if result.get("elapsed") else 0
+            report(target, "저장 경로 (run_crawl)", f"{result.get('saved', 0):,}개 {result.get('elapsed', 0):6.1f}초 ({rate:,.1f}개/초)")
+        cur.execute("ANALYZE products")
+        cur.execute("SELECT COUNT(*) AS n FROM products")
+        measure(cur, conn, gen, cur.fetchone()["n"])
+    conn.close()
+
+
+def cleanup() -> None:
+    conn, cur = connect()
+    cur.execute(
+        """
+        DELETE FROM products WHERE id IN (
+            SELECT product_id FROM crawler_items WHERE it_id ~ '^8[0-9]{9}$' AND product_id IS NOT NULL
+        )
+        """
+    )
+    deleted = cur.rowcount
+    cur.execute("DELETE FROM crawler_items WHERE it_id ~ '^8[0-9]{9}$'")
+    print(f"[scale] 합성 상품 {deleted:,}개 삭제")
+    conn.close()
+
+
+def _is_local_db() -> bool:
+    host = crawler.DB_CONFIG["host"]
+    return host.startswith("/") or host in ("localhost", "127.0.0.1", "::1")
+
+
+if __name__ == "__main__":
+    if not _is_local_db():
+        print(f"[scale] 로컬 DB에서만 실행합니다 (DB_HOST={crawler.DB_CONFIG['host']})")
+        sys.exit(1)
+    if len(sys.argv) > 1 and sys.argv[1] == "--cleanup":
+        cleanup()
+    else:
+        run_steps()